@@ -0,0 +1,260 @@
+"""
+Caching utilities for hot read paths.
+
+Provides a bounded in-process LRU cache with per-entry TTL, an optional
+shared Redis tier, and a read-through wrapper that combines the two.
+"""
+
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sentinel for cache misses, so falsy values can still be cached
+MISSING = object()
+
+
+class LRUCache:
+    """Bounded least-recently-used cache with a time-to-live per entry."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, timer: Callable[[], float] = time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Return a cached value and mark it as recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        value, expires_at = entry
+        if expires_at <= self._timer():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        expires_at = self._timer() + (self.ttl if ttl is None else ttl)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self._entries[key] = (value, expires_at)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove an entry. Returns True if it was cached."""
+        if self._entries.pop(key, None) is None:
+            return False
+        self.invalidations += 1
+        return True
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for sizing and monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
+
+
+class RedisCacheTier:
+    """
+    Shared cache tier stored in Redis.
+
+    Redis errors and entries that fail to deserialize are logged and
+    treated as misses so the cache can never take the read path down with it.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        namespace: str,
+        ttl: float,
+        serialize: Callable[[Any], str],
+        deserialize: Callable[[str], Any]
+    ):
+        # Imported here so Redis is only required when the tier is enabled
+        import redis.asyncio as aioredis
+
+        self.client = aioredis.from_url(redis_url)
+        self.namespace = namespace
+        self.ttl = ttl
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: Hashable) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    async def get(self, key: Hashable) -> Any:
+        """Return a cached value or MISSING."""
+        try:
+            raw = await self.client.get(self._key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache get failed for {self.namespace}: {str(e)}")
+            return MISSING
+
+        if raw is None:
+            self.misses += 1
+            return MISSING
+
+        try:
+            value = self.deserialize(raw)
+        except Exception as e:
+            # A corrupt or old-format entry; the reload overwrites it
+            self.errors += 1
+            logger.warning(f"Redis cache entry for {self.namespace} failed to deserialize: {str(e)}")
+            return MISSING
+        self.hits += 1
+        return value
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        """Store a value with the tier TTL."""
+        try:
+            await self.client.set(self._key(key), self.serialize(value), ex=max(1, int(self.ttl)))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache set failed for {self.namespace}: {str(e)}")
+
+    async def delete(self, key: Hashable) -> None:
+        """Remove a value."""
+        try:
+            await self.client.delete(self._key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache delete failed for {self.namespace}: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return tier counters."""
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+class ReadThroughCache:
+    """
+    Read-through cache with a local LRU tier and an optional Redis tier.
+
+    Lookups check the local tier, then Redis, then call the loader and
+    populate both tiers. None results are not cached, so a newly created
+    record is visible immediately. Writers must call invalidate() after
+    changing the underlying record; a load that was already running when
+    its key was invalidated returns its value without caching it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1024,
+        ttl: float = 60.0,
+        redis_url: Optional[str] = None,
+        serialize: Callable[[Any], str] = None,
+        deserialize: Callable[[str], Any] = None
+    ):
+        self.name = name
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.shared = None
+        if redis_url:
+            self.shared = RedisCacheTier(redis_url, name, ttl, serialize, deserialize)
+        # Loads in flight and invalidations seen per key, kept only while loading
+        self._loads: Dict[Hashable, int] = {}
+        self._generations: Dict[Hashable, int] = {}
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, loading it on a miss."""
+        value = self.local.get(key)
+        if value is not MISSING:
+            return value
+
+        self._loads[key] = self._loads.get(key, 0) + 1
+        generation = self._generations.setdefault(key, 0)
+        try:
+            if self.shared is not None:
+                value = await self.shared.get(key)
+                if value is not MISSING:
+                    if self._generations[key] == generation:
+                        self.local.set(key, value)
+                    return value
+
+            value = await loader()
+            if value is not None and self._generations[key] == generation:
+                self.local.set(key, value)
+                if self.shared is not None:
+                    await self.shared.set(key, value)
+            return value
+        finally:
+            self._loads[key] -= 1
+            if not self._loads[key]:
+                del self._loads[key]
+                del self._generations[key]
+
+    def _bump_generation(self, key: Hashable) -> None:
+        """Mark loads of key that are in flight as stale."""
+        if key in self._generations:
+            self._generations[key] += 1
+
+    async def invalidate(self, key: Hashable) -> None:
+        """Drop a key from every tier."""
+        self._bump_generation(key)
+        self.local.delete(key)
+        if self.shared is not None:
+            await self.shared.delete(key)
+
+    def invalidate_local(self, key: Hashable) -> None:
+        """
+        Drop a key from this worker's local tier only.
+
+        Used for changes made by other workers, which have already
+        invalidated the shared tier.
+        """
+        self._bump_generation(key)
+        self.local.delete(key)
+
+    def clear_local(self) -> None:
+        """Drop every entry from this worker's local tier."""
+        for key in self._generations:
+            self._generations[key] += 1
+        self.local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters for every tier."""
+        stats = {"name": self.name, "local": self.local.stats()}
+        if self.shared is not None:
+            stats["redis"] = self.shared.stats()
+        return stats
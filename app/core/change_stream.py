@@ -0,0 +1,212 @@
+"""
+Cross-worker cache invalidation through MongoDB change streams.
+
+Each worker keeps its own in-process caches, so a write handled by one
+worker leaves stale entries in the others. Every worker runs one
+ChangeStreamWatcher that follows writes to the collections that have
+handlers registered and calls those handlers, e.g. to drop a cached
+property. Collections no cache depends on are never streamed.
+
+The watcher checkpoints its resume token, so after a restart or a dropped
+connection it continues where it stopped. If the token can no longer be
+resumed (the oplog has rolled over), events may have been missed and every
+registered reset handler is called to clear the caches instead.
+"""
+
+import asyncio
+import inspect
+import logging
+import socket
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.mongo_db import get_collection, get_database
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_COLLECTION = "change_stream_checkpoints"
+
+# Server errors meaning the resume token is unusable: ChangeStreamHistoryLost,
+# ChangeStreamFatalError and InvalidResumeToken
+UNRESUMABLE_ERROR_CODES = {286, 280, 260}
+
+ChangeHandler = Callable[[str], Union[None, Awaitable[None]]]
+ResetHandler = Callable[[], Union[None, Awaitable[None]]]
+
+_change_handlers: Dict[str, List[ChangeHandler]] = defaultdict(list)
+_reset_handlers: List[ResetHandler] = []
+
+
+def register_change_handler(collection_name: str, handler: ChangeHandler) -> None:
+    """
+    Call handler with the document ID of every insert, update, replace or
+    delete in a watched collection, including writes made by this worker.
+    """
+    _change_handlers[collection_name].append(handler)
+
+
+def register_reset_handler(handler: ResetHandler) -> None:
+    """Call handler when changes may have been missed and caches must be cleared."""
+    _reset_handlers.append(handler)
+
+
+async def _call(handler: Callable, *args: Any) -> None:
+    """Call a sync or async handler, logging instead of raising errors."""
+    try:
+        result = handler(*args)
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logger.error(f"Change stream handler {getattr(handler, '__qualname__', handler)} failed: {str(e)}")
+
+
+class ChangeStreamWatcher:
+    """Follow writes to the watched collections and dispatch them to handlers."""
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        collections: Optional[Tuple[str, ...]] = None,
+        checkpoint_interval: float = 5.0,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0
+    ):
+        # Checkpoints are keyed by name; the host name is stable per pod.
+        # Workers of one pod share it, which is safe: invalidations are
+        # idempotent and a restarted worker starts with empty caches.
+        self.name = name or socket.gethostname()
+        # Defaults to the collections with registered handlers when watching starts
+        self.collections = collections
+        self.checkpoint_interval = checkpoint_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.resume_token: Optional[Dict[str, Any]] = None
+        self.events = 0
+        self.resets = 0
+        self._checkpointed_token: Optional[Dict[str, Any]] = None
+        self._last_checkpoint = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def pipeline(self) -> List[Dict[str, Any]]:
+        """Server-side filter: only writes to watched collections, only the fields needed."""
+        collections = self.collections or sorted(_change_handlers)
+        return [
+            {"$match": {
+                "ns.coll": {"$in": list(collections)},
+                "operationType": {"$in": ["insert", "update", "replace", "delete"]}
+            }},
+            {"$project": {"operationType": 1, "ns": 1, "documentKey": 1}}
+        ]
+
+    async def dispatch(self, change: Dict[str, Any]) -> None:
+        """Call the handlers registered for the collection of one change event."""
+        self.events += 1
+        document_id = str(change["documentKey"]["_id"])
+        for handler in _change_handlers.get(change["ns"]["coll"], []):
+            await _call(handler, document_id)
+
+    async def reset(self) -> None:
+        """Forget the resume token and clear every cache, since events were lost."""
+        self.resets += 1
+        self.resume_token = None
+        await self._save_checkpoint(force=True)
+        for handler in _reset_handlers:
+            await _call(handler)
+
+    async def run(self) -> None:
+        """Watch until cancelled, reconnecting with backoff after errors."""
+        await self._load_checkpoint()
+        delay = self.retry_delay
+
+        while True:
+            try:
+                async with get_database().watch(
+                    self.pipeline(),
+                    start_after=self.resume_token,
+                    max_await_time_ms=1000
+                ) as stream:
+                    logger.info(f"Change stream watcher {self.name} started")
+                    delay = self.retry_delay
+                    while stream.alive:
+                        change = await stream.try_next()
+                        if change is not None:
+                            await self.dispatch(change)
+                        # Advances on idle batches too, so the token never falls behind the oplog
+                        self.resume_token = stream.resume_token
+                        await self._save_checkpoint()
+            except asyncio.CancelledError:
+                await self._save_checkpoint(force=True)
+                raise
+            except OperationFailure as e:
+                if e.code in UNRESUMABLE_ERROR_CODES:
+                    logger.warning(f"Change stream cannot resume ({e.code}), clearing caches")
+                    await self.reset()
+                    continue
+                logger.error(f"Change stream failed: {str(e)}")
+            except PyMongoError as e:
+                logger.error(f"Change stream failed: {str(e)}")
+
+            # Resuming from the last token replays writes made while disconnected
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+
+    def start(self) -> asyncio.Task:
+        """Run the watcher in a background task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the background task and write a final checkpoint."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return watcher counters for monitoring."""
+        return {
+            "name": self.name,
+            "running": self._task is not None and not self._task.done(),
+            "events": self.events,
+            "resets": self.resets,
+            "has_resume_token": self.resume_token is not None
+        }
+
+    async def _load_checkpoint(self) -> None:
+        """Load the last saved resume token for this watcher."""
+        try:
+            checkpoints = await get_collection(CHECKPOINT_COLLECTION)
+            checkpoint = await checkpoints.find_one({"_id": self.name})
+        except PyMongoError as e:
+            logger.warning(f"Could not load change stream checkpoint: {str(e)}")
+            return
+        if checkpoint:
+            self.resume_token = checkpoint.get("resume_token")
+            self._checkpointed_token = self.resume_token
+
+    async def _save_checkpoint(self, force: bool = False) -> None:
+        """Persist the resume token, at most once per checkpoint interval."""
+        if self.resume_token == self._checkpointed_token and not force:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_checkpoint < self.checkpoint_interval:
+            return
+        try:
+            checkpoints = await get_collection(CHECKPOINT_COLLECTION)
+            await checkpoints.replace_one(
+                {"_id": self.name},
+                {"resume_token": self.resume_token, "updated_at": datetime.utcnow()},
+                upsert=True
+            )
+            self._checkpointed_token = self.resume_token
+            self._last_checkpoint = now
+        except PyMongoError as e:
+            logger.warning(f"Could not save change stream checkpoint: {str(e)}")
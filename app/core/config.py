@@ -46,6 +46,12 @@ class Settings(BaseSettings):
     MONGO_DB_NAME: str = "smartrent"
     MONGO_TEST_DB_NAME: str = "smartrent_test"
     MONGO_GRIDFS_BUCKET: str = "uploads"
+    MONGO_WARM_UP_POOL: bool = False  # open minPoolSize connections at startup
+    MONGO_READY_TIMEOUT: float = 2.0  # seconds for the readiness ping
+    # Change streams need a replica set or Atlas cluster
+    CHANGE_STREAM_ENABLED: bool = False  # invalidate worker caches on writes from other workers
+    CHANGE_STREAM_CHECKPOINT_INTERVAL: float = 5.0  # seconds between resume token saves
+    CHANGE_STREAM_NAME: Optional[str] = None  # checkpoint key; defaults to the host name
     
     # Web3 Configuration
     WEB3_PROVIDER_URL: str
@@ -64,6 +70,25 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     
+    # Property read cache
+    PROPERTY_CACHE_SIZE: int = 10000  # entries per worker
+    PROPERTY_CACHE_TTL: int = 60  # seconds
+    PROPERTY_CACHE_REDIS_URL: Optional[str] = None  # enables the shared tier
+    SEARCH_CACHE_SIZE: int = 5000  # result pages per worker
+    SEARCH_CACHE_TTL: int = 15  # seconds
+    COUNT_CACHE_SIZE: int = 1000  # cached filter totals per worker
+    COUNT_CACHE_TTL: int = 30  # seconds
+    COUNT_EXACT_LIMIT: int = 10000  # larger totals are estimated
+    COUNT_SAMPLE_SIZE: int = 1000  # documents sampled per estimate
+    LISTING_INDEX_ENABLED: bool = False  # in-memory numeric range search
+    LOCATION_AUTOCOMPLETE_REFRESH_INTERVAL: int = 300  # seconds
+    SIMILAR_PROPERTIES_PRELOAD: bool = False  # otherwise loaded on first request
+    MARKET_STATS_JOB_ENABLED: bool = False
+    MARKET_STATS_REBUILD_INTERVAL: int = 3600  # seconds between full rebuilds
+    MARKET_STATS_FLUSH_INTERVAL: int = 60  # seconds between dirty group updates
+    PROPOSAL_COUNTER_BUFFERED: bool = False  # coalesce proposal count writes
+    PROPOSAL_COUNTER_FLUSH_INTERVAL: float = 1.0  # seconds between buffered writes
+    
     # Admin User
     ADMIN_EMAIL: EmailStr
     ADMIN_PASSWORD: str
@@ -77,6 +102,7 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_UPLOAD_EXTENSIONS: List[str] = [".jpg", ".jpeg", ".png", ".pdf", ".doc", ".docx"]
     STORE_DOCUMENTS_IN_DB: bool = True  # Whether to store document files in MongoDB
+    EXPORT_BATCH_SIZE: int = 1000  # documents fetched per cursor batch for exports
 
     class Config:
         case_sensitive = True
@@ -0,0 +1,125 @@
+"""
+Count strategies for paginated results.
+
+count_documents(filter) walks every matching index entry, so exact totals
+for broad filters cost as much as reading the whole result set. Counts are
+instead resolved in order of cost:
+
+1. Unfiltered totals come from collection metadata (estimated_document_count).
+   They are reported as approximate on purpose: the metadata count can drift
+   after an unclean shutdown and includes orphaned documents on sharded
+   clusters, and an exact count_documents({}) would scan a whole index.
+2. Filtered totals are cached per filter for a short TTL.
+3. On a miss, at most exact_limit matches are counted. Below the limit the
+   count is exact; at the limit it is extrapolated from a random sample and
+   reported as approximate, so the API can show "about N" results.
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from bson import json_util
+from pydantic import BaseModel
+from pymongo.collation import Collation
+
+from app.core.cache import LRUCache, MISSING
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCount(BaseModel):
+    """A result total; exact is False for estimates and lower bounds."""
+    count: int
+    exact: bool = True
+
+
+class CountStrategy:
+    """Resolve result totals from metadata, a TTL cache, bounded counts or samples."""
+
+    def __init__(
+        self,
+        exact_limit: int = 10000,
+        sample_size: int = 1000,
+        ttl: float = 30.0,
+        maxsize: int = 1000
+    ):
+        self.exact_limit = exact_limit
+        self.sample_size = sample_size
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def cache_key(collection_name: str, filter_query: Dict[str, Any], collation: Optional[Collation]) -> str:
+        """Canonical key for a filter; equal filters in any key order share it."""
+        return json_util.dumps(
+            {
+                "collection": collection_name,
+                "filter": filter_query,
+                "collation": collation.document if collation else None
+            },
+            sort_keys=True
+        )
+
+    async def count(
+        self,
+        collection,
+        filter_query: Dict[str, Any] = None,
+        collation: Optional[Collation] = None
+    ) -> ResultCount:
+        """
+        Return the number of documents matching a filter.
+
+        Args:
+            collection: Motor collection
+            filter_query: MongoDB filter; empty or None counts the collection
+            collation: Collation the filter must be evaluated with
+
+        Returns:
+            The total, marked inexact when estimated
+        """
+        if not filter_query:
+            # Read from collection metadata, without touching any index;
+            # not guaranteed exact, see the module docstring
+            return ResultCount(count=await collection.estimated_document_count(), exact=False)
+
+        key = self.cache_key(collection.name, filter_query, collation)
+        cached = self.cache.get(key)
+        if cached is not MISSING:
+            return cached
+
+        options = {"collation": collation} if collation else {}
+        count = await collection.count_documents(filter_query, limit=self.exact_limit, **options)
+        if count < self.exact_limit:
+            result = ResultCount(count=count)
+        else:
+            result = await self._estimate(collection, filter_query, options)
+
+        self.cache.set(key, result)
+        return result
+
+    async def _estimate(self, collection, filter_query: Dict[str, Any], options: Dict[str, Any]) -> ResultCount:
+        """Extrapolate a large total from the matching share of a random sample."""
+        floor = ResultCount(count=self.exact_limit, exact=False)
+        if "$text" in filter_query:
+            # $text must run first in a pipeline, so it cannot filter a sample
+            return floor
+
+        total = await collection.estimated_document_count()
+        pipeline = [
+            {"$sample": {"size": self.sample_size}},
+            {"$match": filter_query},
+            {"$count": "matched"}
+        ]
+        try:
+            result = await collection.aggregate(pipeline, **options).to_list(length=1)
+        except Exception as e:
+            logger.warning(f"Count sampling failed: {str(e)}")
+            return floor
+
+        matched = result[0]["matched"] if result else 0
+        sampled = min(self.sample_size, total) or 1
+        estimate = round(total * matched / sampled)
+        return ResultCount(count=max(estimate, self.exact_limit), exact=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return count cache counters."""
+        return self.cache.stats()
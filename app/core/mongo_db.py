@@ -2,17 +2,25 @@
 MongoDB connection utilities for off-chain data storage
 """
 
+import asyncio
 import motor.motor_asyncio
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING, DESCENDING
 from pymongo.server_api import ServerApi
-from typing import Dict, Any, List, Optional
-from bson import ObjectId
+from typing import Dict, Any, AsyncIterator, List, Optional
+from bson import ObjectId, json_util
+from bson.json_util import CANONICAL_JSON_OPTIONS
+import base64
 import json
 from datetime import datetime
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 import logging
 
 from app.core.config import settings
+from app.db.indexes import (
+    MARKET_STATS_INDEXES,
+    PROPERTY_SEARCH_INDEXES,
+    PROPERTY_SUMMARY_INDEXES,
+    RETIRED_PROPERTY_SEARCH_INDEXES,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,39 +39,104 @@ connection_options = {
 # Create MongoDB connection string from settings
 MONGO_CONNECTION_STRING = settings.MONGO_CONNECTION_STRING
 
-try:
-    # MongoDB async client (for FastAPI)
-    async_client = motor.motor_asyncio.AsyncIOMotorClient(
-        MONGO_CONNECTION_STRING, 
-        server_api=ServerApi('1'),
-        **connection_options
-    )
-    db = async_client[settings.MONGO_DB_NAME]
-    
-    # MongoDB sync client (for migrations and scripts)
-    sync_client = MongoClient(
-        MONGO_CONNECTION_STRING, 
-        server_api=ServerApi('1'),
-        **connection_options
-    )
-    sync_db = sync_client[settings.MONGO_DB_NAME]
-    
-    # Test connection
-    sync_client.admin.command('ping')
-    logger.info("Pinged MongoDB Atlas deployment. Successfully connected to MongoDB!")
+# Clients are created on first use rather than at import, so importing this
+# module never touches the network. The FastAPI lifespan creates the async
+# client at startup and closes it on shutdown.
+_async_client: Optional[motor.motor_asyncio.AsyncIOMotorClient] = None
+_sync_client: Optional[MongoClient] = None
+
+
+def get_async_client() -> motor.motor_asyncio.AsyncIOMotorClient:
+    """Return the MongoDB async client (for FastAPI), creating it on first use."""
+    global _async_client
+    if _async_client is None:
+        # Creating a client does not connect; connections are opened in the
+        # background and on the first operation
+        _async_client = motor.motor_asyncio.AsyncIOMotorClient(
+            MONGO_CONNECTION_STRING, 
+            server_api=ServerApi('1'),
+            **connection_options
+        )
+    return _async_client
+
+
+def get_database():
+    """Return the application database on the async client."""
+    return get_async_client()[settings.MONGO_DB_NAME]
+
+
+def get_sync_client() -> MongoClient:
+    """Return the MongoDB sync client (for migrations and scripts), creating it on first use."""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = MongoClient(
+            MONGO_CONNECTION_STRING, 
+            server_api=ServerApi('1'),
+            **connection_options
+        )
+    return _sync_client
+
+
+def get_sync_database():
+    """Return the application database on the sync client."""
+    return get_sync_client()[settings.MONGO_DB_NAME]
+
+
+async def check_mongodb_ready(timeout: float = 2.0) -> bool:
+    """
+    Check that MongoDB answers a ping.
     
-except ServerSelectionTimeoutError:
-    logger.error("Failed to connect to MongoDB Atlas: Server selection timeout")
-    # We don't want to crash the app during import, just log the error
-    # The actual connection will be tested during initialization
+    Args:
+        timeout: Seconds to wait for the ping
+        
+    Returns:
+        True if MongoDB responded in time, False otherwise
+    """
+    try:
+        await asyncio.wait_for(get_async_client().admin.command('ping'), timeout)
+        return True
+    except asyncio.TimeoutError:
+        logger.warning(f"MongoDB readiness check timed out after {timeout}s")
+    except Exception as e:
+        logger.warning(f"MongoDB readiness check failed: {str(e)}")
+    return False
+
+
+async def warm_up_connection_pool(connections: int = connection_options["minPoolSize"]) -> int:
+    """
+    Open pool connections ahead of the first requests.
     
-except ConnectionFailure:
-    logger.error("Failed to connect to MongoDB Atlas: Connection failure")
-    # We don't want to crash the app during import, just log the error
+    Runs concurrent pings so each one checks out its own connection.
+    Failures are logged, never raised.
     
-except Exception as e:
-    logger.error(f"Failed to connect to MongoDB Atlas: {str(e)}")
-    # We don't want to crash the app during import, just log the error
+    Args:
+        connections: Number of connections to open
+        
+    Returns:
+        Number of pings that succeeded
+    """
+    client = get_async_client()
+    results = await asyncio.gather(
+        *(client.admin.command('ping') for _ in range(connections)),
+        return_exceptions=True
+    )
+    succeeded = sum(1 for result in results if not isinstance(result, Exception))
+    if succeeded < connections:
+        logger.warning(f"MongoDB pool warm-up opened {succeeded} of {connections} connections")
+    else:
+        logger.info(f"MongoDB pool warm-up opened {connections} connections")
+    return succeeded
+
+
+def close_mongodb() -> None:
+    """Close any open MongoDB clients."""
+    global _async_client, _sync_client
+    if _async_client is not None:
+        _async_client.close()
+        _async_client = None
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
 
 
 class PyObjectId(ObjectId):
@@ -86,7 +159,7 @@ class PyObjectId(ObjectId):
 
 async def get_collection(collection_name: str):
     """Get a collection from the database."""
-    return db[collection_name]
+    return get_database()[collection_name]
 
 
 def json_serialize_mongodb(obj: Any) -> Any:
@@ -99,24 +172,23 @@ def json_serialize_mongodb(obj: Any) -> Any:
 
 
 def format_document_for_response(document: Dict) -> Dict:
-    """Format a MongoDB document for API response."""
+    """
+    Format a MongoDB document for API response.
+    
+    Renames _id to id and converts top-level ObjectId values to strings.
+    Nested documents are left as stored; walking them on every read costs
+    more than it is worth for fields lists never render.
+    """
     if document is None:
         return None
     
     # Convert _id to id
     if "_id" in document:
-        document["id"] = str(document["_id"])
-        del document["_id"]
+        document["id"] = str(document.pop("_id"))
     
-    # Handle nested documents
     for key, value in document.items():
-        if isinstance(value, dict):
-            document[key] = format_document_for_response(value)
-        elif isinstance(value, list):
-            document[key] = [
-                format_document_for_response(item) if isinstance(item, dict) else item
-                for item in value
-            ]
+        if isinstance(value, ObjectId):
+            document[key] = str(value)
     
     return document
 
@@ -135,10 +207,14 @@ async def create_document(collection_name: str, document: Dict) -> str:
     return str(result.inserted_id)
 
 
-async def get_document(collection_name: str, document_id: str) -> Optional[Dict]:
-    """Get a document by ID."""
+async def get_document(
+    collection_name: str,
+    document_id: str,
+    projection: Optional[Dict] = None
+) -> Optional[Dict]:
+    """Get a document by ID, optionally returning only the projected fields."""
     collection = await get_collection(collection_name)
-    document = await collection.find_one({"_id": ObjectId(document_id)})
+    document = await collection.find_one({"_id": ObjectId(document_id)}, projection)
     return format_document_for_response(document) if document else None
 
 
@@ -163,40 +239,191 @@ async def delete_document(collection_name: str, document_id: str) -> bool:
     return result.deleted_count > 0
 
 
+def _normalize_sort(sort: List = None) -> List:
+    """Return sort keys with _id appended as a unique tie-breaker."""
+    sort = list(sort or [])
+    if not any(field == "_id" for field, _ in sort):
+        direction = sort[-1][1] if sort else ASCENDING
+        sort.append(("_id", direction))
+    return sort
+
+
+def _projection_with_sort_fields(projection: Optional[Dict], sort: List) -> Optional[Dict]:
+    """Add sort fields to an inclusion projection."""
+    if not projection or not any(value for field, value in projection.items() if field != "_id"):
+        # None, empty or exclusion-only projections already return sort fields
+        return projection
+    projection = dict(projection)
+    for field, _ in sort:
+        projection[field] = 1
+    return projection
+
+
+def _get_sort_value(document: Dict, field: str) -> Any:
+    """Read a (possibly dotted) sort field from a formatted document."""
+    if field == "_id":
+        value = document.get("_id", document.get("id"))
+        return ObjectId(value) if isinstance(value, str) and ObjectId.is_valid(value) else value
+    value = document
+    for part in field.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def encode_cursor(document: Dict, sort: List = None) -> str:
+    """Encode the sort key of a document as an opaque pagination cursor."""
+    values = [_get_sort_value(document, field) for field, _ in _normalize_sort(sort)]
+    payload = json_util.dumps(values, json_options=CANONICAL_JSON_OPTIONS)
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a pagination cursor produced by encode_cursor."""
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid pagination cursor")
+    return values
+
+
+def keyset_query(filter_query: Dict = None, sort: List = None, cursor: str = None) -> Dict:
+    """
+    Restrict a filter to documents that sort strictly after a cursor.
+    
+    For sort keys (k1, k2, _id) this builds
+    {k1 > v1} OR {k1 = v1, k2 > v2} OR {k1 = v1, k2 = v2, _id > id},
+    with > flipped to < for descending keys, so the server can seek
+    straight to the next page through the sort index.
+    
+    Null and missing keys sort before every other value, which $gt/$lt
+    comparisons never match: after a null key an ascending sort continues
+    with every non-null key and a descending one with none, and a
+    descending sort reaches the null keys after all the others.
+    """
+    filter_query = filter_query or {}
+    if not cursor:
+        return filter_query
+    
+    sort = _normalize_sort(sort)
+    values = decode_cursor(cursor)
+    if len(values) != len(sort):
+        raise ValueError("Pagination cursor does not match the sort order")
+    
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        branch = {prev_field: values[j] for j, (prev_field, _) in enumerate(sort[:i])}
+        if values[i] is None:
+            if direction != ASCENDING:
+                continue
+            branch[field] = {"$ne": None}
+        elif direction == ASCENDING:
+            branch[field] = {"$gt": values[i]}
+        elif field == "_id":
+            branch[field] = {"$lt": values[i]}
+        else:
+            branch["$or"] = [{field: {"$lt": values[i]}}, {field: None}]
+        branches.append(branch)
+    
+    keyset = {"$or": branches}
+    return {"$and": [filter_query, keyset]} if filter_query else keyset
+
+
+def get_next_cursor(documents: List[Dict], sort: List = None, limit: int = 100) -> Optional[str]:
+    """Return the cursor for the page after documents, or None on the last page."""
+    if not documents or len(documents) < limit:
+        return None
+    return encode_cursor(documents[-1], sort)
+
+
 async def list_documents(
     collection_name: str, 
     filter_query: Dict = None, 
     skip: int = 0, 
     limit: int = 100,
-    sort: List = None
+    sort: List = None,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict] = None
 ) -> List[Dict]:
-    """List documents with pagination and filtering."""
+    """
+    List documents with pagination and filtering.
+    
+    Pages by offset with skip, or by keyset when a cursor from
+    get_next_cursor is passed. Keyset pages cost the same at any depth and
+    do not shift when documents are inserted between requests. A projection
+    limits the fields fetched; sort fields are always included so the next
+    cursor can be built.
+    """
     collection = await get_collection(collection_name)
     
     # Default empty filter
     if filter_query is None:
         filter_query = {}
     
-    # Execute query with pagination
-    cursor = collection.find(filter_query).skip(skip).limit(limit)
+    # _id breaks ties so every document has a unique position
+    sort = _normalize_sort(sort)
     
-    # Apply sorting if provided
-    if sort:
-        cursor = cursor.sort(sort)
+    projection = _projection_with_sort_fields(projection, sort)
+    
+    if cursor:
+        query = collection.find(keyset_query(filter_query, sort, cursor), projection)
+    else:
+        query = collection.find(filter_query, projection).skip(skip)
+    
+    query = query.sort(sort).limit(limit)
     
     # Get and format results
-    documents = await cursor.to_list(length=limit)
+    documents = await query.to_list(length=limit)
     return [format_document_for_response(doc) for doc in documents]
 
 
+async def stream_documents(
+    collection_name: str,
+    filter_query: Dict = None,
+    sort: List = None,
+    projection: Optional[Dict] = None,
+    batch_size: int = 1000
+) -> AsyncIterator[Dict]:
+    """
+    Iterate over every matching document without loading them all.
+    
+    The cursor fetches batch_size documents per round trip, so memory use
+    stays bounded by one batch however many documents match.
+    """
+    collection = await get_collection(collection_name)
+    cursor = collection.find(filter_query or {}, projection).sort(_normalize_sort(sort)).batch_size(batch_size)
+    try:
+        async for document in cursor:
+            yield format_document_for_response(document)
+    finally:
+        # Release the server-side cursor if the consumer stops early
+        await cursor.close()
+
+
 # Helper functions for GridFS (file storage)
 async def setup_collections():
     """Set up MongoDB collections with initial indexes."""
     try:
         logger.info("Setting up MongoDB collections and indexes...")
+        db = get_database()
         
         # Property collection indexes
         await db.properties.create_index("blockchain_id", unique=True, sparse=True)
+        for keys, options in PROPERTY_SEARCH_INDEXES:
+            await db.properties.create_index(keys, **options)
+        existing = await db.properties.index_information()
+        for name in RETIRED_PROPERTY_SEARCH_INDEXES:
+            if name in existing:
+                await db.properties.drop_index(name)
+        
+        # Property summary read model indexes (covering list queries)
+        for keys, options in PROPERTY_SUMMARY_INDEXES:
+            await db.property_summaries.create_index(keys, **options)
+        
+        # Market statistics, read by city and property type
+        for keys, options in MARKET_STATS_INDEXES:
+            await db.market_stats.create_index(keys, **options)
         
         # User collection indexes
         await db.users.create_index("email", unique=True)
@@ -206,12 +433,20 @@ async def setup_collections():
         await db.proposals.create_index("property_id")
         await db.proposals.create_index("tenant_id")
         
+        # Rental info, one counter document per property; unique so
+        # concurrent upserted increments cannot create duplicates
+        await db.rental_info.create_index("property_id", unique=True)
+        
         # Contract collection indexes
         await db.contracts.create_index("blockchain_id", unique=True, sparse=True)
         await db.contracts.create_index("property_id")
         
         # Photos collection indexes
-        await db.property_photos.create_index("property_id")
+        # Batched photo loading matches on property_id and returns the
+        # primary photo first
+        await db.property_photos.create_index(
+            [("property_id", ASCENDING), ("is_primary", DESCENDING), ("created_at", ASCENDING)]
+        )
         
         # Document collection indexes
         await db.documents.create_index("user_id")
@@ -0,0 +1,63 @@
+"""
+Merge duplicate rental_info documents before the unique property_id index is built.
+
+The old check-then-insert proposal counter could create two rental_info
+documents for one property under concurrent proposals. This keeps the
+oldest document of each property, adds the counts of the others to it and
+deletes them, so the unique index on rental_info.property_id can be created.
+
+Usage:
+    python -m app.db.dedupe_rental_info
+"""
+
+import asyncio
+import logging
+
+from pymongo import DeleteMany, UpdateOne
+
+from app.core.mongo_db import close_mongodb, get_collection
+
+logger = logging.getLogger(__name__)
+
+DUPLICATES_PIPELINE = [
+    {"$sort": {"created_at": 1, "_id": 1}},
+    {"$group": {
+        "_id": "$property_id",
+        "ids": {"$push": "$_id"},
+        "number_of_proposals": {"$sum": "$number_of_proposals"},
+        "count": {"$sum": 1},
+    }},
+    {"$match": {"count": {"$gt": 1}}},
+]
+
+
+async def dedupe_rental_info() -> int:
+    """
+    Merge rental_info documents sharing a property_id.
+
+    Returns:
+        Number of properties that had duplicates
+    """
+    try:
+        collection = await get_collection("rental_info")
+        requests = []
+        async for group in collection.aggregate(DUPLICATES_PIPELINE, allowDiskUse=True):
+            keep, *duplicates = group["ids"]
+            requests.append(UpdateOne({"_id": keep}, {"$set": {"number_of_proposals": group["number_of_proposals"]}}))
+            requests.append(DeleteMany({"_id": {"$in": duplicates}}))
+        if requests:
+            await collection.bulk_write(requests, ordered=True)
+        merged = len(requests) // 2
+        logger.info(f"Merged duplicate rental_info documents of {merged} properties")
+        return merged
+    finally:
+        close_mongodb()
+
+
+if __name__ == "__main__":
+    # Run the merge when script is called directly
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    asyncio.run(dedupe_rental_info())
@@ -0,0 +1,56 @@
+"""
+Bulk import property listings from an NDJSON or CSV file.
+
+Usage:
+    python -m app.db.import_properties listings.ndjson --owner-id <user id>
+    python -m app.db.import_properties listings.csv --owner-id <user id> --chunk-size 5000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from app.core.mongo_db import close_mongodb
+from app.services.property_import import (
+    DEFAULT_CHUNK_SIZE,
+    IMPORT_FORMATS,
+    detect_format,
+    import_properties
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def run_import(path: str, owner_id: str, import_format: str, chunk_size: int):
+    """Import one file and close the database clients afterwards."""
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            return await import_properties(f, owner_id, import_format, chunk_size)
+    finally:
+        close_mongodb()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk import property listings")
+    parser.add_argument("path", help="NDJSON or CSV file")
+    parser.add_argument("--owner-id", required=True, help="Owner of the imported listings")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Inferred from the file name if omitted")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows inserted per batch")
+    args = parser.parse_args()
+
+    import_format = args.format or detect_format(args.path)
+    result = asyncio.run(run_import(args.path, args.owner_id, import_format, args.chunk_size))
+
+    print(json.dumps(result.dict(), indent=2))
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    # Run the import when script is called directly
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    sys.exit(main())
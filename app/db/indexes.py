@@ -0,0 +1,100 @@
+"""
+MongoDB index definitions shared by the async and sync initializers.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+from pymongo import ASCENDING, GEOSPHERE, TEXT
+from pymongo.collation import Collation
+
+# Case-insensitive collation for location matching. Queries must pass the same
+# collation to be able to use the search indexes below.
+SEARCH_COLLATION = Collation(locale="en", strength=2)
+
+# Compound indexes for property search, ordered Equality -> Sort -> Range.
+# status is (almost) always an equality match, followed by the most selective
+# equality filters, then the search sort (price, with _id as the keyset
+# pagination tie-breaker; price is also the most common range filter).
+# Bedrooms is only ever filtered by range, so it comes after the sort keys:
+# the index still filters on it without fetching documents, and searches
+# sorted by price never need an in-memory SORT.
+PROPERTY_SEARCH_INDEXES: List[Tuple[List[Tuple[str, int]], Dict[str, Any]]] = [
+    (
+        [
+            ("status", ASCENDING), ("address.city", ASCENDING),
+            ("price", ASCENDING), ("_id", ASCENDING), ("bedrooms", ASCENDING)
+        ],
+        {"name": "search_status_city_price_bedrooms", "collation": SEARCH_COLLATION}
+    ),
+    (
+        [("status", ASCENDING), ("property_type", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)],
+        {"name": "search_status_type_price_id", "collation": SEARCH_COLLATION}
+    ),
+    (
+        [("status", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING), ("bedrooms", ASCENDING)],
+        {"name": "search_status_price_bedrooms", "collation": SEARCH_COLLATION}
+    ),
+    # Radius and bounding-box searches. Listings without coordinates have no
+    # location and are left out of this index.
+    (
+        [("location", GEOSPHERE), ("status", ASCENDING), ("price", ASCENDING)],
+        {"name": "search_location_status_price", "collation": SEARCH_COLLATION}
+    ),
+    # Keyword search. A collection can have only one text index, and text
+    # indexes do not support collations. Title matches outrank description.
+    (
+        [("title", TEXT), ("description", TEXT)],
+        {
+            "name": "search_text",
+            "weights": {"title": 10, "description": 2},
+            "default_language": "english"
+        }
+    ),
+]
+
+# Search indexes replaced by the ones above, which also serve the queries
+# of their status/city/price and status/price prefixes. Dropped on startup
+# so every write stops paying for them.
+RETIRED_PROPERTY_SEARCH_INDEXES = [
+    "search_status_city_price",
+    "search_status_city_bedrooms_price",
+    "search_status_type_price",
+    "search_status_bedrooms_price",
+    "search_status_price",
+]
+
+# Fields of a property_summaries document returned to listing pages. Each
+# index below contains all of them after its equality and sort keys, so list
+# queries projecting these fields are covered: answered from the index alone
+# without fetching documents. No collation here, since collation-aware
+# indexes cannot cover string fields; city filters use the lowercased
+# city_key instead.
+PROPERTY_SUMMARY_FIELDS = [
+    "title", "price", "currency", "city", "state", "bedrooms",
+    "property_type", "status", "owner_id", "cover_photo_url",
+    "proposal_count", "created_at",
+]
+
+
+def _covering(keys: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+    """Append the _id tie-breaker and the remaining summary fields to index keys."""
+    keys = keys + [("_id", ASCENDING)]
+    present = {field for field, _ in keys}
+    return keys + [(field, ASCENDING) for field in PROPERTY_SUMMARY_FIELDS if field not in present]
+
+
+MARKET_STATS_INDEXES: List[Tuple[List[Tuple[str, int]], Dict[str, Any]]] = [
+    ([("city_key", ASCENDING), ("property_type", ASCENDING)], {"name": "market_stats_city_type"}),
+]
+
+PROPERTY_SUMMARY_INDEXES: List[Tuple[List[Tuple[str, int]], Dict[str, Any]]] = [
+    (_covering([("status", ASCENDING), ("price", ASCENDING)]), {"name": "summary_status_price"}),
+    (
+        _covering([("status", ASCENDING), ("city_key", ASCENDING), ("price", ASCENDING)]),
+        {"name": "summary_status_city_price"}
+    ),
+    (
+        _covering([("owner_id", ASCENDING), ("created_at", ASCENDING)]),
+        {"name": "summary_owner_created"}
+    ),
+]
@@ -5,13 +5,19 @@ Sets up MongoDB collections, indexes, and initial data.
 
 import asyncio
 import logging
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING, DESCENDING
 from pymongo.server_api import ServerApi
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.core.config import settings
 from app.core.mongo_db import setup_collections
+from app.db.indexes import (
+    MARKET_STATS_INDEXES,
+    PROPERTY_SEARCH_INDEXES,
+    PROPERTY_SUMMARY_INDEXES,
+    RETIRED_PROPERTY_SEARCH_INDEXES,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +67,20 @@ def init_mongodb_sync():
         # Create indexes for collections
         # Property collection indexes
         db.properties.create_index("blockchain_id", unique=True, sparse=True)
+        for keys, options in PROPERTY_SEARCH_INDEXES:
+            db.properties.create_index(keys, **options)
+        existing = db.properties.index_information()
+        for name in RETIRED_PROPERTY_SEARCH_INDEXES:
+            if name in existing:
+                db.properties.drop_index(name)
+        
+        # Property summary read model indexes (covering list queries)
+        for keys, options in PROPERTY_SUMMARY_INDEXES:
+            db.property_summaries.create_index(keys, **options)
+        
+        # Market statistics, read by city and property type
+        for keys, options in MARKET_STATS_INDEXES:
+            db.market_stats.create_index(keys, **options)
         
         # User collection indexes
         db.users.create_index("email", unique=True)
@@ -70,12 +90,18 @@ def init_mongodb_sync():
         db.proposals.create_index("property_id")
         db.proposals.create_index("tenant_id")
         
+        # Rental info, one counter document per property; unique so
+        # concurrent upserted increments cannot create duplicates
+        db.rental_info.create_index("property_id", unique=True)
+        
         # Contract collection indexes
         db.contracts.create_index("blockchain_id", unique=True, sparse=True)
         db.contracts.create_index("property_id")
         
         # Photos collection indexes
-        db.property_photos.create_index("property_id")
+        db.property_photos.create_index(
+            [("property_id", ASCENDING), ("is_primary", DESCENDING), ("created_at", ASCENDING)]
+        )
         
         # Document collection indexes
         db.documents.create_index("user_id")
@@ -0,0 +1,36 @@
+"""
+Rebuild the market_stats collection from the available properties.
+
+The application rebuilds market statistics on a schedule when
+MARKET_STATS_JOB_ENABLED is set; run this to build them right away, e.g.
+after a bulk import, or from an external scheduler instead.
+
+Usage:
+    python -m app.db.rebuild_market_stats
+"""
+
+import asyncio
+import logging
+
+from app.core.mongo_db import close_mongodb, setup_collections
+from app.services.market_stats_service import MarketStatsService
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_market_stats() -> int:
+    """Ensure the stats indexes exist, then recompute every market."""
+    try:
+        await setup_collections()
+        return await MarketStatsService.rebuild()
+    finally:
+        close_mongodb()
+
+
+if __name__ == "__main__":
+    # Run the rebuild when script is called directly
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    asyncio.run(rebuild_market_stats())
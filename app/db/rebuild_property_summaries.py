@@ -0,0 +1,36 @@
+"""
+Rebuild the property_summaries read model from the source collections.
+
+Run after restoring a backup, after changing the summary fields, or if
+summaries are suspected to have drifted from the properties they describe.
+
+Usage:
+    python -m app.db.rebuild_property_summaries
+"""
+
+import asyncio
+import logging
+
+from app.core.mongo_db import close_mongodb, setup_collections
+from app.services.property_summary_service import PropertySummaryService
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_property_summaries() -> int:
+    """Ensure the summary indexes exist, then rebuild every summary."""
+    try:
+        # Indexes first: $out keeps the indexes of the collection it replaces
+        await setup_collections()
+        return await PropertySummaryService.rebuild()
+    finally:
+        close_mongodb()
+
+
+if __name__ == "__main__":
+    # Run the rebuild when script is called directly
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    asyncio.run(rebuild_property_summaries())
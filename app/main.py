@@ -2,7 +2,9 @@
 Main FastAPI application.
 """
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
@@ -14,9 +16,20 @@ from fastapi.openapi.redoc import get_redoc_html
 import uvicorn
 from typing import List
 
-from app.routers import auth_router, property_router, proposal_router, metadata_router
+from app.routers import auth_router, property_router, proposal_router, metadata_router, export_router
 from app.core.config import settings
 from app.core.openapi import custom_openapi
+from app.core.change_stream import ChangeStreamWatcher
+from app.core.mongo_db import (
+    check_mongodb_ready,
+    close_mongodb,
+    get_async_client,
+    warm_up_connection_pool
+)
+from app.services.location_autocomplete import location_autocomplete
+from app.services.market_stats_service import market_stats_job
+from app.services.property_service import listing_index, similar_index
+from app.services.proposal_counter import proposal_counter_buffer
 
 # Configure logging
 logging.basicConfig(
@@ -24,6 +37,54 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create database clients on startup and close them on shutdown."""
+    # Creating the client does not wait for the database, so startup time
+    # does not depend on database latency; /health/ready reports readiness.
+    get_async_client()
+    warm_up = None
+    if settings.MONGO_WARM_UP_POOL:
+        warm_up = asyncio.create_task(warm_up_connection_pool())
+    
+    # Keep this worker's caches in step with writes made by other workers
+    watcher = None
+    if settings.CHANGE_STREAM_ENABLED:
+        watcher = ChangeStreamWatcher(
+            name=settings.CHANGE_STREAM_NAME,
+            checkpoint_interval=settings.CHANGE_STREAM_CHECKPOINT_INTERVAL
+        )
+        watcher.start()
+    app.state.change_stream_watcher = watcher
+    
+    # Searches use MongoDB until the listing index has loaded
+    index_load = None
+    if settings.LISTING_INDEX_ENABLED:
+        index_load = asyncio.create_task(listing_index.load())
+    similar_load = None
+    if settings.SIMILAR_PROPERTIES_PRELOAD:
+        similar_load = asyncio.create_task(similar_index.ensure_loaded())
+    
+    # Location names and counts change slowly; refresh them in the background
+    location_autocomplete.start()
+    if settings.MARKET_STATS_JOB_ENABLED:
+        market_stats_job.start()
+    if settings.PROPOSAL_COUNTER_BUFFERED:
+        proposal_counter_buffer.start()
+    
+    yield
+    
+    # Write buffered proposal counts before the client closes
+    await proposal_counter_buffer.stop()
+    await market_stats_job.stop()
+    await location_autocomplete.stop()
+    if watcher is not None:
+        await watcher.stop()
+    for task in (warm_up, index_load, similar_load):
+        if task is not None and not task.done():
+            task.cancel()
+    close_mongodb()
+
 # Create FastAPI application
 app = FastAPI(
     title="SmartRent API",
@@ -31,7 +92,8 @@ app = FastAPI(
     version="0.5.0",
     openapi_url="/api/openapi.json",
     docs_url=None,
-    redoc_url=None
+    redoc_url=None,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -55,6 +117,7 @@ app.add_middleware(
 # Include routers
 app.include_router(auth_router)
 app.include_router(property_router)
+app.include_router(export_router)
 app.include_router(
     proposal_router, 
     prefix="/api/v1/proposals", 
@@ -114,6 +177,16 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "ok"}
 
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness check: succeeds once MongoDB answers a ping"""
+    if not await check_mongodb_ready(settings.MONGO_READY_TIMEOUT):
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "mongodb": "unreachable"}
+        )
+    return {"status": "ok", "mongodb": "ok"}
+
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     import time
@@ -0,0 +1,390 @@
+"""
+Rate limit storage backends.
+
+Every backend implements the generic cell rate algorithm (GCRA), a sliding
+window keeping one value per client key: the theoretical arrival time
+(TAT) of the next request. Each request moves it window / limit into the
+future; a request is denied when that would put it more than one window
+ahead, and the key expires once the TAT has passed.
+
+- RedisBackend shares limits across workers and hosts, running the
+  algorithm atomically in a Lua script.
+- MemoryBackend keeps limits in process, without a network hop, for
+  single-node deployments and tests.
+- ShardedMemoryBackend splits keys over several locked memory backends,
+  so threads sharing one limiter do not contend on a single lock.
+
+LeasedRateLimiter sits on top of a remote backend and admits requests
+from per-worker leases of its quota.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import redis.asyncio as aioredis
+from redis.exceptions import NoScriptError
+
+from app.core.cache import LRUCache
+
+RATE_LIMIT_MAX_CONNECTIONS = 50   # pooled connections per worker
+RATE_LIMIT_POOL_TIMEOUT = 1.0     # seconds to wait for a free connection
+RATE_LIMIT_SOCKET_TIMEOUT = 0.5   # seconds before a slow Redis counts as down
+
+# Leases take up to ARGV[3] requests at once, granting what is available
+# as long as it is at least ARGV[4]. Times are in ms on the Redis clock.
+#
+# KEYS[1]  client key
+# ARGV[1]  limit (requests per window)
+# ARGV[2]  window in ms
+# ARGV[3]  cost of this request, or requests wanted for a lease
+# ARGV[4]  fewest requests to grant
+# Returns {granted, remaining, reset_ms, retry_ms}; granted is 0 when denied
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local min_cost = tonumber(ARGV[4])
+local interval = window / limit
+
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local tat = tonumber(redis.call("GET", KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+-- Requests that fit before the TAT is a full window ahead; the epsilon
+-- absorbs rounding of fractional intervals
+local available = math.floor((window - (tat - now)) / interval + 1e-9)
+local granted = math.min(cost, available)
+if granted < min_cost then
+    local retry = math.ceil(tat + min_cost * interval - window - now)
+    return {0, math.max(available, 0), math.ceil(tat - now), retry}
+end
+
+local new_tat = tat + granted * interval
+redis.call("SET", KEYS[1], new_tat, "PX", math.ceil(new_tat - now))
+return {granted, available - granted, math.ceil(new_tat - now), 0}
+"""
+GCRA_SHA = hashlib.sha1(GCRA_SCRIPT.encode()).hexdigest()
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of one rate limit decision."""
+
+    allowed: bool
+    remaining: int
+    reset_after: float  # seconds until the full limit is available again
+    retry_after: float  # seconds until a request is allowed; 0 when allowed
+    granted: int = 1    # requests granted, more than one for leases
+
+    def reset_time(self) -> int:
+        """Epoch second for X-RateLimit-Reset: the retry time when denied."""
+        wait = self.reset_after if self.allowed else self.retry_after
+        return int(time.time()) + math.ceil(wait)
+
+
+def gcra(
+    tat: Optional[float],
+    now: float,
+    limit: int,
+    window_ms: float,
+    cost: int,
+    min_cost: int
+) -> Tuple[Optional[float], RateLimitResult]:
+    """
+    Apply one GCRA decision, exactly as GCRA_SCRIPT does.
+
+    Returns:
+        The new TAT to store (None when denied) and the decision
+    """
+    interval = window_ms / limit
+    if tat is None or tat < now:
+        tat = now
+
+    available = math.floor((window_ms - (tat - now)) / interval + 1e-9)
+    granted = min(cost, available)
+    if granted < min_cost:
+        retry = math.ceil(tat + min_cost * interval - window_ms - now)
+        return None, RateLimitResult(False, max(available, 0), math.ceil(tat - now) / 1000, retry / 1000, 0)
+
+    new_tat = tat + granted * interval
+    return new_tat, RateLimitResult(True, available - granted, math.ceil(new_tat - now) / 1000, 0.0, granted)
+
+
+class RateLimitBackend:
+    """Storage for rate limit state; subclasses implement check()."""
+
+    # Whether decisions cost a network round trip, so leasing pays off
+    supports_leases = False
+
+    async def check(
+        self,
+        key: str,
+        limit: int,
+        window: int,
+        cost: int = 1,
+        min_cost: Optional[int] = None
+    ) -> RateLimitResult:
+        """
+        Decide whether a request is allowed and record it if so.
+
+        Args:
+            key: Key of the client and limit
+            limit: Maximum number of requests in the window
+            window: Time window in seconds
+            cost: Requests this call counts as
+            min_cost: Fewest requests to grant when fewer than cost are available
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release connections held by the backend."""
+
+    def stats(self) -> Dict[str, Any]:
+        """Return backend counters."""
+        return {}
+
+
+def create_redis_client(redis_url: str) -> aioredis.Redis:
+    """
+    Create an asyncio Redis client on a bounded, blocking connection pool.
+
+    When every connection is busy, callers wait up to RATE_LIMIT_POOL_TIMEOUT
+    for one instead of opening more; the timeout surfaces as a RedisError,
+    which the limiter treats like Redis being down.
+    """
+    pool = aioredis.BlockingConnectionPool.from_url(
+        redis_url,
+        max_connections=RATE_LIMIT_MAX_CONNECTIONS,
+        timeout=RATE_LIMIT_POOL_TIMEOUT,
+        socket_timeout=RATE_LIMIT_SOCKET_TIMEOUT,
+        socket_connect_timeout=RATE_LIMIT_SOCKET_TIMEOUT,
+    )
+    return aioredis.Redis(connection_pool=pool)
+
+
+class RedisBackend(RateLimitBackend):
+    """
+    Limits shared through Redis.
+
+    Runs GCRA_SCRIPT by SHA, so a decision is one round trip carrying a few
+    bytes; after a Redis restart or SCRIPT FLUSH the first call falls back
+    to EVAL, which caches the script again. Redis errors are raised to the
+    caller, which decides whether to fail open.
+    """
+
+    supports_leases = True
+
+    def __init__(self, redis_url: str):
+        self.redis_url = redis_url
+        self._client: Optional[aioredis.Redis] = None
+        self.calls = 0
+
+    @property
+    def client(self) -> aioredis.Redis:
+        if self._client is None:
+            self._client = create_redis_client(self.redis_url)
+        return self._client
+
+    async def check(
+        self,
+        key: str,
+        limit: int,
+        window: int,
+        cost: int = 1,
+        min_cost: Optional[int] = None
+    ) -> RateLimitResult:
+        self.calls += 1
+        args = (limit, window * 1000, cost, cost if min_cost is None else min_cost)
+        try:
+            granted, remaining, reset_ms, retry_ms = await self.client.evalsha(GCRA_SHA, 1, key, *args)
+        except NoScriptError:
+            granted, remaining, reset_ms, retry_ms = await self.client.eval(GCRA_SCRIPT, 1, key, *args)
+        return RateLimitResult(granted > 0, remaining, reset_ms / 1000, retry_ms / 1000, granted)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            await self._client.connection_pool.disconnect()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", "calls": self.calls}
+
+
+class MemoryBackend(RateLimitBackend):
+    """
+    Limits kept in this process.
+
+    One TAT per key in a bounded LRU cache, each entry expiring when its TAT
+    passes, so idle clients cost nothing and memory stays at maxsize keys.
+    Limits are per process: with several workers, each enforces its own.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self.tats = LRUCache(maxsize=maxsize, ttl=60.0)
+        self._lock = threading.Lock()
+
+    async def check(
+        self,
+        key: str,
+        limit: int,
+        window: int,
+        cost: int = 1,
+        min_cost: Optional[int] = None
+    ) -> RateLimitResult:
+        return self.check_now(key, limit, window, cost, min_cost)
+
+    def check_now(
+        self,
+        key: str,
+        limit: int,
+        window: int,
+        cost: int = 1,
+        min_cost: Optional[int] = None
+    ) -> RateLimitResult:
+        """Synchronous check(), safe to call from any thread."""
+        with self._lock:
+            now = time.monotonic() * 1000
+            new_tat, result = gcra(
+                self.tats.get(key, None), now, limit, window * 1000, cost, cost if min_cost is None else min_cost
+            )
+            if new_tat is not None:
+                self.tats.set(key, new_tat, ttl=(new_tat - now) / 1000)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "keys": len(self.tats), "evictions": self.tats.evictions}
+
+
+class ShardedMemoryBackend(RateLimitBackend):
+    """In-process limits split by key hash over independently locked shards."""
+
+    def __init__(self, shards: int = 16, maxsize: int = 100_000):
+        self.shards: List[MemoryBackend] = [MemoryBackend(max(1, maxsize // shards)) for _ in range(shards)]
+
+    def shard(self, key: str) -> MemoryBackend:
+        return self.shards[hash(key) % len(self.shards)]
+
+    async def check(
+        self,
+        key: str,
+        limit: int,
+        window: int,
+        cost: int = 1,
+        min_cost: Optional[int] = None
+    ) -> RateLimitResult:
+        return self.shard(key).check_now(key, limit, window, cost, min_cost)
+
+    def check_now(
+        self,
+        key: str,
+        limit: int,
+        window: int,
+        cost: int = 1,
+        min_cost: Optional[int] = None
+    ) -> RateLimitResult:
+        """Synchronous check(), safe to call from any thread."""
+        return self.shard(key).check_now(key, limit, window, cost, min_cost)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "sharded-memory",
+            "shards": len(self.shards),
+            "keys": sum(len(shard.tats) for shard in self.shards),
+            "evictions": sum(shard.tats.evictions for shard in self.shards),
+        }
+
+
+BACKENDS = {
+    "redis": RedisBackend,
+    "memory": MemoryBackend,
+    "sharded-memory": ShardedMemoryBackend,
+}
+
+
+def create_backend(name: str, redis_url: Optional[str] = None) -> RateLimitBackend:
+    """Create a backend by name: "redis", "memory" or "sharded-memory"."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown rate limit backend: {name}")
+    if name == "redis":
+        if not redis_url:
+            raise ValueError("The redis rate limit backend needs a redis_url")
+        return RedisBackend(redis_url)
+    return BACKENDS[name]()
+
+
+class _Lease:
+    """Requests a worker holds for one client key."""
+
+    __slots__ = ("tokens", "remaining", "reset_at", "retry_at")
+
+    def __init__(self):
+        self.tokens = 0
+        self.remaining = 0
+        self.reset_at = 0.0
+        self.retry_at = 0.0
+
+
+class LeasedRateLimiter:
+    """
+    Per-worker token buckets leasing quota from a remote backend.
+
+    Instead of one round trip per request, a worker takes up to `lease`
+    requests of a client's quota from the backend at once and admits from
+    them locally, going back to the backend when they run out. Denials are
+    remembered until their retry time, so limited clients do not hit the
+    backend either.
+
+    Leased requests are taken from the shared quota when leased, so the
+    backend never admits more than the limit; they are only spent later. A
+    worker holds at most `lease` requests per key, for at most the time
+    they take to regenerate, so clients can exceed the limit in a window by
+    at most `lease` requests per worker. Unspent requests of expired leases
+    are lost, so a client spread across workers may be limited slightly
+    early.
+    """
+
+    def __init__(self, backend: RateLimitBackend, maxsize: int = 100_000):
+        self.backend = backend
+        self.leases = LRUCache(maxsize=maxsize, ttl=60.0)
+        self.backend_calls = 0
+        self.local_decisions = 0
+
+    async def check(self, key: str, limit: int, window: int, lease: int) -> RateLimitResult:
+        """Decide whether a request is allowed, from a local lease when possible."""
+        now = time.monotonic()
+        entry = self.leases.get(key, None)
+        if entry is not None and (entry.tokens > 0 or entry.retry_at > now):
+            self.local_decisions += 1
+            if entry.tokens > 0:
+                entry.tokens -= 1
+                return RateLimitResult(True, entry.remaining + entry.tokens, max(0.0, entry.reset_at - now), 0.0)
+            return RateLimitResult(False, 0, max(0.0, entry.reset_at - now), entry.retry_at - now)
+
+        self.backend_calls += 1
+        result = await self.backend.check(key, limit, window, cost=lease, min_cost=1)
+        now = time.monotonic()
+        entry = self.leases.get(key, None) or _Lease()
+        entry.remaining = result.remaining
+        entry.reset_at = now + result.reset_after
+        if result.allowed:
+            # Refills racing for one key may grant more than a lease; holding
+            # no more than one keeps the overshoot bound
+            entry.tokens = min(entry.tokens + result.granted - 1, lease - 1)
+            entry.retry_at = 0.0
+            ttl = lease * window / limit
+        else:
+            entry.retry_at = now + result.retry_after
+            ttl = result.retry_after
+        self.leases.set(key, entry, ttl=ttl)
+        return RateLimitResult(result.allowed, entry.remaining + entry.tokens, result.reset_after, result.retry_after)
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many decisions were made locally and how many in the backend."""
+        return {"keys": len(self.leases), "backend_calls": self.backend_calls, "local_decisions": self.local_decisions}
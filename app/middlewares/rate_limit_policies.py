@@ -0,0 +1,167 @@
+"""
+Route-to-limit policies for the rate limiter.
+
+Policies are declared as a table of rules, each matching a path prefix
+and optionally HTTP methods and user roles, and compiled once into a trie
+of path segments. Matching a request walks the trie along its path once,
+so a lookup costs time proportional to the path length whatever the
+number of rules, with no hashing or scanning of rules per request.
+
+A rule names a tier of rate limits, overrides its limit, window or lease,
+or both. The deepest matching prefix wins; the rules of one prefix are
+tried in table order and the first whose methods and roles match applies,
+otherwise shallower prefixes are tried. Prefixes match whole segments,
+and a "*" segment matches any one segment, so a deeper wildcard rule is
+never hidden by a shallower exact one; between matches of equal depth the
+exact segment wins. The trie is resolved for lookup when first matched:
+each exact segment is merged with the wildcard beside it, so the walk
+never has to branch.
+"""
+
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+WILDCARD = "*"
+
+
+class RateLimitPolicy(NamedTuple):
+    """Limit applied to a request, with the bucket its requests count against."""
+
+    name: str
+    limit: int
+    window: int
+    lease: Optional[int] = None
+
+
+class _Rule(NamedTuple):
+    methods: Optional[FrozenSet[str]]
+    roles: Optional[FrozenSet[str]]
+    policy: RateLimitPolicy
+
+    def matches(self, method: str, role: Optional[str]) -> bool:
+        return (self.methods is None or method in self.methods) and (self.roles is None or role in self.roles)
+
+
+class _Node:
+    __slots__ = ("children", "rules")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.rules: List[_Rule] = []
+
+
+class PolicyTrie:
+    """Rules compiled into a trie of path segments."""
+
+    def __init__(self):
+        self.root = _Node()
+        self.rules = 0
+        self._lookup: Optional[_Node] = None
+
+    def add(self, prefix: str, rule: _Rule) -> None:
+        node = self.root
+        for segment in prefix.split("/"):
+            if segment:
+                node = node.children.setdefault(segment, _Node())
+        node.rules.append(rule)
+        self.rules += 1
+        self._lookup = None
+
+    def match(self, path: str, method: str, role: Optional[str] = None) -> Optional[RateLimitPolicy]:
+        """
+        Return the policy of a request, or None when no rule covers it.
+
+        Args:
+            path: Request path
+            method: HTTP method, upper case
+            role: Role of the authenticated user, if any
+        """
+        node = self._lookup
+        if node is None:
+            node = self._lookup = _resolve((self.root,), {})
+        matched = [node] if node.rules else []
+        for segment in path.split("/"):
+            if not segment:
+                continue
+            children = node.children
+            node = children.get(segment) or children.get(WILDCARD)
+            if node is None:
+                break
+            if node.rules:
+                matched.append(node)
+        for node in reversed(matched):
+            for rule in node.rules:
+                if rule.matches(method, role):
+                    return rule.policy
+        return None
+
+
+def _resolve(nodes: Tuple[_Node, ...], resolved: Dict[Tuple[int, ...], _Node]) -> _Node:
+    """
+    Merge trie nodes reached by the same path into one lookup node.
+
+    nodes are in order of precedence, an exact segment before the wildcard
+    beside it, and the rules of the merged node keep that order. Each child
+    of the merged node merges, for every node, the exact child and then the
+    wildcard child; its wildcard child merges only the wildcard children.
+    """
+    key = tuple(map(id, nodes))
+    node = resolved.get(key)
+    if node is not None:
+        return node
+    node = resolved[key] = _Node()
+    node.rules = [rule for source in nodes for rule in source.rules]
+    segments = dict.fromkeys(segment for source in nodes for segment in source.children)
+    for segment in segments:
+        children = []
+        for source in nodes:
+            if segment != WILDCARD and segment in source.children:
+                children.append(source.children[segment])
+            if WILDCARD in source.children:
+                children.append(source.children[WILDCARD])
+        node.children[segment] = _resolve(tuple(children), resolved)
+    return node
+
+
+def _frozen(values: Optional[List[str]], normalize) -> Optional[FrozenSet[str]]:
+    return frozenset(normalize(value) for value in values) if values else None
+
+
+def compile_policies(rules: List[Dict[str, Any]], tiers: Dict[str, Dict[str, Any]]) -> PolicyTrie:
+    """
+    Compile a policy table into a PolicyTrie.
+
+    Each rule has a "prefix" and optionally "methods", "roles", a "tier"
+    from tiers, "limit"/"window"/"lease" overrides and a "name". Rules using
+    a tier as is count against the tier's bucket, so prefixes sharing a
+    tier share its limit; rules with overrides get their own bucket, named
+    after the rule unless "name" is given.
+
+    Raises:
+        ValueError: If a rule is incomplete or names an unknown tier
+    """
+    trie = PolicyTrie()
+    for rule in rules:
+        prefix = rule.get("prefix")
+        if not prefix or not prefix.startswith("/"):
+            raise ValueError(f"Rate limit rule needs a prefix starting with '/': {rule}")
+        tier = rule.get("tier")
+        if tier is not None and tier not in tiers:
+            raise ValueError(f"Unknown rate limit tier '{tier}' in rule for {prefix}")
+
+        settings = dict(tiers[tier]) if tier else {}
+        overrides = {key: rule[key] for key in ("limit", "window", "lease") if key in rule}
+        settings.update(overrides)
+        if not settings.get("limit") or not settings.get("window"):
+            raise ValueError(f"Rate limit rule for {prefix} needs a tier or a limit and window")
+
+        methods = _frozen(rule.get("methods"), str.upper)
+        roles = _frozen(rule.get("roles"), str)
+        name = rule.get("name")
+        if name is None:
+            name = tier if tier and not overrides else ":".join(
+                [prefix, *sorted(methods or ()), *sorted(roles or ())]
+            )
+
+        policy = RateLimitPolicy(name, settings["limit"], settings["window"], settings.get("lease"))
+        trie.add(prefix, _Rule(methods, roles, policy))
+    return trie
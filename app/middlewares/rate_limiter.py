@@ -2,31 +2,65 @@
 Rate Limiter Middleware
 
 This module provides rate limiting for the FastAPI application.
-It implements a sliding window algorithm with Redis backend for
-distributed rate limiting.
+It implements the generic cell rate algorithm (GCRA), a sliding window
+without per-request state, on a pluggable storage backend: Redis for
+distributed rate limiting (the default), or process memory for
+single-node deployments and tests. See app.middlewares.rate_limit_backends.
+
+Decisions never block the event loop; with Redis each one is a single
+EVALSHA that checks, records and reports atomically. Which limit applies
+to a request is declared in RATE_LIMIT_POLICIES, compiled into a prefix
+trie; see app.middlewares.rate_limit_policies.
 """
 
 import time
-import hashlib
+import math
+import logging
 from typing import Optional, Dict, Callable, List, Union
-from fastapi import Request, Response, HTTPException, Depends
+from fastapi import Request, HTTPException, Depends
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from pydantic import BaseModel
-import redis
 from redis.exceptions import RedisError
 
-# Redis connection (use connection pooling in production)
-redis_client = None
+from app.middlewares.rate_limit_backends import (
+    create_backend,
+    LeasedRateLimiter,
+    MemoryBackend,
+    RateLimitBackend,
+    RateLimitResult,
+    RedisBackend,
+)
+from app.middlewares.rate_limit_policies import compile_policies, PolicyTrie, RateLimitPolicy
+
+logger = logging.getLogger(__name__)
 
 # Configuration
 RATE_LIMIT_ENABLED = True
 RATE_LIMIT_REDIS_URL = "redis://localhost:6379/0"  # Move to env variables
+RATE_LIMIT_KEY_PREFIX = "ratelimit:gcra"  # distinct from the old sorted-set keys
+
+# What to do when the backend fails (Redis unreachable or timing out):
+#   "memory"  enforce limits per worker in process memory until it recovers
+#   "allow"   let requests through unlimited
+#   "deny"    reject requests
+RATE_LIMIT_ERROR_POLICY = "memory"
+ERROR_POLICIES = ("memory", "allow", "deny")
 
-# Default rate limits (can be overridden per route)
+# Backend shared by the middleware and the rate_limit() dependency, and
+# leases over it when it is remote
+rate_limit_backend: Optional[RateLimitBackend] = None
+rate_limit_leases: Optional[LeasedRateLimiter] = None
+_fallback_backend = MemoryBackend()
+backend_errors = 0
+
+# Default rate limits (can be overridden per route). Tiers with a lease
+# admit from per-worker leases of that many requests; see LeasedRateLimiter
 DEFAULT_RATE_LIMITS = {
     "general": {
         "limit": 100,     # requests
-        "window": 60      # seconds
+        "window": 60,     # seconds
+        "lease": 10       # requests leased from Redis at a time
     },
     "auth": {
         "limit": 5,       # requests
@@ -38,72 +72,140 @@ DEFAULT_RATE_LIMITS = {
     }
 }
 
+# Which limit applies to which requests. Each rule matches a path prefix
+# (whole segments, "*" for any one segment) and optionally "methods" and
+# "roles"; it names a tier above and/or overrides "limit", "window" and
+# "lease". The deepest matching prefix wins; see compile_policies().
+# Requests matching no rule are not limited.
+RATE_LIMIT_POLICIES = [
+    {"prefix": "/api", "tier": "general"},
+    {"prefix": "/api/auth", "tier": "auth"},
+    {"prefix": "/api/admin", "tier": "sensitive"},
+    {"prefix": "/api/payments", "tier": "sensitive"},
+]
+
+# Compiled once at import; configure_rate_limiter(policies=...) replaces it
+rate_limit_policies: PolicyTrie = compile_policies(RATE_LIMIT_POLICIES, DEFAULT_RATE_LIMITS)
+
+
+def set_rate_limit_backend(backend: RateLimitBackend) -> None:
+    """Use a backend for all rate limits of this worker."""
+    global rate_limit_backend, rate_limit_leases
+    rate_limit_backend = backend
+    rate_limit_leases = LeasedRateLimiter(backend) if backend.supports_leases else None
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    """Return the configured backend, Redis at RATE_LIMIT_REDIS_URL by default."""
+    if rate_limit_backend is None:
+        set_rate_limit_backend(RedisBackend(RATE_LIMIT_REDIS_URL))
+    return rate_limit_backend
+
+
+async def close_rate_limiter() -> None:
+    """Release backend connections, e.g. on application shutdown."""
+    global rate_limit_backend, rate_limit_leases
+    if rate_limit_backend is not None:
+        await rate_limit_backend.close()
+    rate_limit_backend = None
+    rate_limit_leases = None
+
+
+async def check_rate_limit(key: str, limit: int, window: int, lease: Optional[int] = None) -> RateLimitResult:
+    """
+    Decide whether a request is allowed and record it if so.
+
+    Backend errors are logged and handled by RATE_LIMIT_ERROR_POLICY.
+
+    Args:
+        key: Key of the client and limit
+        limit: Maximum number of requests in the window
+        window: Time window in seconds
+        lease: Requests to lease per worker, for remote backends
+    """
+    global backend_errors
+    backend = get_rate_limit_backend()
+    try:
+        if lease and rate_limit_leases is not None:
+            return await rate_limit_leases.check(key, limit, window, lease)
+        return await backend.check(key, limit, window)
+    except RedisError as e:
+        backend_errors += 1
+        logger.warning(f"Rate limit backend error, applying '{RATE_LIMIT_ERROR_POLICY}' policy: {str(e)}")
+        if RATE_LIMIT_ERROR_POLICY == "memory":
+            return await _fallback_backend.check(key, limit, window)
+        if RATE_LIMIT_ERROR_POLICY == "deny":
+            return RateLimitResult(False, 0, window, 1.0, 0)
+        return RateLimitResult(True, limit, window, 0.0)
+
 
 class RateLimitExceeded(HTTPException):
     """Rate limit exceeded exception."""
 
-    def __init__(self, detail: str = "Rate limit exceeded"):
-        super().__init__(status_code=429, detail=detail)
+    def __init__(self, detail: str = "Rate limit exceeded", retry_after: Optional[float] = None):
+        headers = {"Retry-After": str(math.ceil(retry_after))} if retry_after is not None else None
+        super().__init__(status_code=429, detail=detail, headers=headers)
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """Middleware for rate limiting."""
 
-    def __init__(self, app, redis_url: str = RATE_LIMIT_REDIS_URL):
+    def __init__(
+        self,
+        app,
+        redis_url: str = RATE_LIMIT_REDIS_URL,
+        backend: Optional[RateLimitBackend] = None
+    ):
         super().__init__(app)
-        global redis_client
-        # Initialize Redis client if not already initialized
-        if redis_client is None:
-            redis_client = redis.from_url(redis_url)
+        # Initialize the backend if not already initialized
+        if backend is not None:
+            set_rate_limit_backend(backend)
+        elif rate_limit_backend is None:
+            set_rate_limit_backend(RedisBackend(redis_url))
 
     async def dispatch(self, request: Request, call_next):
         """Process the request through the middleware."""
         if not RATE_LIMIT_ENABLED:
             return await call_next(request)
 
-        # Skip rate limiting for non-API endpoints
-        if not request.url.path.startswith("/api"):
+        # Find the limit for this route; requests outside the policies are not limited
+        policy = rate_limit_policies.match(
+            request.url.path,
+            request.method,
+            getattr(request.state, "user_role", None)
+        )
+        if policy is None:
             return await call_next(request)
 
-        try:
-            # Get client identifier
-            client_id = self._get_client_id(request)
-            
-            # Check if rate limited
-            rate_limited, remaining, reset_time = await self._check_rate_limit(
-                client_id, 
-                request.url.path
+        # Get client identifier
+        client_id = self._get_client_id(request)
+        
+        # Check if rate limited; backend errors are handled by the error policy
+        result = await self._check_rate_limit(client_id, policy)
+        reset_time = result.reset_time()
+        
+        # If rate limited, return 429 Too Many Requests
+        if not result.allowed:
+            return JSONResponse(
+                content={"detail": "Rate limit exceeded, try again later."},
+                status_code=429,
+                headers={
+                    "X-RateLimit-Limit": str(policy.limit),
+                    "X-RateLimit-Remaining": "0",
+                    "X-RateLimit-Reset": str(reset_time),
+                    "Retry-After": str(reset_time - int(time.time()))
+                }
             )
-            
-            # If rate limited, return 429 Too Many Requests
-            if rate_limited:
-                return Response(
-                    content={"detail": "Rate limit exceeded, try again later."},
-                    status_code=429,
-                    media_type="application/json",
-                    headers={
-                        "X-RateLimit-Limit": str(DEFAULT_RATE_LIMITS["general"]["limit"]),
-                        "X-RateLimit-Remaining": "0",
-                        "X-RateLimit-Reset": str(reset_time),
-                        "Retry-After": str(reset_time - int(time.time()))
-                    }
-                )
-            
-            # Proceed with the request
-            response = await call_next(request)
-            
-            # Add rate limit headers to response
-            response.headers["X-RateLimit-Limit"] = str(DEFAULT_RATE_LIMITS["general"]["limit"])
-            response.headers["X-RateLimit-Remaining"] = str(remaining)
-            response.headers["X-RateLimit-Reset"] = str(reset_time)
-            
-            return response
-            
-        except RedisError as e:
-            # Log the error (in production)
-            print(f"Rate limiter error: {str(e)}")
-            # Proceed with the request without rate limiting
-            return await call_next(request)
+        
+        # Proceed with the request
+        response = await call_next(request)
+        
+        # Add rate limit headers to response
+        response.headers["X-RateLimit-Limit"] = str(policy.limit)
+        response.headers["X-RateLimit-Remaining"] = str(result.remaining)
+        response.headers["X-RateLimit-Reset"] = str(reset_time)
+        
+        return response
 
     def _get_client_id(self, request: Request) -> str:
         """Get a unique identifier for the client."""
@@ -119,82 +221,15 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         
         if user_id:
             # For authenticated users, combine IP and user ID
-            client_key = f"{ip}:{user_id}"
-        else:
-            # For anonymous users, just use IP
-            client_key = ip
-            
-        # Hash the client key for privacy and to normalize the key length
-        return hashlib.md5(client_key.encode()).hexdigest()
-        
-    async def _check_rate_limit(
-        self, 
-        client_id: str, 
-        path: str
-    ) -> tuple[bool, int, int]:
-        """
-        Check if the request exceeds the rate limit.
-        
-        Returns a tuple of (is_rate_limited, remaining_requests, reset_time)
-        """
-        # Determine which rate limit to apply based on the path
-        limit_key = "general"
-        if path.startswith("/api/auth"):
-            limit_key = "auth"
-        elif path.startswith("/api/admin") or path.startswith("/api/payments"):
-            limit_key = "sensitive"
-            
-        # Get the rate limit config
-        limit_config = DEFAULT_RATE_LIMITS[limit_key]
-        limit = limit_config["limit"]
-        window = limit_config["window"]
-        
-        # Create a Redis key for this client and endpoint type
-        redis_key = f"ratelimit:{limit_key}:{client_id}"
+            return f"{ip}:{user_id}"
+        # For anonymous users, just use IP
+        return ip
         
-        # Get current timestamp
-        now = int(time.time())
-        
-        # Calculate the window start time
-        window_start = now - window
-        
-        try:
-            # Use Redis pipeline for atomic operations
-            pipe = redis_client.pipeline()
-            
-            # Remove timestamps older than the current window
-            pipe.zremrangebyscore(redis_key, 0, window_start)
-            
-            # Count requests in the current window
-            pipe.zcard(redis_key)
-            
-            # Add the current request timestamp to the sorted set
-            pipe.zadd(redis_key, {str(now): now})
-            
-            # Set the key to expire after the window to clean up Redis
-            pipe.expire(redis_key, window * 2)
-            
-            # Execute the pipeline
-            _, current_count, _, _ = pipe.execute()
-            
-            # Calculate remaining requests
-            remaining = max(0, limit - current_count - 1)  # -1 for the current request
-            
-            # Calculate when the rate limit will reset
-            oldest_timestamp = redis_client.zrange(redis_key, 0, 0, withscores=True)
-            if oldest_timestamp:
-                reset_time = int(oldest_timestamp[0][1]) + window
-            else:
-                reset_time = now + window
-                
-            # Check if rate limited
-            is_rate_limited = current_count >= limit
-            
-            return is_rate_limited, remaining, reset_time
-            
-        except RedisError:
-            # If Redis fails, don't rate limit
-            return False, limit, now + window
+    async def _check_rate_limit(self, client_id: str, policy: RateLimitPolicy) -> RateLimitResult:
+        """Check a request against its policy and record it if allowed."""
+        # Requests of a client count against the bucket of the policy
+        key = f"{RATE_LIMIT_KEY_PREFIX}:{policy.name}:{client_id}"
+        return await check_rate_limit(key, policy.limit, policy.window, lease=policy.lease)
 
 
 def rate_limit(
@@ -206,67 +241,84 @@ def rate_limit(
     Dependency function for rate limiting specific endpoints.
     Can override the default limits per route.
     
+    Requests count per client against a bucket of the route, named after
+    its path template (e.g. /api/properties/{property_id}).
+    
     Args:
         limit: Maximum number of requests in the window
         window: Time window in seconds
         key_func: Optional function to generate the rate limit key
     """
+    # Use custom limits if provided, else use general limits
+    actual_limit = limit or DEFAULT_RATE_LIMITS["general"]["limit"]
+    actual_window = window or DEFAULT_RATE_LIMITS["general"]["window"]
     
     async def _rate_limit(request: Request):
         if not RATE_LIMIT_ENABLED:
             return True
             
-        try:
-            # Determine client ID
-            if key_func:
-                client_id = key_func(request)
-            else:
-                # Use middleware's client ID function
-                client_id = RateLimitMiddleware._get_client_id(None, request)
-                
-            # Use custom limits if provided, else use general limits
-            actual_limit = limit or DEFAULT_RATE_LIMITS["general"]["limit"]
-            actual_window = window or DEFAULT_RATE_LIMITS["general"]["window"]
-            
-            # Create a custom Redis key for this specific rate limit
-            path_hash = hashlib.md5(request.url.path.encode()).hexdigest()[:8]
-            redis_key = f"ratelimit:custom:{path_hash}:{client_id}"
-            
-            # Implement rate limiting logic similar to middleware
-            now = int(time.time())
-            window_start = now - actual_window
-            
-            pipe = redis_client.pipeline()
-            pipe.zremrangebyscore(redis_key, 0, window_start)
-            pipe.zcard(redis_key)
-            pipe.zadd(redis_key, {str(now): now})
-            pipe.expire(redis_key, actual_window * 2)
-            _, current_count, _, _ = pipe.execute()
+        # Determine client ID
+        if key_func:
+            client_id = key_func(request)
+        else:
+            # Use middleware's client ID function
+            client_id = RateLimitMiddleware._get_client_id(None, request)
             
-            if current_count >= actual_limit:
-                raise RateLimitExceeded(
-                    f"Rate limit of {actual_limit} requests per {actual_window} seconds exceeded"
-                )
-                
-            return True
+        # Create a custom key for this route
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else request.url.path
+        key = f"{RATE_LIMIT_KEY_PREFIX}:custom:{route_path}:{client_id}"
+        
+        # Backend errors are handled by the error policy
+        result = await check_rate_limit(key, actual_limit, actual_window)
+        
+        if not result.allowed:
+            raise RateLimitExceeded(
+                f"Rate limit of {actual_limit} requests per {actual_window} seconds exceeded",
+                retry_after=result.retry_after
+            )
             
-        except RedisError as e:
-            # Log the error (in production)
-            print(f"Rate limiter dependency error: {str(e)}")
-            # Allow the request in case of errors
-            return True
+        return True
             
     return _rate_limit
 
 
 # Utility function to enable/disable rate limiting
-def configure_rate_limiter(enabled: bool = True, redis_url: str = None):
-    """Configure the rate limiter."""
-    global RATE_LIMIT_ENABLED, RATE_LIMIT_REDIS_URL, redis_client
+def configure_rate_limiter(
+    enabled: bool = True,
+    redis_url: str = None,
+    backend: Union[str, RateLimitBackend, None] = None,
+    on_error: Optional[str] = None,
+    policies: Optional[List[Dict]] = None
+):
+    """
+    Configure the rate limiter.
+
+    Args:
+        enabled: Whether requests are limited at all
+        redis_url: Redis server for the "redis" backend
+        backend: "redis", "memory", "sharded-memory" or a backend instance;
+            a redis_url alone selects Redis at that URL
+        on_error: Backend error policy, one of ERROR_POLICIES
+        policies: Policy table replacing RATE_LIMIT_POLICIES
+    """
+    global RATE_LIMIT_ENABLED, RATE_LIMIT_REDIS_URL, RATE_LIMIT_ERROR_POLICY, rate_limit_policies
     
     RATE_LIMIT_ENABLED = enabled
     
     if redis_url:
         RATE_LIMIT_REDIS_URL = redis_url
-        # Reinitialize Redis client with new URL
-        redis_client = redis.from_url(redis_url) 
\ No newline at end of file
+    
+    if isinstance(backend, RateLimitBackend):
+        set_rate_limit_backend(backend)
+    elif backend or redis_url:
+        set_rate_limit_backend(create_backend(backend or "redis", RATE_LIMIT_REDIS_URL))
+    
+    if on_error is not None:
+        if on_error not in ERROR_POLICIES:
+            raise ValueError(f"Unknown rate limit error policy: {on_error}")
+        RATE_LIMIT_ERROR_POLICY = on_error
+    
+    if policies is not None:
+        # Compile first, so an invalid table leaves the current one in place
+        rate_limit_policies = compile_policies(policies, DEFAULT_RATE_LIMITS)
@@ -7,9 +7,9 @@ import enum
 from datetime import datetime
 from sqlalchemy import Column, String, Text, Numeric, DateTime, Enum, JSON, ForeignKey
 from sqlalchemy.orm import relationship
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from enum import Enum
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, validator, root_validator
 
 from app.db.base import Base
 
@@ -45,6 +45,51 @@ class Address(BaseModel):
     longitude: Optional[float] = None
 
 
+class GeoPoint(BaseModel):
+    """GeoJSON point. Coordinates are [longitude, latitude]."""
+    type: str = "Point"
+    coordinates: List[float]
+    
+    @validator('coordinates')
+    def validate_coordinates(cls, v):
+        if len(v) != 2:
+            raise ValueError('Coordinates must be [longitude, latitude]')
+        longitude, latitude = v
+        if not -180 <= longitude <= 180 or not -90 <= latitude <= 90:
+            raise ValueError('Coordinates are out of range')
+        return v
+
+
+def location_from_address(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+    """Derive the GeoJSON location from address coordinates when not set."""
+    address = values.get("address")
+    if values.get("location") is None and address is not None:
+        if address.latitude is not None and address.longitude is not None:
+            values["location"] = GeoPoint(coordinates=[address.longitude, address.latitude])
+    return values
+
+
+class GeoNearFilter(BaseModel):
+    """Radius search around a point."""
+    longitude: float = Field(..., ge=-180, le=180)
+    latitude: float = Field(..., ge=-90, le=90)
+    max_distance: float = Field(..., gt=0, description="Radius in meters")
+
+
+class BoundingBox(BaseModel):
+    """Rectangular search area, e.g. the visible part of a map."""
+    min_longitude: float = Field(..., ge=-180, le=180)
+    min_latitude: float = Field(..., ge=-90, le=90)
+    max_longitude: float = Field(..., ge=-180, le=180)
+    max_latitude: float = Field(..., ge=-90, le=90)
+    
+    @root_validator(skip_on_failure=True)
+    def validate_corners(cls, values):
+        if values["min_longitude"] >= values["max_longitude"] or values["min_latitude"] >= values["max_latitude"]:
+            raise ValueError('Bounding box minimum corner must be south-west of the maximum corner')
+        return values
+
+
 class PropertyImage(BaseModel):
     """Model for property images."""
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -72,6 +117,7 @@ class PropertyBase(BaseModel):
     price: float  # monthly rent
     currency: str = "USD"
     address: Address
+    location: Optional[GeoPoint] = None  # derived from address coordinates
     features: Optional[List[PropertyFeature]] = []
     status: PropertyStatus = PropertyStatus.AVAILABLE
     is_furnished: bool = False
@@ -83,6 +129,8 @@ class PropertyBase(BaseModel):
     pets_allowed: bool = False
     smoking_allowed: bool = False
     metadata: Optional[Dict[str, Any]] = {}
+    
+    _derive_location = root_validator(allow_reuse=True)(location_from_address)
 
 
 class PropertyCreate(PropertyBase):
@@ -126,6 +174,7 @@ class PropertyUpdate(BaseModel):
     price: Optional[float] = None
     currency: Optional[str] = None
     address: Optional[Address] = None
+    location: Optional[GeoPoint] = None
     features: Optional[List[PropertyFeature]] = None
     status: Optional[PropertyStatus] = None
     is_furnished: Optional[bool] = None
@@ -139,6 +188,8 @@ class PropertyUpdate(BaseModel):
     images: Optional[List[PropertyImage]] = None
     metadata: Optional[Dict[str, Any]] = None
     
+    _derive_location = root_validator(allow_reuse=True)(location_from_address)
+    
     @validator('price')
     def validate_price(cls, v):
         if v is not None and v <= 0:
@@ -174,6 +225,8 @@ class PropertyDB(PropertyBase):
     blockchain_id: Optional[str] = None
     contract_address: Optional[str] = None
     verified: bool = False
+    distance: Optional[float] = None  # meters, set by radius searches only
+    cover_photo: Optional[PropertyImage] = None  # set on list and search results
 
 
 class PropertyResponse(PropertyDB):
@@ -184,6 +237,7 @@ class PropertyResponse(PropertyDB):
 
 class PropertySearchParams(BaseModel):
     """Model for property search parameters."""
+    q: Optional[str] = Field(None, max_length=200, description="Keywords matched against title and description")
     property_type: Optional[PropertyType] = None
     min_price: Optional[float] = None
     max_price: Optional[float] = None
@@ -201,6 +255,89 @@ class PropertySearchParams(BaseModel):
     status: Optional[PropertyStatus] = PropertyStatus.AVAILABLE
     pets_allowed: Optional[bool] = None
     utilities_included: Optional[bool] = None
+    near: Optional[GeoNearFilter] = None
+    within_box: Optional[BoundingBox] = None
+
+
+class FacetCount(BaseModel):
+    """Number of matching properties for one facet value or bucket."""
+    value: Union[str, int, float]
+    count: int
+    min: Optional[float] = None  # bucket facets only, inclusive
+    max: Optional[float] = None  # bucket facets only, exclusive
+
+
+class PropertySearchFacets(BaseModel):
+    """Facet counts for a property search."""
+    property_type: List[FacetCount] = []
+    city: List[FacetCount] = []
+    bedrooms: List[FacetCount] = []
+    price: List[FacetCount] = []
+
+
+class PropertySearchResponse(BaseModel):
+    """Model for a page of search results with totals and facets."""
+    items: List[PropertyResponse]
+    total: int
+    total_exact: bool = True  # False when total is an estimate ("about N")
+    facets: Optional[PropertySearchFacets] = None
+
+
+class LocationSuggestion(BaseModel):
+    """A city or state matching an autocomplete query."""
+    type: str  # "city" or "state"
+    name: str
+    city: Optional[str] = None
+    state: Optional[str] = None
+    country: Optional[str] = None
+    count: int  # available listings
+
+
+class PriceStats(BaseModel):
+    """Distribution of prices in a market."""
+    min: float
+    p25: float
+    median: float
+    p75: float
+    max: float
+    mean: float
+
+
+class MarketTrendPoint(BaseModel):
+    """Median price of a market in one month."""
+    period: str  # YYYY-MM
+    median_price: float
+    count: int
+
+
+class MarketStats(BaseModel):
+    """Materialized price statistics for a city and property type."""
+    city: str
+    state: Optional[str] = None
+    property_type: str  # a PropertyType value, or "all"
+    count: int
+    price: PriceStats
+    price_per_area: Optional[PriceStats] = None
+    median_change_pct: Optional[float] = None  # vs. the previous recorded month
+    history: List[MarketTrendPoint] = []
+    updated_at: datetime
+
+
+class PropertySummary(BaseModel):
+    """Listing card fields, read from the property_summaries read model."""
+    id: str
+    title: str
+    price: float
+    currency: str = "USD"
+    city: Optional[str] = None
+    state: Optional[str] = None
+    bedrooms: Optional[int] = None
+    property_type: Optional[str] = None
+    status: Optional[str] = None
+    owner_id: Optional[str] = None
+    cover_photo_url: Optional[str] = None
+    proposal_count: int = 0
+    created_at: Optional[datetime] = None
 
 
 class Property(Base):
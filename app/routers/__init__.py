@@ -3,8 +3,10 @@ Router package for API endpoints.
 """
 from app.routers.auth import router as auth_router
 from app.routers.property import router as property_router
+from app.routers.export import router as export_router
 
 __all__ = [
     "auth_router",
-    "property_router"
+    "property_router",
+    "export_router"
 ] 
\ No newline at end of file
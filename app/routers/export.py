@@ -0,0 +1,72 @@
+"""
+Export router for streaming full collection exports to reporting partners.
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.services.export_service import EXPORT_FORMATS, EXPORT_MEDIA_TYPES, ExportService
+from app.auth.dependencies import get_admin_user
+from app.models.auth import ErrorResponse
+
+# Create router
+router = APIRouter(
+    prefix="/api/export",
+    tags=["Export"],
+    responses={
+        401: {"model": ErrorResponse, "description": "Unauthorized - Invalid or expired token"},
+        403: {"model": ErrorResponse, "description": "Forbidden - Insufficient permissions"},
+        404: {"model": ErrorResponse, "description": "Not Found - Resource does not exist"},
+        500: {"model": ErrorResponse, "description": "Internal Server Error - Server-side error"}
+    }
+)
+
+@router.get(
+    "/{export_name}",
+    response_class=StreamingResponse,
+    summary="Export a collection",
+    response_description="NDJSON or CSV stream of every record"
+)
+async def export_collection(
+    export_name: str = Path(..., description="properties, proposals or contracts"),
+    format: str = Query("ndjson", description="ndjson or csv"),
+    batch_size: Optional[int] = Query(None, ge=1, le=10000, description="Records fetched per database round trip"),
+    current_user: Dict[str, Any] = Depends(get_admin_user)
+):
+    """
+    Stream every record of a collection.
+
+    Records are read through a database cursor and written as they arrive,
+    so exports of any size use constant memory on the server.
+
+    ## Authorization
+    - Requires authentication with admin role
+
+    ## Formats
+    - **ndjson**: one JSON object per line, all stored fields
+    - **csv**: header row with a fixed set of columns per collection
+
+    ## Example
+    ```
+    GET /api/export/properties?format=csv
+    ```
+    """
+    if export_name not in ExportService.EXPORTS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown export: {export_name}"
+        )
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format: {format}. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+
+    filename = f"{export_name}-{datetime.utcnow():%Y%m%d}.{format}"
+    return StreamingResponse(
+        ExportService.stream(export_name, format, batch_size=batch_size),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -2,7 +2,8 @@
 Property router for property CRUD operations.
 """
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, Query, Path, status
+import codecs
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Path, Response, UploadFile, status
 from datetime import datetime
 
 from app.models.property import (
@@ -14,10 +15,32 @@ from app.models.property import (
     PropertyStatus,
     PropertyCreate,
     PropertyUpdate,
-    PropertySearchParams
+    PropertySearchParams,
+    PropertySummary,
+    LocationSuggestion,
+    MarketStats,
+    GeoNearFilter,
+    BoundingBox
 )
+from app.core.mongo_db import get_next_cursor
+from app.services.location_autocomplete import location_autocomplete
+from app.services.market_stats_service import MarketStatsService
 from app.services.property_service import PropertyService
-from app.auth.dependencies import get_current_active_user, get_landlord_user, can_manage_properties
+from app.services.property_search import SEARCH_SORT
+from app.services.property_summary_service import (
+    build_summary_query,
+    PropertySummaryService,
+    SUMMARY_NEWEST_SORT,
+    SUMMARY_PRICE_SORT
+)
+from app.services.property_import import (
+    DEFAULT_CHUNK_SIZE,
+    IMPORT_FORMATS,
+    detect_format,
+    import_properties,
+    PropertyImportResult
+)
+from app.auth.dependencies import get_current_active_user, get_landlord_user, get_admin_user, can_manage_properties
 from app.models.auth import ErrorResponse
 
 # Create router
@@ -85,13 +108,62 @@ async def create_property(
     
     return property_db
 
-@router.get(
-    "", 
-    response_model=List[PropertyResponse],
-    summary="Search properties with filters",
-    response_description="List of properties matching the search criteria"
+@router.post(
+    "/import",
+    response_model=PropertyImportResult,
+    summary="Bulk import property listings",
+    response_description="Imported and failed row counts with per-row errors"
 )
-async def search_properties(
+async def import_property_listings(
+    file: UploadFile = File(..., description="NDJSON (one property per line) or CSV file"),
+    format: Optional[str] = Query(None, description="ndjson or csv; inferred from the file name if omitted"),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=10000, description="Rows inserted per batch"),
+    current_user: Dict[str, Any] = Depends(get_landlord_user)
+):
+    """
+    Create many property listings from one uploaded file.
+    
+    Rows are streamed, validated like single creates and inserted in
+    batches. Invalid rows are skipped and reported; valid rows are imported
+    regardless of failures elsewhere in the file.
+    
+    ## Authorization
+    - Requires authentication with landlord or admin role
+    
+    ## File Formats
+    - **ndjson**: one JSON property object per line
+    - **csv**: header row with property fields; nested fields use dotted
+      names such as `address.city`
+    
+    ## Returns
+    Total, inserted and failed row counts, and the errors of failed rows
+    (1-based row numbers, CSV header excluded)
+    
+    ## Example
+    ```
+    curl -F "file=@listings.csv" /api/properties/import
+    ```
+    """
+    import_format = format or detect_format(file.filename)
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format: {import_format}. Use one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    
+    # Decode the upload lazily so large files are never read into memory at
+    # once; the importer reads it from a worker thread, off the event loop
+    lines = codecs.iterdecode(file.file, "utf-8-sig")
+    try:
+        return await import_properties(lines, current_user["id"], import_format, chunk_size)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be UTF-8 encoded"
+        )
+
+async def get_search_params(
+    q: Optional[str] = Query(None, max_length=200, description="Keywords to match in title and description"),
     property_type: Optional[str] = Query(None, description="Filter by property type (e.g., apartment, house)"),
     min_price: Optional[float] = Query(None, description="Minimum monthly price"),
     max_price: Optional[float] = Query(None, description="Maximum monthly price"),
@@ -100,8 +172,71 @@ async def search_properties(
     city: Optional[str] = Query(None, description="Filter by city"),
     state: Optional[str] = Query(None, description="Filter by state/province"),
     country: Optional[str] = Query(None, description="Filter by country"),
+    near_lat: Optional[float] = Query(None, ge=-90, le=90, description="Latitude of the radius search center"),
+    near_lng: Optional[float] = Query(None, ge=-180, le=180, description="Longitude of the radius search center"),
+    radius_km: Optional[float] = Query(None, gt=0, le=500, description="Radius search distance in kilometers"),
+    bbox: Optional[str] = Query(None, description="Bounding box as min_lng,min_lat,max_lng,max_lat")
+) -> PropertySearchParams:
+    """Build search parameters from the query string shared by the search endpoints."""
+    # Build location filters
+    near = None
+    if near_lat is not None or near_lng is not None or radius_km is not None:
+        if near_lat is None or near_lng is None or radius_km is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="near_lat, near_lng and radius_km must be provided together"
+            )
+        near = GeoNearFilter(latitude=near_lat, longitude=near_lng, max_distance=radius_km * 1000)
+    
+    within_box = None
+    if bbox:
+        try:
+            min_lng, min_lat, max_lng, max_lat = (float(v) for v in bbox.split(","))
+            within_box = BoundingBox(
+                min_longitude=min_lng,
+                min_latitude=min_lat,
+                max_longitude=max_lng,
+                max_latitude=max_lat
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="bbox must be min_lng,min_lat,max_lng,max_lat"
+            )
+    
+    # Create search parameters
+    try:
+        return PropertySearchParams(
+            q=q,
+            property_type=property_type,
+            min_price=min_price,
+            max_price=max_price,
+            min_bedrooms=min_bedrooms,
+            max_bedrooms=max_bedrooms,
+            city=city,
+            state=state,
+            country=country,
+            near=near,
+            within_box=within_box
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get(
+    "", 
+    response_model=List[PropertyResponse],
+    summary="Search properties with filters",
+    response_description="List of properties matching the search criteria"
+)
+async def search_properties(
+    response: Response,
+    search_params: PropertySearchParams = Depends(get_search_params),
     limit: int = Query(default=10, ge=1, le=100, description="Number of results to return (max 100)"),
     offset: int = Query(default=0, ge=0, description="Number of results to skip (pagination)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     current_user: Optional[Dict[str, Any]] = Depends(get_current_active_user)
 ):
     """
@@ -113,35 +248,102 @@ async def search_properties(
     ## Parameters
     All filter parameters are optional and can be combined
     
+    ## Keywords
+    - **q**: words matched against title and description; results are
+      ranked by relevance, title matches first, and can be combined with
+      any other filter except the radius search
+    
+    ## Location
+    - **near_lat**, **near_lng**, **radius_km**: listings within a radius,
+      nearest first, with `distance` in meters
+    - **bbox**: listings inside a map viewport
+    
+    ## Pagination
+    Use `limit`/`offset` for numbered pages. For deep or infinite-scroll
+    paging, pass the `X-Next-Cursor` response header back as `cursor`;
+    `offset` is ignored when a cursor is given.
+    
     ## Returns
-    List of properties matching the criteria
+    List of properties matching the criteria, with every property field.
+    Pages that only render listing cards should use
+    `GET /api/properties/summaries`, an index-only read.
     
     ## Example
     ```
     GET /api/properties?property_type=apartment&min_price=800&max_price=1500&city=New%20York&limit=20&offset=0
     ```
     """
-    # Create search parameters
-    search_params = PropertySearchParams(
-        property_type=property_type,
-        min_price=min_price,
-        max_price=max_price,
-        min_bedrooms=min_bedrooms,
-        max_bedrooms=max_bedrooms,
-        city=city,
-        state=state,
-        country=country
-    )
-    
     # Search properties
-    properties = await PropertyService.search_properties(
-        search_params=search_params,
-        limit=limit,
-        offset=offset
-    )
+    try:
+        properties = await PropertyService.search_properties(
+            search_params=search_params,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    # Expose the keyset cursor for the next page (radius and keyword searches page by offset)
+    next_cursor = None
+    if search_params.near is None and not search_params.q:
+        next_cursor = get_next_cursor([p.dict() for p in properties], SEARCH_SORT, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     return properties
 
+@router.get(
+    "/search",
+    response_model=PropertySearchResponse,
+    summary="Search properties with totals and facet counts",
+    response_description="A page of matching properties, the total and facet counts"
+)
+async def search_properties_with_facets(
+    search_params: PropertySearchParams = Depends(get_search_params),
+    facets: bool = Query(default=True, description="Include facet counts"),
+    limit: int = Query(default=10, ge=1, le=100, description="Number of results to return (max 100)"),
+    offset: int = Query(default=0, ge=0, description="Number of results to skip (pagination)"),
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_active_user)
+):
+    """
+    Search for properties and count matches per facet in one database round trip.
+    
+    ## Authorization
+    - Requires authentication
+    
+    ## Parameters
+    Accepts the same filters as `GET /api/properties`
+    
+    ## Returns
+    - **items**: the requested page of properties
+    - **total**: number of properties matching the filters
+    - **total_exact**: false when the total is an estimate, to be shown as
+      "about N"; totals are exact whenever facets are requested
+    - **facets**: counts per property type, city (top 20), bedroom bucket
+      and price bucket over all matching properties
+    
+    ## Example
+    ```
+    GET /api/properties/search?city=New%20York&max_price=3000&facets=true
+    ```
+    """
+    try:
+        return await PropertyService.search_properties_with_facets(
+            search_params=search_params,
+            limit=limit,
+            offset=offset,
+            include_facets=facets
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 @router.get(
     "/my", 
     response_model=List[PropertyResponse],
@@ -158,7 +360,9 @@ async def get_my_properties(
     - Requires authentication with landlord or admin role
     
     ## Returns
-    List of properties owned by the current user
+    List of properties owned by the current user, with every property
+    field; `GET /api/properties/my/summaries` returns just the card fields
+    from an index-only read
     
     ## Example
     ```
@@ -170,6 +374,193 @@ async def get_my_properties(
     
     return properties
 
+@router.get(
+    "/summaries",
+    response_model=List[PropertySummary],
+    summary="List property cards",
+    response_description="Listing card fields for available properties, cheapest first"
+)
+async def list_property_summaries(
+    response: Response,
+    city: Optional[str] = Query(None, description="Filter by city (case-insensitive)"),
+    min_price: Optional[float] = Query(None, description="Minimum monthly price"),
+    max_price: Optional[float] = Query(None, description="Maximum monthly price"),
+    min_bedrooms: Optional[int] = Query(None, description="Minimum number of bedrooms"),
+    max_bedrooms: Optional[int] = Query(None, description="Maximum number of bedrooms"),
+    limit: int = Query(default=20, ge=1, le=100, description="Number of results to return (max 100)"),
+    offset: int = Query(default=0, ge=0, description="Number of results to skip (pagination)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_active_user)
+):
+    """
+    List the fields a listing card shows: title, price, city, bedrooms,
+    cover photo and proposal count.
+    
+    Served from the property summary read model, so each page is a single
+    index-only read.
+    
+    ## Authorization
+    - Requires authentication
+    
+    ## Pagination
+    Use `limit`/`offset`, or pass the `X-Next-Cursor` response header back
+    as `cursor`.
+    
+    ## Example
+    ```
+    GET /api/properties/summaries?city=Boston&max_price=2500
+    ```
+    """
+    query = build_summary_query(
+        city=city,
+        min_price=min_price,
+        max_price=max_price,
+        min_bedrooms=min_bedrooms,
+        max_bedrooms=max_bedrooms
+    )
+    try:
+        summaries = await PropertySummaryService.list_summaries(
+            query, skip=offset, limit=limit, sort=SUMMARY_PRICE_SORT, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    next_cursor = get_next_cursor(summaries, SUMMARY_PRICE_SORT, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return summaries
+
+@router.get(
+    "/my/summaries",
+    response_model=List[PropertySummary],
+    summary="List property cards of the current user",
+    response_description="Listing card fields for the user's properties, newest first"
+)
+async def list_my_property_summaries(
+    response: Response,
+    limit: int = Query(default=20, ge=1, le=100, description="Number of results to return (max 100)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    current_user: Dict[str, Any] = Depends(get_landlord_user)
+):
+    """
+    List listing cards for properties owned by the authenticated user,
+    in any status, newest first.
+    
+    ## Authorization
+    - Requires authentication with landlord or admin role
+    
+    ## Example
+    ```
+    GET /api/properties/my/summaries?limit=50
+    ```
+    """
+    query = build_summary_query(status=None, owner_id=current_user["id"])
+    try:
+        summaries = await PropertySummaryService.list_summaries(
+            query, limit=limit, sort=SUMMARY_NEWEST_SORT, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    next_cursor = get_next_cursor(summaries, SUMMARY_NEWEST_SORT, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return summaries
+
+@router.get(
+    "/locations/autocomplete",
+    response_model=List[LocationSuggestion],
+    summary="Autocomplete cities and states",
+    response_description="Matching cities and states with listing counts, most listings first"
+)
+async def autocomplete_locations(
+    q: str = Query(..., min_length=1, max_length=100, description="Partial city or state name"),
+    limit: int = Query(default=10, ge=1, le=50, description="Number of suggestions to return (max 50)"),
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_active_user)
+):
+    """
+    Suggest cities and states for a partial name, with the number of
+    available listings in each.
+    
+    Matching ignores case and accents and also matches later words, so
+    `york` suggests New York. Served from memory; counts are refreshed
+    every few minutes.
+    
+    ## Authorization
+    - Requires authentication
+    
+    ## Example
+    ```
+    GET /api/properties/locations/autocomplete?q=bos&limit=5
+    ```
+    """
+    return await location_autocomplete.suggest(q, limit)
+
+@router.get(
+    "/market-stats",
+    response_model=List[MarketStats],
+    summary="Get market price statistics",
+    response_description="Rent percentiles, price per area and trends by city and property type"
+)
+async def get_market_stats(
+    city: Optional[str] = Query(None, description="City (case-insensitive); all cities when omitted"),
+    property_type: Optional[str] = Query(None, description="Property type, or `all` for every type of a city"),
+    limit: int = Query(default=50, ge=1, le=500, description="Number of markets to return (max 500)"),
+    current_user: Dict[str, Any] = Depends(get_current_active_user)
+):
+    """
+    Get median rent, quartiles and price per unit of area for available
+    properties by city and property type, largest markets first.
+    
+    Statistics are precomputed: every market is rebuilt on a schedule and
+    markets with new or changed listings are refreshed within about a
+    minute. `history` holds the median price of each recorded month and
+    `median_change_pct` the change since the previous one.
+    
+    ## Authorization
+    - Requires authentication
+    
+    ## Example
+    ```
+    GET /api/properties/market-stats?city=Boston&property_type=apartment
+    ```
+    """
+    return await MarketStatsService.get_stats(city=city, property_type=property_type, limit=limit)
+
+@router.get(
+    "/cache/stats",
+    response_model=Dict[str, Any],
+    summary="Get property cache statistics",
+    response_description="Hit, miss and eviction counters for the property caches"
+)
+async def get_cache_stats(
+    current_user: Dict[str, Any] = Depends(get_admin_user)
+):
+    """
+    Get counters for the property caches of the worker serving the request.
+    
+    ## Authorization
+    - Requires authentication with admin role
+    
+    ## Returns
+    Size, hit rate, eviction and invalidation counters for the property
+    detail cache (per tier) and the search result-page cache
+    
+    ## Example
+    ```
+    GET /api/properties/cache/stats
+    ```
+    """
+    return PropertyService.get_cache_stats()
+
 @router.get(
     "/{property_id}", 
     response_model=PropertyResponse,
@@ -212,6 +603,43 @@ async def get_property(
     
     return property_db
 
+@router.get(
+    "/{property_id}/similar",
+    response_model=List[PropertyResponse],
+    summary="Get similar properties",
+    response_description="Available properties most similar to the given one"
+)
+async def get_similar_properties(
+    property_id: str = Path(..., description="The ID of the property to compare with"),
+    limit: int = Query(default=6, ge=1, le=50, description="Number of recommendations to return (max 50)"),
+    current_user: Dict[str, Any] = Depends(get_current_active_user)
+):
+    """
+    Recommend available properties similar to a property, for its detail page.
+    
+    Similarity combines price, area, bedrooms, bathrooms, property type,
+    amenities and distance.
+    
+    ## Authorization
+    - Requires authentication
+    
+    ## Raises
+    - 404: Property not found
+    
+    ## Example
+    ```
+    GET /api/properties/5f8d0e352b15f22e2081b2a8/similar?limit=6
+    ```
+    """
+    properties = await PropertyService.get_similar_properties(property_id, limit)
+    if properties is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    
+    return properties
+
 @router.put(
     "/{property_id}", 
     response_model=PropertyResponse,
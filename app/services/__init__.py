@@ -6,12 +6,14 @@ from app.services.property_service import PropertyService
 from app.services.contract_service import ContractService
 from app.services.proposal_service import ProposalService
 from app.services.document_service import DocumentService
+from app.services.export_service import ExportService
 
 __all__ = [
     "PropertyService",
     "ContractService",
     "ProposalService",
-    "DocumentService"
+    "DocumentService",
+    "ExportService"
 ]
 
 """
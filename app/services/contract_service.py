@@ -65,15 +65,19 @@ class ContractService:
         filter_query: Dict = None, 
         skip: int = 0, 
         limit: int = 20,
-        sort: List = None
+        sort: List = None,
+        cursor: Optional[str] = None,
+        projection: Optional[Dict] = None
     ) -> List[Dict]:
-        """List contracts with pagination and filtering."""
+        """List contracts with offset or cursor pagination and filtering."""
         return await list_documents(
             cls.COLLECTION, 
             filter_query=filter_query, 
             skip=skip, 
             limit=limit,
-            sort=sort
+            sort=sort,
+            cursor=cursor,
+            projection=projection
         )
     
     @classmethod
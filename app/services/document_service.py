@@ -25,6 +25,8 @@ class DocumentService:
     """Service for document database operations."""
     
     COLLECTION = "documents"
+    # Listings never render the file itself; it is only read by get_document_file
+    LIST_PROJECTION = {"document_data": 0}
     
     @classmethod
     async def create_document(cls, document_data: Dict, file_data: Optional[bytes] = None) -> str:
@@ -50,9 +52,9 @@ class DocumentService:
         return document_id
     
     @classmethod
-    async def get_document(cls, document_id: str) -> Optional[Dict]:
-        """Get a document by ID."""
-        return await get_document(cls.COLLECTION, document_id)
+    async def get_document(cls, document_id: str, projection: Optional[Dict] = None) -> Optional[Dict]:
+        """Get a document by ID, optionally returning only the projected fields."""
+        return await get_document(cls.COLLECTION, document_id, projection)
     
     @classmethod
     async def update_document(cls, document_id: str, update_data: Dict) -> bool:
@@ -70,15 +72,19 @@ class DocumentService:
         filter_query: Dict = None,
         skip: int = 0,
         limit: int = 20,
-        sort: List = None
+        sort: List = None,
+        cursor: Optional[str] = None,
+        projection: Optional[Dict] = None
     ) -> List[Dict]:
-        """List documents with pagination and filtering."""
+        """List documents with offset or cursor pagination and filtering."""
         return await list_documents(
             cls.COLLECTION,
             filter_query=filter_query,
             skip=skip,
             limit=limit,
-            sort=sort
+            sort=sort,
+            cursor=cursor,
+            projection=projection or cls.LIST_PROJECTION
         )
     
     @classmethod
@@ -87,7 +93,8 @@ class DocumentService:
         return await list_documents(
             cls.COLLECTION,
             filter_query={"user_id": user_id},
-            sort=[("created_at", -1)]
+            sort=[("created_at", -1)],
+            projection=cls.LIST_PROJECTION
         )
     
     @classmethod
@@ -96,7 +103,8 @@ class DocumentService:
         return await list_documents(
             cls.COLLECTION,
             filter_query={"property_id": property_id},
-            sort=[("created_at", -1)]
+            sort=[("created_at", -1)],
+            projection=cls.LIST_PROJECTION
         )
     
     @classmethod
@@ -105,14 +113,15 @@ class DocumentService:
         return await list_documents(
             cls.COLLECTION,
             filter_query={"contract_id": contract_id},
-            sort=[("created_at", -1)]
+            sort=[("created_at", -1)],
+            projection=cls.LIST_PROJECTION
         )
     
     @classmethod
     async def get_document_by_hash(cls, document_hash: str) -> Optional[Dict]:
         """Get a document by its hash."""
         collection = await get_collection(cls.COLLECTION)
-        document = await collection.find_one({"document_hash": document_hash})
+        document = await collection.find_one({"document_hash": document_hash}, cls.LIST_PROJECTION)
         return format_document_for_response(document) if document else None
     
     @classmethod
@@ -133,7 +142,7 @@ class DocumentService:
     @classmethod
     async def get_document_file(cls, document_id: str) -> Optional[bytes]:
         """Get file data for a document."""
-        document = await cls.get_document(document_id)
+        document = await cls.get_document(document_id, {"document_data": 1, "document_url": 1})
         
         if not document:
             return None
@@ -168,7 +177,7 @@ class DocumentService:
     @classmethod
     async def verify_document_hash(cls, document_id: str, file_data: bytes) -> bool:
         """Verify if a document's hash matches the stored hash."""
-        document = await cls.get_document(document_id)
+        document = await cls.get_document(document_id, {"document_hash": 1})
         
         if not document or "document_hash" not in document:
             return False
@@ -0,0 +1,145 @@
+"""
+Export service for streaming whole collections as NDJSON or CSV.
+"""
+
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.mongo_db import json_serialize_mongodb, stream_documents
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Rows written per response chunk; keeps chunks large enough to avoid one
+# network write per row without holding more than a batch in memory
+ROWS_PER_CHUNK = 200
+
+
+class ExportService:
+    """Service for streaming collection exports."""
+
+    # Export name -> collection, CSV columns (dotted for nested fields) and
+    # fields never exported
+    EXPORTS: Dict[str, Dict[str, Any]] = {
+        "properties": {
+            "collection": "properties",
+            "columns": [
+                "id", "title", "property_type", "status", "price", "currency",
+                "bedrooms", "bathrooms", "area", "address.street", "address.city",
+                "address.state", "address.zip_code", "address.country",
+                "address.latitude", "address.longitude", "is_furnished",
+                "pets_allowed", "available_from", "owner_id", "created_at", "updated_at"
+            ],
+            "projection": None
+        },
+        "proposals": {
+            "collection": "proposals",
+            "columns": [
+                "id", "property_id", "tenant_id", "status", "price_offer",
+                "start_date", "end_date", "is_active", "blockchain_tx_id",
+                "created_at", "updated_at"
+            ],
+            "projection": {"tenant_signature": 0}
+        },
+        "contracts": {
+            "collection": "contracts",
+            "columns": [
+                "id", "property_id", "landlord_id", "tenant_id", "status", "price",
+                "term", "initial_date", "final_date", "blockchain_id",
+                "created_at", "updated_at"
+            ],
+            "projection": {"landlord_signature": 0, "tenant_signature": 0}
+        },
+    }
+
+    @classmethod
+    def stream(
+        cls,
+        export_name: str,
+        export_format: str = "ndjson",
+        filter_query: Dict = None,
+        batch_size: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream an export as text chunks.
+
+        Args:
+            export_name: One of EXPORTS
+            export_format: "ndjson" or "csv"
+            filter_query: MongoDB filter
+            batch_size: Documents fetched per cursor round trip
+
+        Returns:
+            Async iterator of text chunks, suitable for a StreamingResponse
+        """
+        if export_name not in cls.EXPORTS:
+            raise ValueError(f"Unknown export: {export_name}")
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        export = cls.EXPORTS[export_name]
+        documents = stream_documents(
+            export["collection"],
+            filter_query=filter_query,
+            sort=[("_id", 1)],
+            projection=export["projection"],
+            batch_size=batch_size or settings.EXPORT_BATCH_SIZE
+        )
+        if export_format == "csv":
+            return cls._csv_chunks(documents, export["columns"])
+        return cls._ndjson_chunks(documents)
+
+    @staticmethod
+    async def _ndjson_chunks(documents: AsyncIterator[Dict]) -> AsyncIterator[str]:
+        """Serialize documents as one JSON object per line."""
+        lines: List[str] = []
+        async for document in documents:
+            lines.append(json.dumps(document, default=_json_default) + "\n")
+            if len(lines) >= ROWS_PER_CHUNK:
+                yield "".join(lines)
+                lines = []
+        if lines:
+            yield "".join(lines)
+
+    @staticmethod
+    async def _csv_chunks(documents: AsyncIterator[Dict], columns: List[str]) -> AsyncIterator[str]:
+        """Serialize documents as CSV rows with a header."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        rows = 0
+        async for document in documents:
+            writer.writerow([_csv_value(_get_field(document, column)) for column in columns])
+            rows += 1
+            if rows >= ROWS_PER_CHUNK:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                rows = 0
+        yield buffer.getvalue()
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize ObjectId, datetime and other BSON values for JSON output."""
+    serialized = json_serialize_mongodb(value)
+    return str(serialized) if serialized is value else serialized
+
+
+def _get_field(document: Dict, column: str) -> Any:
+    """Read a dotted column from a document."""
+    value: Any = document
+    for part in column.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _csv_value(value: Any) -> Any:
+    """Format a value for a CSV cell."""
+    if value is None:
+        return ""
+    return json_serialize_mongodb(value)
@@ -0,0 +1,254 @@
+"""
+In-memory columnar index of property numbers.
+
+The hottest searches only filter available properties by price, bedroom,
+bathroom and area ranges. Each worker can hold those four columns and the
+status of every property in NumPy arrays and answer such searches with
+vectorized masks, returning the ids of one page; only that page is then
+hydrated from the property cache or MongoDB.
+
+The index is loaded once and kept current row by row from the property
+write paths and the change stream; it is reloaded when changes may have
+been missed. Searches using any other parameter go to MongoDB.
+"""
+
+import logging
+import sys
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+
+from app.core.mongo_db import get_collection, stream_documents
+from app.models.property import PropertySearchParams, PropertyStatus
+from app.services.property_search import RANGE_FILTERS
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_FIELDS = tuple(RANGE_FILTERS)
+
+# Search parameters the index evaluates; any other one sends a search to MongoDB
+INDEXED_PARAMS = {"status"} | {param for params in RANGE_FILTERS.values() for param in params}
+
+STATUS_CODES = {status.value: code for code, status in enumerate(PropertyStatus)}
+UNKNOWN_STATUS = -1
+
+LOAD_PROJECTION = {field: 1 for field in (*NUMERIC_FIELDS, "status")}
+
+INITIAL_CAPACITY = 1024
+
+
+def _number(value: Any) -> float:
+    """Store missing or non-numeric values as NaN, which no range matches."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _status_code(value: Any) -> int:
+    return STATUS_CODES.get(getattr(value, "value", value), UNKNOWN_STATUS)
+
+
+class ListingIndex:
+    """Per-worker columnar snapshot of property status and numeric fields."""
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.ready = False
+        self._allocate(capacity)
+        self._loading = False
+        self._touched_while_loading: Set[str] = set()
+        self.loaded_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.queries = 0
+
+    def _allocate(self, capacity: int) -> None:
+        """Start with empty columns of the given capacity."""
+        self.columns = {field: np.full(capacity, np.nan) for field in NUMERIC_FIELDS}
+        self.status = np.full(capacity, UNKNOWN_STATUS, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+        # ObjectId hex strings sort like the ObjectIds themselves
+        self.ids = np.zeros(capacity, dtype="U24")
+        self.rows: Dict[str, int] = {}
+        self.free: List[int] = []
+        self.size = 0  # rows in use, including freed ones
+
+    def _grow(self) -> None:
+        """Double the capacity of every column."""
+        capacity = len(self.alive) * 2
+        for field, column in self.columns.items():
+            grown = np.full(capacity, np.nan)
+            grown[:len(column)] = column
+            self.columns[field] = grown
+        for name, fill in (("status", UNKNOWN_STATUS), ("alive", False), ("ids", "")):
+            column = getattr(self, name)
+            grown = np.full(capacity, fill, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    @property
+    def active(self) -> bool:
+        """Whether writes must be applied, i.e. the index is loaded or loading."""
+        return self.ready or self._loading
+
+    def upsert(self, document: Dict[str, Any]) -> None:
+        """Add or overwrite the row of one property document (with _id or id)."""
+        if not self.active:
+            return
+        property_id = str(document.get("_id") or document.get("id"))
+        if self._loading:
+            self._touched_while_loading.add(property_id)
+        self._set_row(property_id, document)
+
+    def _set_row(self, property_id: str, document: Dict[str, Any]) -> None:
+        row = self.rows.get(property_id)
+        if row is None:
+            if self.free:
+                row = self.free.pop()
+            else:
+                if self.size == len(self.alive):
+                    self._grow()
+                row = self.size
+                self.size += 1
+            self.rows[property_id] = row
+            self.ids[row] = property_id
+
+        for field in NUMERIC_FIELDS:
+            self.columns[field][row] = _number(document.get(field))
+        self.status[row] = _status_code(document.get("status"))
+        self.alive[row] = True
+
+    def remove(self, property_id: str) -> None:
+        """Drop the row of a deleted property."""
+        if not self.active:
+            return
+        if self._loading:
+            self._touched_while_loading.add(property_id)
+        row = self.rows.pop(property_id, None)
+        if row is not None:
+            self.alive[row] = False
+            self.status[row] = UNKNOWN_STATUS
+            self.free.append(row)
+
+    async def refresh(self, property_id: str) -> None:
+        """Re-read one property after a write, e.g. from another worker."""
+        if not self.active or not ObjectId.is_valid(property_id):
+            return
+        collection = await get_collection("properties")
+        document = await collection.find_one({"_id": ObjectId(property_id)}, LOAD_PROJECTION)
+        if document is None:
+            self.remove(property_id)
+        else:
+            self.upsert(document)
+
+    async def load(self) -> Optional[int]:
+        """
+        Load every property, replacing the current contents.
+
+        Searches keep using the old rows (or MongoDB) until the load ends.
+        Properties written meanwhile are re-read afterwards, since the load
+        may have streamed them before the write.
+
+        Returns:
+            Number of properties indexed, or None if the load failed and
+            the previous contents were kept
+        """
+        started = time.perf_counter()
+        current = ListingIndex()
+        self._loading = True
+        self._touched_while_loading = set()
+        try:
+            async for document in stream_documents("properties", projection=LOAD_PROJECTION, batch_size=5000):
+                current._set_row(document["id"], document)
+        except PyMongoError as e:
+            logger.error(f"Listing index load failed: {str(e)}")
+            return None
+        finally:
+            self._loading = False
+
+        # Swap in the new columns without yielding, then catch up on writes
+        self.columns, self.status, self.alive, self.ids = current.columns, current.status, current.alive, current.ids
+        self.rows, self.free, self.size = current.rows, current.free, current.size
+        self.ready = True
+        touched, self._touched_while_loading = self._touched_while_loading, set()
+        for property_id in touched:
+            await self.refresh(property_id)
+
+        self.load_seconds = time.perf_counter() - started
+        self.loaded_at = time.time()
+        logger.info(f"Loaded listing index with {len(self.rows)} properties in {self.load_seconds:.2f}s")
+        return len(self.rows)
+
+    async def reload(self) -> None:
+        """Reload a loaded index after changes may have been missed."""
+        if self.ready:
+            await self.load()
+
+    @staticmethod
+    def can_answer(search_params: PropertySearchParams) -> bool:
+        """Whether a search only uses status and numeric ranges."""
+        return set(search_params.dict(exclude_none=True)) <= INDEXED_PARAMS
+
+    def _mask(self, search_params: PropertySearchParams) -> np.ndarray:
+        """Return the rows matching the status and every range filter."""
+        mask = self.alive[:self.size].copy()
+        if search_params.status is not None:
+            mask &= self.status[:self.size] == _status_code(search_params.status)
+        for field, (min_param, max_param) in RANGE_FILTERS.items():
+            column = self.columns[field][:self.size]
+            min_value = getattr(search_params, min_param)
+            max_value = getattr(search_params, max_param)
+            if min_value is not None:
+                mask &= column >= min_value
+            if max_value is not None:
+                mask &= column <= max_value
+        return mask
+
+    def count(self, search_params: PropertySearchParams) -> int:
+        """Return the exact number of matching properties."""
+        self.queries += 1
+        return int(np.count_nonzero(self._mask(search_params)))
+
+    def search(self, search_params: PropertySearchParams, skip: int = 0, limit: int = 10) -> Tuple[List[str], int]:
+        """
+        Return one page of matching property ids and the total.
+
+        Pages are ordered like MongoDB searches: by price (missing first),
+        then by _id.
+        """
+        self.queries += 1
+        rows = np.flatnonzero(self._mask(search_params))
+        total = rows.size
+        end = skip + limit
+        if skip >= total:
+            return [], total
+
+        price = self.columns["price"][rows]
+        price = np.where(np.isnan(price), -np.inf, price)
+        if end < total:
+            # Keep only rows priced up to the end-th lowest price; ties at that
+            # price are all kept, so the exact order below is unaffected
+            cutoff = np.partition(price, end - 1)[end - 1]
+            candidates = price <= cutoff
+            rows, price = rows[candidates], price[candidates]
+
+        order = np.lexsort((self.ids[rows], price))
+        return self.ids[rows[order[skip:end]]].tolist(), total
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and memory counters for monitoring."""
+        array_bytes = sum(column.nbytes for column in self.columns.values())
+        array_bytes += self.status.nbytes + self.alive.nbytes + self.ids.nbytes
+        return {
+            "ready": self.ready,
+            "rows": len(self.rows),
+            "capacity": len(self.alive),
+            "free_rows": len(self.free),
+            "array_bytes": array_bytes,
+            "id_map_bytes": sys.getsizeof(self.rows),
+            "queries": self.queries,
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds,
+        }
@@ -0,0 +1,255 @@
+"""
+City and state autocomplete for the location search box.
+
+Matching partial names in MongoDB takes an unanchored, case-insensitive
+regex over address.city, which cannot use an index. Instead each worker
+periodically counts available listings per city and state and builds an
+in-memory map from every normalized name prefix to its locations, ordered
+by listing count. Lookups are a dictionary read.
+
+Names are normalized by stripping accents, case and punctuation, so
+"sao" finds "São Paulo". Prefixes of every word are indexed, so "york"
+finds "New York".
+"""
+
+import asyncio
+import logging
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo.errors import PyMongoError
+
+from app.core.config import settings
+from app.core.mongo_db import get_collection
+from app.models.property import LocationSuggestion
+
+logger = logging.getLogger(__name__)
+
+# Longest indexed prefix; longer queries filter the locations of this prefix
+MAX_PREFIX_LENGTH = 12
+
+# Seconds before lookups retry a failed first load
+FIRST_LOAD_RETRY_INTERVAL = 10.0
+
+# Listing counts per city, state and country of available properties
+LOCATION_COUNT_PIPELINE: List[Dict[str, Any]] = [
+    {"$match": {"status": "available", "address.city": {"$type": "string"}}},
+    {"$group": {
+        "_id": {"city": "$address.city", "state": "$address.state", "country": "$address.country"},
+        "count": {"$sum": 1}
+    }},
+]
+
+_NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_location(text: Optional[str]) -> str:
+    """Lowercase, strip accents and collapse punctuation and spaces."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    ascii_text = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _NON_ALPHANUMERIC.sub(" ", ascii_text.casefold()).strip()
+
+
+def _search_terms(name: str) -> List[str]:
+    """Return the normalized name from each word on: "new york" -> ["new york", "york"]."""
+    words = normalize_location(name).split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def _most_common(spellings: Counter) -> Optional[str]:
+    """Pick the spelling used by most listings, e.g. "Boston" over "BOSTON"."""
+    return spellings.most_common(1)[0][0] if spellings else None
+
+
+def build_suggestions(groups: Iterable[Dict[str, Any]]) -> List[LocationSuggestion]:
+    """
+    Merge raw city/state/country counts into one suggestion per location.
+
+    Spellings that normalize the same are merged, and every state gets the
+    total count of its cities.
+    """
+    cities: Dict[Tuple[str, str, str], Dict[str, Any]] = defaultdict(
+        lambda: {"city": Counter(), "state": Counter(), "country": Counter(), "count": 0}
+    )
+    states: Dict[Tuple[str, str], Dict[str, Any]] = defaultdict(
+        lambda: {"state": Counter(), "country": Counter(), "count": 0}
+    )
+
+    for group in groups:
+        location = group["_id"]
+        city, state, country = location.get("city"), location.get("state"), location.get("country")
+        count = group["count"]
+        city_key = normalize_location(city)
+        if not city_key:
+            continue
+        state_key, country_key = normalize_location(state), normalize_location(country)
+
+        entry = cities[(city_key, state_key, country_key)]
+        entry["city"][city] += count
+        if state:
+            entry["state"][state] += count
+        if country:
+            entry["country"][country] += count
+        entry["count"] += count
+
+        if state_key:
+            entry = states[(state_key, country_key)]
+            entry["state"][state] += count
+            if country:
+                entry["country"][country] += count
+            entry["count"] += count
+
+    suggestions = [
+        LocationSuggestion(
+            type="city",
+            name=_most_common(entry["city"]),
+            city=_most_common(entry["city"]),
+            state=_most_common(entry["state"]),
+            country=_most_common(entry["country"]),
+            count=entry["count"]
+        )
+        for entry in cities.values()
+    ]
+    suggestions.extend(
+        LocationSuggestion(
+            type="state",
+            name=_most_common(entry["state"]),
+            state=_most_common(entry["state"]),
+            country=_most_common(entry["country"]),
+            count=entry["count"]
+        )
+        for entry in states.values()
+    )
+    return suggestions
+
+
+class LocationAutocomplete:
+    """Per-worker prefix index of cities and states with listing counts."""
+
+    def __init__(self, refresh_interval: float = 300.0, max_prefix_length: int = MAX_PREFIX_LENGTH):
+        self.refresh_interval = refresh_interval
+        self.max_prefix_length = max_prefix_length
+        self.suggestions: List[LocationSuggestion] = []
+        self.terms: List[List[str]] = []
+        # Prefix -> positions in suggestions, most listings first
+        self.prefixes: Dict[str, List[int]] = {}
+        self.refreshed_at: Optional[float] = None
+        self.lookups = 0
+        self._task: Optional[asyncio.Task] = None
+        # Lets one of the concurrent first lookups load the index
+        self._first_load = asyncio.Lock()
+        self._first_load_failed_at: Optional[float] = None
+
+    def build(self, suggestions: List[LocationSuggestion]) -> None:
+        """Index every prefix of every search term of the given suggestions."""
+        suggestions = sorted(suggestions, key=lambda s: (-s.count, normalize_location(s.name), s.type))
+        terms = [_search_terms(suggestion.name) for suggestion in suggestions]
+
+        prefixes: Dict[str, List[int]] = defaultdict(list)
+        for position, suggestion_terms in enumerate(terms):
+            seen = set()
+            for term in suggestion_terms:
+                for length in range(1, min(len(term), self.max_prefix_length) + 1):
+                    prefix = term[:length]
+                    if prefix not in seen:
+                        seen.add(prefix)
+                        prefixes[prefix].append(position)
+
+        # Swapped in together, so lookups never see a half-built index
+        self.suggestions, self.terms, self.prefixes = suggestions, terms, dict(prefixes)
+
+    def lookup(self, query: str, limit: int = 10) -> List[LocationSuggestion]:
+        """Return up to limit locations whose name, or a word of it, starts with query."""
+        self.lookups += 1
+        query = normalize_location(query)
+        if not query:
+            return []
+
+        positions = self.prefixes.get(query[:self.max_prefix_length], [])
+        if len(query) > self.max_prefix_length:
+            positions = [
+                position for position in positions
+                if any(term.startswith(query) for term in self.terms[position])
+            ]
+        return [self.suggestions[position] for position in positions[:limit]]
+
+    async def suggest(self, query: str, limit: int = 10) -> List[LocationSuggestion]:
+        """
+        Look up locations, building the index first if it was never loaded.
+
+        Concurrent first lookups share one load. If it fails, lookups are
+        answered from the empty index and the load is retried after
+        FIRST_LOAD_RETRY_INTERVAL seconds.
+        """
+        if self.refreshed_at is None and self._may_retry_first_load():
+            async with self._first_load:
+                if self.refreshed_at is None and self._may_retry_first_load():
+                    try:
+                        await self.refresh()
+                    except PyMongoError as e:
+                        self._first_load_failed_at = time.monotonic()
+                        logger.error(f"Location autocomplete load failed: {str(e)}")
+        return self.lookup(query, limit)
+
+    def _may_retry_first_load(self) -> bool:
+        failed_at = self._first_load_failed_at
+        return failed_at is None or time.monotonic() - failed_at >= FIRST_LOAD_RETRY_INTERVAL
+
+    async def refresh(self) -> int:
+        """
+        Rebuild the index from the properties collection.
+
+        Returns:
+            Number of cities and states indexed
+        """
+        properties = await get_collection("properties")
+        groups = await properties.aggregate(LOCATION_COUNT_PIPELINE).to_list(length=None)
+        self.build(build_suggestions(groups))
+        self.refreshed_at = time.time()
+        logger.info(f"Refreshed location autocomplete with {len(self.suggestions)} locations")
+        return len(self.suggestions)
+
+    async def run(self) -> None:
+        """Refresh every refresh_interval seconds until cancelled."""
+        while True:
+            try:
+                await self.refresh()
+            except PyMongoError as e:
+                # Keep serving the previous index
+                logger.error(f"Location autocomplete refresh failed: {str(e)}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> asyncio.Task:
+        """Run the periodic refresh in a background task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the background refresh."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return index size and lookup counters."""
+        return {
+            "locations": len(self.suggestions),
+            "prefixes": len(self.prefixes),
+            "lookups": self.lookups,
+            "refreshed_at": self.refreshed_at,
+        }
+
+
+location_autocomplete = LocationAutocomplete(
+    refresh_interval=settings.LOCATION_AUTOCOMPLETE_REFRESH_INTERVAL
+)
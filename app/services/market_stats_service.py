@@ -0,0 +1,354 @@
+"""
+Market statistics by city and property type.
+
+Rent percentiles, price per unit of area and listing counts are computed
+from available properties and materialized into market_stats, one document
+per city and property type plus one per city across all types, so reads
+never aggregate over properties.
+
+A scheduled job rebuilds every group; property creates and updates mark
+their groups dirty, and dirty groups are recomputed on a short interval.
+Each materialization records the median of the current month, so every
+group keeps a monthly trend.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import socket
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import uuid4
+
+import numpy as np
+from pymongo import ReplaceOne
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from app.core.config import settings
+from app.core.mongo_db import get_collection, stream_documents
+
+logger = logging.getLogger(__name__)
+
+ALL_TYPES = "all"
+TREND_MONTHS = 24
+PERCENTILES = (25, 50, 75)
+
+SOURCE_PROJECTION = {"address.city": 1, "address.state": 1, "property_type": 1, "price": 1, "area": 1}
+
+# Groups are keyed by lowercased city and property type
+GroupKey = Tuple[str, str]
+
+
+def _value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+def city_key(city: Optional[str]) -> str:
+    """Group key of a city, matching the case-insensitive search collation."""
+    return (city or "").strip().lower()
+
+
+def stats_id(key: GroupKey) -> str:
+    return f"{key[0]}|{key[1]}"
+
+
+def price_stats(values: np.ndarray) -> Optional[Dict[str, float]]:
+    """Return quartiles, mean and range of a set of prices, or None if empty."""
+    if values.size == 0:
+        return None
+    p25, median, p75 = np.percentile(values, PERCENTILES)
+    return {
+        "min": round(float(values.min()), 2),
+        "p25": round(float(p25), 2),
+        "median": round(float(median), 2),
+        "p75": round(float(p75), 2),
+        "max": round(float(values.max()), 2),
+        "mean": round(float(values.mean()), 2),
+    }
+
+
+class _Group:
+    """Prices and areas collected for one city and property type."""
+
+    def __init__(self):
+        self.cities: Counter = Counter()
+        self.states: Counter = Counter()
+        self.prices: List[float] = []
+        self.areas: List[float] = []
+
+    def add(self, document: Dict[str, Any]) -> None:
+        address = document.get("address") or {}
+        self.cities[address.get("city")] += 1
+        if address.get("state"):
+            self.states[address["state"]] += 1
+        self.prices.append(document["price"])
+        area = document.get("area")
+        self.areas.append(area if isinstance(area, (int, float)) and area > 0 else np.nan)
+
+
+def group_keys(document: Dict[str, Any]) -> List[GroupKey]:
+    """Return the city/type group and the city-wide group of a property."""
+    city = city_key((document.get("address") or {}).get("city"))
+    if not city:
+        return []
+    return [(city, _value(document.get("property_type")) or ALL_TYPES), (city, ALL_TYPES)]
+
+
+def add_to_groups(groups: Dict[GroupKey, _Group], document: Dict[str, Any]) -> None:
+    """Add a priced property to its groups."""
+    if isinstance(document.get("price"), (int, float)):
+        for key in group_keys(document):
+            groups[key].add(document)
+
+
+def group_properties(documents: Iterable[Dict[str, Any]]) -> Dict[GroupKey, _Group]:
+    """Collect properties under their city/type and city-wide groups."""
+    groups: Dict[GroupKey, _Group] = defaultdict(_Group)
+    for document in documents:
+        add_to_groups(groups, document)
+    return groups
+
+
+def build_stats(
+    key: GroupKey,
+    group: _Group,
+    previous: Optional[Dict[str, Any]],
+    now: datetime
+) -> Dict[str, Any]:
+    """
+    Build the stats document of one group.
+
+    The median of the current month replaces this month's trend point;
+    median_change_pct compares it with the latest earlier month.
+    """
+    prices = np.asarray(group.prices, dtype=float)
+    areas = np.asarray(group.areas, dtype=float)
+    per_area = prices[~np.isnan(areas)] / areas[~np.isnan(areas)]
+    price = price_stats(prices)
+
+    period = now.strftime("%Y-%m")
+    history = [point for point in (previous or {}).get("history", []) if point["period"] != period]
+    change = None
+    if history and history[-1]["median_price"]:
+        change = round((price["median"] / history[-1]["median_price"] - 1) * 100, 2)
+    history.append({"period": period, "median_price": price["median"], "count": len(prices)})
+
+    return {
+        "_id": stats_id(key),
+        "city": group.cities.most_common(1)[0][0],
+        "city_key": key[0],
+        "state": group.states.most_common(1)[0][0] if group.states else None,
+        "property_type": key[1],
+        "count": len(prices),
+        "price": price,
+        "price_per_area": price_stats(per_area),
+        "median_change_pct": change,
+        "history": history[-TREND_MONTHS:],
+        "updated_at": now,
+    }
+
+
+class MarketStatsService:
+    """Service materializing and reading market statistics."""
+
+    COLLECTION = "market_stats"
+    LEASE_COLLECTION = "job_leases"
+
+    # Groups touched by writes on this worker since the last flush
+    _dirty: Set[GroupKey] = set()
+
+    @classmethod
+    def mark_dirty(cls, property_doc: Dict[str, Any]) -> None:
+        """
+        Queue the groups of a created or updated property for recomputation.
+
+        Only the job drains the queue, so nothing is queued while it is disabled.
+        """
+        if settings.MARKET_STATS_JOB_ENABLED:
+            cls._dirty.update(group_keys(property_doc))
+
+    @classmethod
+    async def _write(cls, groups: Dict[GroupKey, _Group], stale_ids: Iterable[str] = ()) -> int:
+        """Replace the stats of the given groups and delete stats of emptied groups."""
+        collection = await get_collection(cls.COLLECTION)
+        ids = [stats_id(key) for key in groups]
+        previous = {doc["_id"]: doc async for doc in collection.find({"_id": {"$in": ids}}, {"history": 1})}
+
+        now = datetime.utcnow()
+        requests = [
+            ReplaceOne(
+                {"_id": stats_id(key)},
+                build_stats(key, group, previous.get(stats_id(key)), now),
+                upsert=True
+            )
+            for key, group in groups.items()
+        ]
+        if requests:
+            await collection.bulk_write(requests, ordered=False)
+        stale_ids = list(stale_ids)
+        if stale_ids:
+            await collection.delete_many({"_id": {"$in": stale_ids}})
+        return len(requests)
+
+    @classmethod
+    async def rebuild(cls) -> int:
+        """
+        Recompute every group from the available properties.
+
+        Returns:
+            Number of groups written
+        """
+        groups: Dict[GroupKey, _Group] = defaultdict(_Group)
+        async for document in stream_documents(
+            "properties", {"status": "available"}, projection=SOURCE_PROJECTION, batch_size=5000
+        ):
+            add_to_groups(groups, document)
+
+        collection = await get_collection(cls.COLLECTION)
+        existing = {doc["_id"] async for doc in collection.find({}, {"_id": 1})}
+        written = await cls._write(groups, existing - {stats_id(key) for key in groups})
+        logger.info(f"Rebuilt market stats for {written} groups")
+        return written
+
+    @classmethod
+    async def flush_dirty(cls) -> int:
+        """
+        Recompute the groups marked dirty by writes on this worker.
+
+        Returns:
+            Number of groups written
+        """
+        dirty, cls._dirty = cls._dirty, set()
+        if not dirty:
+            return 0
+
+        # Match cities the way city_key groups them, ignoring case and
+        # surrounding whitespace, so a group is only deleted when no stored
+        # spelling of its city has properties left
+        cities = sorted({city for city, _ in dirty})
+        patterns = [re.compile(rf"^\s*{re.escape(city)}\s*$", re.IGNORECASE) for city in cities]
+
+        groups: Dict[GroupKey, _Group] = {}
+        stale_ids: List[str] = []
+        try:
+            properties = await get_collection("properties")
+            query = {"status": "available", "address.city": {"$in": patterns}}
+            documents = await properties.find(query, SOURCE_PROJECTION).to_list(length=None)
+            computed = group_properties(documents)
+            for key in sorted(dirty):
+                if key in computed:
+                    groups[key] = computed[key]
+                else:
+                    stale_ids.append(stats_id(key))
+            return await cls._write(groups, stale_ids)
+        except PyMongoError:
+            # Retry these groups on the next flush
+            cls._dirty |= dirty
+            raise
+
+    @classmethod
+    async def get_stats(
+        cls,
+        city: Optional[str] = None,
+        property_type: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Read materialized stats, largest markets first.
+
+        Args:
+            city: City name (case-insensitive); all cities when omitted
+            property_type: Property type, or "all" for every type of a city
+            limit: Maximum number of groups
+
+        Returns:
+            Stats documents
+        """
+        query: Dict[str, Any] = {}
+        if city:
+            query["city_key"] = city_key(city)
+        if property_type:
+            query["property_type"] = property_type
+        collection = await get_collection(cls.COLLECTION)
+        documents = await collection.find(query, {"_id": 0, "city_key": 0}).sort("count", -1).to_list(length=limit)
+        return documents
+
+    @classmethod
+    async def acquire_lease(cls, name: str, holder: str, duration: float) -> bool:
+        """
+        Take a named lease for duration seconds, so one worker runs a job.
+
+        Returns:
+            True if this holder now owns the lease
+        """
+        leases = await get_collection(cls.LEASE_COLLECTION)
+        now = datetime.utcnow()
+        try:
+            await leases.find_one_and_update(
+                {"_id": name, "$or": [{"expires_at": {"$lte": now}}, {"holder": holder}]},
+                {"$set": {"holder": holder, "expires_at": now + timedelta(seconds=duration)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            # Held by another worker: the filter missed and the upsert collided
+            return False
+
+
+class MarketStatsJob:
+    """Background job flushing dirty groups and periodically rebuilding all of them."""
+
+    LEASE = "market_stats_rebuild"
+
+    def __init__(
+        self,
+        rebuild_interval: float = 3600.0,
+        flush_interval: float = 60.0,
+        holder: Optional[str] = None
+    ):
+        self.rebuild_interval = rebuild_interval
+        self.flush_interval = flush_interval
+        # Workers of one host share its hostname, so the pid and a random
+        # suffix keep each worker's lease its own
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex}"
+        self._task: Optional[asyncio.Task] = None
+
+    async def run(self) -> None:
+        """Flush every flush_interval; rebuild when this worker holds the lease."""
+        loop = asyncio.get_running_loop()
+        next_rebuild = loop.time()
+        while True:
+            try:
+                if loop.time() >= next_rebuild:
+                    next_rebuild = loop.time() + self.rebuild_interval
+                    # The lease lasts one interval, so only one worker rebuilds per interval
+                    if await MarketStatsService.acquire_lease(self.LEASE, self.holder, self.rebuild_interval):
+                        await MarketStatsService.rebuild()
+                await MarketStatsService.flush_dirty()
+            except PyMongoError as e:
+                logger.error(f"Market stats job failed: {str(e)}")
+            await asyncio.sleep(self.flush_interval)
+
+    def start(self) -> asyncio.Task:
+        """Run the job in a background task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the background task."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+
+market_stats_job = MarketStatsJob(
+    rebuild_interval=settings.MARKET_STATS_REBUILD_INTERVAL,
+    flush_interval=settings.MARKET_STATS_FLUSH_INTERVAL
+)
@@ -0,0 +1,248 @@
+"""
+Bulk property import from NDJSON or CSV.
+
+Rows are streamed from the input, validated with PropertyCreate and written
+in chunks with unordered insert_many, so one bad row never blocks the rest
+and memory use is bounded by the chunk size rather than the file size.
+Reading, parsing and validating a chunk run in a worker thread, so a large
+upload never blocks the event loop.
+"""
+
+import csv
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import BulkWriteError, PyMongoError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.mongo_db import get_collection
+from app.models.property import PropertyCreate, PropertyStatus
+from app.services.market_stats_service import MarketStatsService
+from app.services.property_service import listing_index, search_cache, similar_index
+from app.services.property_summary_service import PropertySummaryService
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("ndjson", "csv")
+DEFAULT_CHUNK_SIZE = 1000
+# Error details kept in the result; failures beyond this are only counted
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportRowError(BaseModel):
+    """A row that could not be imported."""
+    row: int  # 1-based record number, CSV header excluded
+    errors: List[str]
+
+
+class PropertyImportResult(BaseModel):
+    """Outcome of a bulk import."""
+    total_rows: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+
+
+def detect_format(filename: Optional[str]) -> str:
+    """Infer the import format from a file name, defaulting to NDJSON."""
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+
+def iter_ndjson_rows(lines: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    """
+    Yield (row number, record) pairs from NDJSON lines.
+
+    Blank lines are skipped. Lines that are not valid JSON are yielded as
+    ValueError instances so the importer can report them per row.
+    """
+    row = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except ValueError as e:
+            yield row, ValueError(f"Invalid JSON: {str(e)}")
+
+
+def iter_csv_rows(lines: Iterable[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (row number, record) pairs from CSV lines with a header row.
+
+    Dotted headers such as address.city build nested objects. Empty cells
+    are left out so model defaults apply; PropertyCreate coerces the
+    remaining strings to their field types.
+    """
+    for row, record in enumerate(csv.DictReader(lines), start=1):
+        document: Dict[str, Any] = {}
+        for column, value in record.items():
+            if column is None or value is None or value == "":
+                continue
+            target = document
+            *parents, field = column.strip().split(".")
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[field] = value
+        yield row, document
+
+
+def iter_rows(lines: Iterable[str], import_format: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (row number, record) pairs for the given format."""
+    if import_format == "csv":
+        return iter_csv_rows(lines)
+    if import_format == "ndjson":
+        return iter_ndjson_rows(lines)
+    raise ValueError(f"Unsupported import format: {import_format}")
+
+
+def _format_validation_error(error: ValidationError) -> List[str]:
+    """Flatten a pydantic error into "field: message" strings."""
+    return [
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    ]
+
+
+def _to_document(property_data: PropertyCreate, owner_id: str, now: datetime) -> Dict[str, Any]:
+    """Build the stored document, with the same defaults as create_property."""
+    document = property_data.dict()
+    document["owner_id"] = owner_id
+    document["status"] = document.get("status") or PropertyStatus.AVAILABLE
+    document["blockchain_id"] = None
+    document["created_at"] = now
+    document["updated_at"] = now
+    return document
+
+
+class PropertyImporter:
+    """Validate and insert property rows in chunks for one owner."""
+
+    COLLECTION = "properties"
+
+    def __init__(self, owner_id: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self.owner_id = owner_id
+        self.chunk_size = chunk_size
+        self.result = PropertyImportResult()
+
+    def _add_error(self, row: int, errors: List[str]) -> None:
+        self.result.failed += 1
+        if len(self.result.errors) < MAX_REPORTED_ERRORS:
+            self.result.errors.append(ImportRowError(row=row, errors=errors))
+
+    def _read_chunk(self, rows: Iterator[Tuple[int, Any]]) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """
+        Read rows until one chunk of valid documents is collected.
+
+        Returns:
+            Documents and their row numbers; fewer than chunk_size once rows run out
+        """
+        chunk: List[Dict[str, Any]] = []
+        chunk_rows: List[int] = []
+
+        for row, record in rows:
+            self.result.total_rows += 1
+            if isinstance(record, Exception):
+                self._add_error(row, [str(record)])
+                continue
+            if not isinstance(record, dict):
+                self._add_error(row, ["Row must be a JSON object"])
+                continue
+
+            try:
+                property_data = PropertyCreate(**record)
+            except ValidationError as e:
+                self._add_error(row, _format_validation_error(e))
+                continue
+
+            chunk.append(_to_document(property_data, self.owner_id, datetime.utcnow()))
+            chunk_rows.append(row)
+            if len(chunk) >= self.chunk_size:
+                break
+        return chunk, chunk_rows
+
+    async def run(self, rows: Iterable[Tuple[int, Any]]) -> PropertyImportResult:
+        """Import all rows and return the counts and per-row errors."""
+        collection = await get_collection(self.COLLECTION)
+        rows = iter(rows)
+        while True:
+            # Reading and parsing the input blocks, so it runs off the event loop
+            chunk, chunk_rows = await run_in_threadpool(self._read_chunk, rows)
+            if chunk:
+                await self._insert_chunk(collection, chunk, chunk_rows)
+            if len(chunk) < self.chunk_size:
+                break
+
+        if self.result.inserted:
+            search_cache.bump()
+
+        logger.info(
+            f"Imported {self.result.inserted} of {self.result.total_rows} properties "
+            f"for owner {self.owner_id} ({self.result.failed} failed)"
+        )
+        return self.result
+
+    async def _insert_chunk(self, collection, documents: List[Dict[str, Any]], rows: List[int]) -> None:
+        """
+        Insert one chunk; with ordered=False a failed row does not stop the others.
+
+        Any other database error fails the rows of this chunk only, so the
+        counts of chunks already written are kept and the import goes on.
+        """
+        failed = set()
+        try:
+            result = await collection.insert_many(documents, ordered=False)
+            self.result.inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            details = e.details
+            self.result.inserted += details.get("nInserted", 0)
+            for write_error in details.get("writeErrors", []):
+                failed.add(write_error["index"])
+                self._add_error(rows[write_error["index"]], [write_error.get("errmsg", "Write failed")])
+        except PyMongoError as e:
+            logger.error(f"Import chunk of {len(documents)} rows failed: {str(e)}")
+            for row in rows:
+                self._add_error(row, [f"Write failed: {str(e)}"])
+            return
+
+        # insert_many sets _id on every document it sends
+        inserted = [document for i, document in enumerate(documents) if i not in failed]
+        try:
+            await PropertySummaryService.add_many(inserted)
+        except PyMongoError as e:
+            # The properties are written; their summaries catch up on the next rebuild
+            logger.error(f"Summaries of {len(inserted)} imported properties failed: {str(e)}")
+        for document in inserted:
+            listing_index.upsert(document)
+            similar_index.upsert(document)
+            MarketStatsService.mark_dirty(document)
+
+
+async def import_properties(
+    lines: Iterable[str],
+    owner_id: str,
+    import_format: str = "ndjson",
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> PropertyImportResult:
+    """
+    Import properties for an owner from NDJSON or CSV lines.
+
+    Args:
+        lines: Text lines of the input, e.g. an open file
+        owner_id: Owner of every imported property
+        import_format: "ndjson" or "csv"
+        chunk_size: Rows validated and inserted per insert_many
+
+    Returns:
+        Row counts and per-row errors
+    """
+    rows = iter_rows(lines, import_format)
+    return await PropertyImporter(owner_id, chunk_size).run(rows)
@@ -0,0 +1,282 @@
+"""
+Compile property search parameters into MongoDB queries.
+"""
+
+import re
+from typing import Any, Dict, List, Tuple
+from enum import Enum
+
+from pymongo import ASCENDING
+
+from app.models.property import BoundingBox, PropertySearchParams
+
+# Default ordering for search results. price is the last key of every search
+# index, so the sort is served by the index; _id keeps pages stable on ties.
+SEARCH_SORT: List[Tuple[str, int]] = [("price", ASCENDING), ("_id", ASCENDING)]
+
+# Keyword searches are ranked by relevance, with _id as tie-breaker
+TEXT_SCORE_PROJECTION = {"score": {"$meta": "textScore"}}
+TEXT_SCORE_SORT: List[Tuple[str, Any]] = [("score", {"$meta": "textScore"}), ("_id", ASCENDING)]
+
+# Location filters, matched case-insensitively
+LOCATION_FIELDS = {"address.city", "address.state", "address.country"}
+
+# Facet buckets. Each boundary is the inclusive lower bound of a bucket; values
+# at or above the last boundary fall into an overflow bucket.
+BEDROOM_BUCKETS = [0, 1, 2, 3, 4]
+PRICE_BUCKETS = [0, 1000, 1500, 2000, 2500, 3000, 4000, 5000]
+CITY_FACET_LIMIT = 20
+
+# Mean Earth radius in meters; $centerSphere takes its radius in radians
+EARTH_RADIUS_METERS = 6378100
+
+# Equality filters: search parameter -> document field
+EQUALITY_FILTERS = {
+    "status": "status",
+    "property_type": "property_type",
+    "city": "address.city",
+    "state": "address.state",
+    "country": "address.country",
+    "is_furnished": "is_furnished",
+    "pets_allowed": "pets_allowed",
+    "utilities_included": "utilities_included",
+}
+
+# Range filters: document field -> (min parameter, max parameter)
+RANGE_FILTERS = {
+    "price": ("min_price", "max_price"),
+    "bedrooms": ("min_bedrooms", "max_bedrooms"),
+    "bathrooms": ("min_bathrooms", "max_bathrooms"),
+    "area": ("min_area", "max_area"),
+}
+
+
+def _value(value: Any) -> Any:
+    """Unwrap enum members so they are stored and compared as plain values."""
+    return value.value if isinstance(value, Enum) else value
+
+
+def bounding_box_polygon(box: BoundingBox) -> Dict[str, Any]:
+    """Return a closed GeoJSON polygon for a bounding box."""
+    return {
+        "type": "Polygon",
+        "coordinates": [[
+            [box.min_longitude, box.min_latitude],
+            [box.max_longitude, box.min_latitude],
+            [box.max_longitude, box.max_latitude],
+            [box.min_longitude, box.max_latitude],
+            [box.min_longitude, box.min_latitude],
+        ]]
+    }
+
+
+def build_search_query(search_params: PropertySearchParams) -> Dict[str, Any]:
+    """
+    Build a MongoDB filter from search parameters.
+
+    Location fields are matched exactly; case-insensitivity comes from running
+    the query with SEARCH_COLLATION, which keeps the match index-backed.
+    Keyword searches add a $text clause. Text indexes cannot be combined with
+    a collation, so there location fields become anchored case-insensitive
+    regexes, evaluated only on the documents the text index returns.
+
+    Args:
+        search_params: Search parameters
+
+    Returns:
+        MongoDB filter document
+    """
+    query: Dict[str, Any] = {}
+
+    if search_params.q:
+        query["$text"] = {"$search": search_params.q}
+
+    for param, field in EQUALITY_FILTERS.items():
+        value = getattr(search_params, param)
+        if value is not None and value != "":
+            if search_params.q and field in LOCATION_FIELDS:
+                query[field] = {"$regex": f"^{re.escape(value)}$", "$options": "i"}
+            else:
+                query[field] = _value(value)
+
+    for field, (min_param, max_param) in RANGE_FILTERS.items():
+        bounds = {}
+        min_value = getattr(search_params, min_param)
+        max_value = getattr(search_params, max_param)
+        if min_value is not None:
+            bounds["$gte"] = min_value
+        if max_value is not None:
+            bounds["$lte"] = max_value
+        if bounds:
+            query[field] = bounds
+
+    if search_params.within_box is not None:
+        query["location"] = {"$geoWithin": {"$geometry": bounding_box_polygon(search_params.within_box)}}
+
+    # Properties without an availability date are available immediately
+    if search_params.available_from is not None:
+        query["$or"] = [
+            {"available_from": None},
+            {"available_from": {"$lte": search_params.available_from}}
+        ]
+
+    return query
+
+
+def build_count_query(search_params: PropertySearchParams) -> Dict[str, Any]:
+    """
+    Build a filter counting the matches of a search, for count_documents.
+
+    count_documents cannot run $geoNear, so a radius search is counted with
+    the equivalent $geoWithin/$centerSphere filter, which needs no ordering.
+
+    Args:
+        search_params: Search parameters
+
+    Returns:
+        MongoDB filter document
+    """
+    query = build_search_query(search_params)
+    near = search_params.near
+    if near is None:
+        return query
+
+    radius = {"$geoWithin": {"$centerSphere": [
+        [near.longitude, near.latitude],
+        near.max_distance / EARTH_RADIUS_METERS
+    ]}}
+    if "location" in query:
+        # Both a bounding box and a radius constrain the location
+        return {"$and": [query, {"location": radius}]}
+    query["location"] = radius
+    return query
+
+
+def build_geo_near_pipeline(
+    search_params: PropertySearchParams,
+    skip: int = 0,
+    limit: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    Build an aggregation pipeline for a radius search.
+
+    $geoNear must be the first stage; it applies the remaining filters
+    through its query option and returns results ordered by distance, with
+    the distance in meters stored in the distance field.
+
+    Args:
+        search_params: Search parameters with near set
+        skip: Number of results to skip
+        limit: Maximum number of results
+
+    Returns:
+        Aggregation pipeline
+    """
+    return [_geo_near_stage(search_params), {"$skip": skip}, {"$limit": limit}]
+
+
+def _geo_near_stage(search_params: PropertySearchParams) -> Dict[str, Any]:
+    """Return the $geoNear stage for a radius search."""
+    near = search_params.near
+    return {
+        "$geoNear": {
+            "near": {"type": "Point", "coordinates": [near.longitude, near.latitude]},
+            "key": "location",
+            "distanceField": "distance",
+            "maxDistance": near.max_distance,
+            "spherical": True,
+            "query": build_search_query(search_params)
+        }
+    }
+
+
+def build_facet_pipeline(
+    search_params: PropertySearchParams,
+    skip: int = 0,
+    limit: int = 10,
+    include_facets: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Build a single aggregation returning a results page, the total and facet counts.
+
+    The total is counted only together with the facets, which read every
+    match anyway; without facets it is left to the count strategy.
+
+    The filter runs once as the first stage, where it can use the search,
+    text or geo indexes; $facet then fans the matching documents out to the
+    page and to every facet count in the same round trip.
+
+    Args:
+        search_params: Search parameters
+        skip: Number of results to skip
+        limit: Maximum number of results
+        include_facets: Whether to compute the total and facet counts
+
+    Returns:
+        Aggregation pipeline producing one document with results, total and
+        one list per facet
+    """
+    if search_params.near is not None:
+        # $geoNear already orders by distance
+        pipeline = [_geo_near_stage(search_params)]
+        results = [{"$skip": skip}, {"$limit": limit}]
+    else:
+        pipeline = [{"$match": build_search_query(search_params)}]
+        sort = TEXT_SCORE_SORT if search_params.q else SEARCH_SORT
+        results = [{"$sort": dict(sort)}, {"$skip": skip}, {"$limit": limit}]
+
+    facets: Dict[str, List[Dict[str, Any]]] = {"results": results}
+    if include_facets:
+        facets.update({
+            "total": [{"$count": "count"}],
+            "property_type": [{"$sortByCount": "$property_type"}],
+            "city": [{"$sortByCount": "$address.city"}, {"$limit": CITY_FACET_LIMIT}],
+            "bedrooms": [{"$bucket": {
+                "groupBy": "$bedrooms",
+                "boundaries": BEDROOM_BUCKETS,
+                "default": f"{BEDROOM_BUCKETS[-1]}+"
+            }}],
+            "price": [{"$bucket": {
+                "groupBy": "$price",
+                "boundaries": PRICE_BUCKETS,
+                "default": f"{PRICE_BUCKETS[-1]}+"
+            }}],
+        })
+
+    pipeline.append({"$facet": facets})
+    return pipeline
+
+
+def format_facets(facet_result: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Convert raw $facet output into value/count lists.
+
+    Bucket facets report the [min, max) range of each bucket; the overflow
+    bucket has no max. Buckets one unit wide, like bedroom counts, are
+    labelled with their single value.
+    """
+    facets = {}
+    for name in ("property_type", "city"):
+        if name in facet_result:
+            facets[name] = [
+                {"value": bucket["_id"], "count": bucket["count"]}
+                for bucket in facet_result[name]
+                if bucket["_id"] is not None
+            ]
+
+    for name, boundaries in (("bedrooms", BEDROOM_BUCKETS), ("price", PRICE_BUCKETS)):
+        if name not in facet_result:
+            continue
+        facets[name] = []
+        for bucket in facet_result[name]:
+            lower = bucket["_id"]
+            if isinstance(lower, str):
+                entry = {"value": lower, "min": boundaries[-1], "max": None}
+            else:
+                upper = boundaries[boundaries.index(lower) + 1]
+                label = str(lower) if upper - lower == 1 else f"{lower}-{upper}"
+                entry = {"value": label, "min": lower, "max": upper}
+            entry["count"] = bucket["count"]
+            facets[name].append(entry)
+
+    return facets
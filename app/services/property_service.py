@@ -17,21 +17,111 @@ from app.core.mongo_db import (
     update_document,
     delete_document,
     list_documents,
-    format_document_for_response
+    format_document_for_response,
+    keyset_query
 )
 from app.config.settings import settings
+from app.core.cache import MISSING, ReadThroughCache
+from app.core.change_stream import register_change_handler, register_reset_handler
+from app.core.config import settings as core_settings
+from app.core.counts import CountStrategy, ResultCount
+from app.db.indexes import SEARCH_COLLATION
 from app.models.property import (
     PropertyCreate, 
     PropertyUpdate, 
     PropertyDB, 
+    PropertyImage,
     PropertyResponse,
     PropertySearchParams,
     PropertyStatus
 )
+from app.services.listing_index import ListingIndex
+from app.services.market_stats_service import MarketStatsService
+from app.services.property_summary_service import PropertySummaryService
+from app.services.similar_properties import SimilarPropertyIndex
+from app.services.search_cache import SearchResultCache
+from app.services.property_search import (
+    build_search_query,
+    build_count_query,
+    build_geo_near_pipeline,
+    build_facet_pipeline,
+    format_facets,
+    SEARCH_SORT,
+    TEXT_SCORE_PROJECTION,
+    TEXT_SCORE_SORT
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Fields a listing card needs from the cover photo
+COVER_PHOTO_PROJECTION = {
+    "property_id": 1,
+    "photo_url": 1,
+    "description": 1,
+    "is_primary": 1,
+    "created_at": 1
+}
+MAX_PHOTOS_PER_PROPERTY = 50
+
+
+def cover_photo_image(photo: Dict) -> Optional[PropertyImage]:
+    """Convert a property_photos document to a PropertyImage, if it has a URL."""
+    if not photo.get("photo_url"):
+        return None
+    image = {
+        "id": photo["id"],
+        "url": photo["photo_url"],
+        "caption": photo.get("description"),
+        # Stored as "0"/"1", matching the SQL property_photos table
+        "is_primary": photo.get("is_primary") in (True, 1, "1")
+    }
+    if photo.get("created_at"):
+        image["created_at"] = photo["created_at"]
+    return PropertyImage(**image)
+
+# Read-through cache for property detail lookups
+property_cache = ReadThroughCache(
+    "property",
+    maxsize=core_settings.PROPERTY_CACHE_SIZE,
+    ttl=core_settings.PROPERTY_CACHE_TTL,
+    redis_url=core_settings.PROPERTY_CACHE_REDIS_URL,
+    serialize=lambda prop: prop.json(),
+    deserialize=PropertyDB.parse_raw
+)
+# Drop entries changed through other workers (see app.core.change_stream)
+register_change_handler("properties", property_cache.invalidate_local)
+register_reset_handler(property_cache.clear_local)
+
+# Result pages of repeated searches; any property write starts a new generation
+search_cache = SearchResultCache(
+    maxsize=core_settings.SEARCH_CACHE_SIZE,
+    ttl=core_settings.SEARCH_CACHE_TTL
+)
+register_change_handler("properties", search_cache.bump)
+register_reset_handler(search_cache.bump)
+
+# Columnar snapshot answering numeric range searches in memory; loaded at
+# startup when LISTING_INDEX_ENABLED is set, inactive otherwise
+listing_index = ListingIndex()
+register_change_handler("properties", listing_index.refresh)
+register_reset_handler(listing_index.reload)
+
+# Feature vectors for similar-listing recommendations; loaded on first use,
+# or at startup when SIMILAR_PROPERTIES_PRELOAD is set
+similar_index = SimilarPropertyIndex()
+register_change_handler("properties", similar_index.refresh)
+register_reset_handler(similar_index.reload)
+
+# Result totals for listing and search pages
+property_counts = CountStrategy(
+    exact_limit=core_settings.COUNT_EXACT_LIMIT,
+    sample_size=core_settings.COUNT_SAMPLE_SIZE,
+    ttl=core_settings.COUNT_CACHE_TTL,
+    maxsize=core_settings.COUNT_CACHE_SIZE
+)
+
+
 class PropertyService:
     """Service for property database operations."""
     
@@ -65,7 +155,13 @@ class PropertyService:
             property_data.blockchain_id = None
         
         # Create document in MongoDB
-        property_id = await create_document(cls.COLLECTION, property_data.dict())
+        document = property_data.dict()
+        property_id = await create_document(cls.COLLECTION, document)
+        await PropertySummaryService.add_many([document])
+        search_cache.bump()
+        listing_index.upsert(document)
+        similar_index.upsert(document)
+        MarketStatsService.mark_dirty(document)
         
         logger.info(f"Created property with ID {property_id}")
         
@@ -84,71 +180,78 @@ class PropertyService:
         """
         logger.info(f"Fetching property with ID {property_id}")
         
-        # Mock property database
-        properties = {
-            "1": PropertyDB(
-                id="1",
-                title="Luxury Downtown Apartment",
-                description="Beautiful apartment in the heart of downtown",
-                property_type="apartment",
-                bedrooms=2,
-                bathrooms=2.0,
-                area=1200.0,
-                price=2500.0,
-                owner_id="2",  # Landlord user
-                address={
-                    "street": "123 Main St",
-                    "city": "New York",
-                    "state": "NY",
-                    "zip_code": "10001",
-                    "country": "USA"
-                },
-                created_at=datetime(2025, 1, 1),
-                status="available"
-            ),
-            "2": PropertyDB(
-                id="2",
-                title="Cozy Studio Near Park",
-                description="Perfect studio apartment near Central Park",
-                property_type="apartment",
-                bedrooms=0,
-                bathrooms=1.0,
-                area=500.0,
-                price=1500.0,
-                owner_id="2",  # Landlord user
-                address={
-                    "street": "456 Park Ave",
-                    "city": "New York",
-                    "state": "NY",
-                    "zip_code": "10002",
-                    "country": "USA"
-                },
-                created_at=datetime(2025, 1, 2),
-                status="available"
-            ),
-            "3": PropertyDB(
-                id="3",
-                title="Spacious Family Home",
-                description="Large family home with backyard",
-                property_type="house",
-                bedrooms=4,
-                bathrooms=3.5,
-                area=2500.0,
-                price=3500.0,
-                owner_id="2",  # Landlord user
-                address={
-                    "street": "789 Suburb Dr",
-                    "city": "Chicago",
-                    "state": "IL",
-                    "zip_code": "60007",
-                    "country": "USA"
-                },
-                created_at=datetime(2025, 1, 3),
-                status="available"
-            )
+        prop = await property_cache.get_or_load(
+            property_id,
+            lambda: cls._load_property(property_id)
+        )
+        # Copied, so callers editing the result never change the cached instance
+        return prop.copy() if prop is not None else None
+    
+    @classmethod
+    async def _load_property(cls, property_id: str) -> Optional[PropertyDB]:
+        """Load a property from MongoDB, bypassing the cache."""
+        if not ObjectId.is_valid(property_id):
+            return None
+        
+        document = await get_document(cls.COLLECTION, property_id)
+        return PropertyDB(**document) if document else None
+    
+    @classmethod
+    def get_cache_stats(cls) -> Dict[str, Any]:
+        """Return property, search and count cache counters."""
+        return {
+            "property": property_cache.stats(),
+            "search": search_cache.stats(),
+            "count": property_counts.stats(),
+            "listing_index": listing_index.stats(),
+            "similar_index": similar_index.stats()
         }
+    
+    @classmethod
+    async def get_properties_by_ids(cls, property_ids: List[str]) -> List[PropertyDB]:
+        """
+        Load properties in the given order, from the property cache where
+        possible and with one query for the rest.
+        """
+        found: Dict[str, PropertyDB] = {}
+        missing = []
+        for property_id in property_ids:
+            cached = property_cache.local.get(property_id)
+            if cached is MISSING or cached is None:
+                missing.append(ObjectId(property_id))
+            else:
+                # Copied, since callers set cover photos on the results
+                found[property_id] = cached.copy()
+        
+        if missing:
+            collection = await get_collection(cls.COLLECTION)
+            async for document in collection.find({"_id": {"$in": missing}}):
+                prop = PropertyDB(**format_document_for_response(document))
+                property_cache.local.set(prop.id, prop)
+                found[prop.id] = prop.copy()
+        
+        return [found[property_id] for property_id in property_ids if property_id in found]
+    
+    @classmethod
+    async def get_similar_properties(cls, property_id: str, limit: int = 6) -> Optional[List[PropertyDB]]:
+        """
+        Get the available properties most similar to a property.
+        
+        Args:
+            property_id: Property ID
+            limit: Maximum number of recommendations
+            
+        Returns:
+            Similar properties, most similar first, or None if the property
+            does not exist
+        """
+        prop = await cls.get_property(property_id)
+        if not prop:
+            return None
         
-        return properties.get(property_id)
+        await similar_index.ensure_loaded()
+        ids = similar_index.similar(prop.dict(), limit)
+        return await cls._attach_cover_photos(await cls.get_properties_by_ids(ids))
     
     @classmethod
     async def get_property_by_blockchain_id(cls, blockchain_id: str) -> Optional[Dict]:
@@ -190,6 +293,15 @@ class PropertyService:
             **{**existing_property.dict(), **update_data},
             updated_at=datetime.utcnow()
         )
+        await update_document(cls.COLLECTION, property_id, dict(update_data))
+        await property_cache.invalidate(property_id)
+        search_cache.bump()
+        listing_index.upsert(updated_property.dict())
+        similar_index.upsert(updated_property.dict())
+        # The city or type may have changed, so both groups are recomputed
+        MarketStatsService.mark_dirty(existing_property.dict())
+        MarketStatsService.mark_dirty(updated_property.dict())
+        await PropertySummaryService.refresh(property_id)
         
         logger.info(f"Updated property: {property_id}")
         
@@ -220,7 +332,15 @@ class PropertyService:
             return False
             
         # Delete the document from MongoDB
-        return await delete_document(cls.COLLECTION, property_id)
+        deleted = await delete_document(cls.COLLECTION, property_id)
+        await property_cache.invalidate(property_id)
+        search_cache.bump()
+        listing_index.remove(property_id)
+        similar_index.remove(property_id)
+        MarketStatsService.mark_dirty(existing_property.dict())
+        await PropertySummaryService.delete(property_id)
+        
+        return deleted
     
     @classmethod
     async def list_properties(
@@ -228,33 +348,51 @@ class PropertyService:
         filter_query: Dict = None, 
         skip: int = 0, 
         limit: int = 20,
-        sort: List = None
+        sort: List = None,
+        cursor: Optional[str] = None,
+        projection: Optional[Dict] = None
     ) -> List[Dict]:
-        """List properties with pagination and filtering."""
-        return await list_documents(
+        """List properties with offset or cursor pagination and filtering."""
+        properties = await list_documents(
             cls.COLLECTION, 
             filter_query=filter_query, 
             skip=skip, 
             limit=limit,
-            sort=sort
+            sort=sort,
+            cursor=cursor,
+            projection=projection
         )
+        return await cls._attach_cover_photos(properties)
     
     @classmethod
-    async def count_properties(cls, filter_query: Dict = None) -> int:
-        """Count properties with optional filtering."""
+    async def count_properties(cls, filter_query: Dict = None) -> ResultCount:
+        """
+        Count properties with optional filtering.
+        
+        Unfiltered totals are read from collection metadata, filtered ones
+        are cached briefly and estimated when large (see app.core.counts).
+        """
         collection = await get_collection(cls.COLLECTION)
+        return await property_counts.count(collection, filter_query)
+    
+    @classmethod
+    async def count_search_results(cls, search_params: PropertySearchParams) -> ResultCount:
+        """Count the properties matching a search, with the same strategy."""
+        if listing_index.ready and listing_index.can_answer(search_params):
+            return ResultCount(count=listing_index.count(search_params))
         
-        # Default empty filter
-        if filter_query is None:
-            filter_query = {}
-            
-        return await collection.count_documents(filter_query)
+        collection = await get_collection(cls.COLLECTION)
+        # Text indexes do not support collations
+        collation = None if search_params.q else SEARCH_COLLATION
+        return await property_counts.count(collection, build_count_query(search_params), collation)
     
     @classmethod
     async def add_property_photo(cls, property_id: str, photo_data: Dict) -> str:
         """Add a photo to a property."""
         photo_data["property_id"] = property_id
         photo_id = await create_document("property_photos", photo_data)
+        search_cache.bump()
+        await PropertySummaryService.refresh_cover_photo(property_id)
         return photo_id
     
     @classmethod
@@ -263,9 +401,71 @@ class PropertyService:
         return await list_documents(
             "property_photos",
             filter_query={"property_id": property_id},
-            limit=50
+            limit=MAX_PHOTOS_PER_PROPERTY,
+            projection={"photo_data": 0}
         )
     
+    @classmethod
+    async def get_photos_for_properties(
+        cls,
+        property_ids: List[str],
+        cover_only: bool = False
+    ) -> Dict[str, List[Dict]]:
+        """
+        Get photos for many properties in one query.
+        
+        Photos are matched with a single $in and grouped per property on the
+        server, primary photo first. Binary photo data is never returned.
+        
+        Args:
+            property_ids: Property IDs
+            cover_only: Return only the cover photo of each property, with
+                just the fields a listing card needs
+            
+        Returns:
+            Dict mapping property ID to its photos; properties without
+            photos are omitted
+        """
+        if not property_ids:
+            return {}
+        
+        collection = await get_collection("property_photos")
+        pipeline = [
+            {"$match": {"property_id": {"$in": list(set(property_ids))}}},
+            {"$project": COVER_PHOTO_PROJECTION if cover_only else {"photo_data": 0}},
+            # Served by the (property_id, is_primary, created_at) index
+            {"$sort": {"property_id": 1, "is_primary": -1, "created_at": 1}},
+            {"$group": {"_id": "$property_id", "photos": {"$push": "$$ROOT"}}},
+            {"$project": {"photos": {"$slice": ["$photos", 1 if cover_only else MAX_PHOTOS_PER_PROPERTY]}}},
+        ]
+        
+        groups = await collection.aggregate(pipeline).to_list(length=None)
+        return {
+            group["_id"]: [format_document_for_response(photo) for photo in group["photos"]]
+            for group in groups
+        }
+    
+    @classmethod
+    async def _attach_cover_photos(cls, properties: List[Any]) -> List[Any]:
+        """Set cover_photo on property models or dicts with one batched query."""
+        def property_id(prop):
+            return prop["id"] if isinstance(prop, dict) else prop.id
+        
+        covers = await cls.get_photos_for_properties(
+            [property_id(prop) for prop in properties],
+            cover_only=True
+        )
+        
+        for prop in properties:
+            photos = covers.get(property_id(prop))
+            cover = cover_photo_image(photos[0]) if photos else None
+            if isinstance(prop, dict):
+                prop["cover_photo"] = cover.dict() if cover else None
+            else:
+                prop.cover_photo = cover
+        
+        return properties
+    
     @classmethod
     async def update_property_blockchain_id(cls, property_id: str, blockchain_id: str) -> bool:
         """
@@ -280,13 +480,15 @@ class PropertyService:
         """
         logger.info(f"Updating blockchain ID for property {property_id}: {blockchain_id}")
         
-        # In a real implementation, we would update the document in MongoDB
-        # For demonstration, always return True
-        return await update_document(
+        updated = await update_document(
             cls.COLLECTION,
             property_id,
             {"blockchain_id": blockchain_id}
         )
+        await property_cache.invalidate(property_id)
+        search_cache.bump()
+        
+        return updated
     
     @classmethod
     async def get_properties_by_owner(cls, owner_id: str) -> List[PropertyDB]:
@@ -301,20 +503,20 @@ class PropertyService:
         """
         logger.info(f"Fetching properties for owner {owner_id}")
         
-        # In a real implementation, we would query MongoDB
-        # For demonstration, we'll return mock data
-        return await list_documents(
+        properties = await list_documents(
             cls.COLLECTION,
             filter_query={"owner_id": owner_id},
             sort=[("created_at", -1)]
         )
+        return await cls._attach_cover_photos(properties)
     
     @classmethod
     async def search_properties(
         cls, 
         search_params: PropertySearchParams, 
         limit: int = 10, 
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[PropertyDB]:
         """
         Search properties with filters and pagination.
@@ -322,130 +524,148 @@ class PropertyService:
         Args:
             search_params: Search parameters
             limit: Maximum number of results
-            offset: Offset for pagination
+            offset: Offset for pagination (ignored when cursor is set)
+            cursor: Keyset cursor from the previous page
             
         Returns:
             List of properties matching search criteria
         """
+        cls._validate_search(search_params, cursor)
+        
+        return await search_cache.get_or_search(
+            "search",
+            search_params,
+            lambda: cls._search_properties(search_params, limit, offset, cursor),
+            limit=limit,
+            offset=offset,
+            cursor=cursor
+        )
+    
+    @classmethod
+    async def _search_properties(
+        cls,
+        search_params: PropertySearchParams,
+        limit: int,
+        offset: int,
+        cursor: Optional[str]
+    ) -> List[PropertyDB]:
+        """Run a search against MongoDB."""
         logger.info(f"Searching properties with filters: {search_params}")
         
-        # In a real implementation, we would query MongoDB
-        # For demonstration, we'll return mock data
-        properties = [
-            PropertyDB(
-                id="1",
-                title="Luxury Downtown Apartment",
-                description="Beautiful apartment in the heart of downtown",
-                property_type="apartment",
-                bedrooms=2,
-                bathrooms=2.0,
-                area=1200.0,
-                price=2500.0,
-                owner_id="2",
-                address={
-                    "street": "123 Main St",
-                    "city": "New York",
-                    "state": "NY",
-                    "zip_code": "10001",
-                    "country": "USA"
-                },
-                created_at=datetime(2025, 1, 1),
-                status="available"
-            ),
-            PropertyDB(
-                id="2",
-                title="Cozy Studio Near Park",
-                description="Perfect studio apartment near Central Park",
-                property_type="apartment",
-                bedrooms=0,
-                bathrooms=1.0,
-                area=500.0,
-                price=1500.0,
-                owner_id="2",
-                address={
-                    "street": "456 Park Ave",
-                    "city": "New York",
-                    "state": "NY",
-                    "zip_code": "10002",
-                    "country": "USA"
-                },
-                created_at=datetime(2025, 1, 2),
-                status="available"
-            ),
-            PropertyDB(
-                id="3",
-                title="Spacious Family Home",
-                description="Large family home with backyard",
-                property_type="house",
-                bedrooms=4,
-                bathrooms=3.5,
-                area=2500.0,
-                price=3500.0,
-                owner_id="2",
-                address={
-                    "street": "789 Suburb Dr",
-                    "city": "Chicago",
-                    "state": "IL",
-                    "zip_code": "60007",
-                    "country": "USA"
-                },
-                created_at=datetime(2025, 1, 3),
-                status="available"
+        if listing_index.ready and not cursor and listing_index.can_answer(search_params):
+            ids, _ = listing_index.search(search_params, skip=offset, limit=limit)
+            return await cls._attach_cover_photos(await cls.get_properties_by_ids(ids))
+        
+        collection = await get_collection(cls.COLLECTION)
+        
+        if search_params.near is not None:
+            pipeline = build_geo_near_pipeline(search_params, skip=offset, limit=limit)
+            results = collection.aggregate(pipeline, collation=SEARCH_COLLATION)
+        elif search_params.q:
+            # Text indexes do not support collations, so keyword searches
+            # run with the default one and rank by relevance
+            results = (
+                collection.find(build_search_query(search_params), TEXT_SCORE_PROJECTION)
+                .sort(TEXT_SCORE_SORT)
+                .skip(offset)
+                .limit(limit)
             )
-        ]
+        else:
+            # Run the whole filter server-side against the search indexes
+            query = keyset_query(build_search_query(search_params), SEARCH_SORT, cursor)
+            results = collection.find(query, collation=SEARCH_COLLATION).sort(SEARCH_SORT)
+            if not cursor:
+                results = results.skip(offset)
+            results = results.limit(limit)
         
-        # Apply filters
-        filtered_properties = properties
+        documents = await results.to_list(length=limit)
         
-        # Filter by property type
-        if search_params.property_type:
-            filtered_properties = [p for p in filtered_properties if p.property_type == search_params.property_type]
-            
-        # Filter by price range
-        if search_params.min_price is not None:
-            filtered_properties = [p for p in filtered_properties if p.price >= search_params.min_price]
-        if search_params.max_price is not None:
-            filtered_properties = [p for p in filtered_properties if p.price <= search_params.max_price]
-            
-        # Filter by bedrooms
-        if search_params.min_bedrooms is not None:
-            filtered_properties = [p for p in filtered_properties if p.bedrooms >= search_params.min_bedrooms]
-        if search_params.max_bedrooms is not None:
-            filtered_properties = [p for p in filtered_properties if p.bedrooms <= search_params.max_bedrooms]
-            
-        # Filter by bathrooms
-        if search_params.min_bathrooms is not None:
-            filtered_properties = [p for p in filtered_properties if p.bathrooms >= search_params.min_bathrooms]
-        if search_params.max_bathrooms is not None:
-            filtered_properties = [p for p in filtered_properties if p.bathrooms <= search_params.max_bathrooms]
-            
-        # Filter by area
-        if search_params.min_area is not None:
-            filtered_properties = [p for p in filtered_properties if p.area >= search_params.min_area]
-        if search_params.max_area is not None:
-            filtered_properties = [p for p in filtered_properties if p.area <= search_params.max_area]
-            
-        # Filter by location
-        if search_params.city:
-            filtered_properties = [p for p in filtered_properties if p.address.city.lower() == search_params.city.lower()]
-        if search_params.state:
-            filtered_properties = [p for p in filtered_properties if p.address.state.lower() == search_params.state.lower()]
-        if search_params.country:
-            filtered_properties = [p for p in filtered_properties if p.address.country.lower() == search_params.country.lower()]
-            
-        # Filter by amenities
-        if search_params.is_furnished is not None:
-            filtered_properties = [p for p in filtered_properties if p.is_furnished == search_params.is_furnished]
-        if search_params.pets_allowed is not None:
-            filtered_properties = [p for p in filtered_properties if p.pets_allowed == search_params.pets_allowed]
-        if search_params.utilities_included is not None:
-            filtered_properties = [p for p in filtered_properties if p.utilities_included == search_params.utilities_included]
-            
-        # Filter by status
-        if search_params.status:
-            filtered_properties = [p for p in filtered_properties if p.status == search_params.status]
+        properties = [PropertyDB(**format_document_for_response(doc)) for doc in documents]
+        return await cls._attach_cover_photos(properties)
+    
+    @classmethod
+    async def search_properties_with_facets(
+        cls,
+        search_params: PropertySearchParams,
+        limit: int = 10,
+        offset: int = 0,
+        include_facets: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Search properties and count facets in a single aggregation.
+        
+        Args:
+            search_params: Search parameters
+            limit: Maximum number of results
+            offset: Offset for pagination
+            include_facets: Whether to count property types, cities,
+                bedroom and price buckets
             
-        # Apply pagination
-        paginated_properties = filtered_properties[offset:offset + limit]
+        Returns:
+            Dict with the page of items, the total match count and facets
+        """
+        cls._validate_search(search_params)
+        
+        return await search_cache.get_or_search(
+            "facets",
+            search_params,
+            lambda: cls._search_properties_with_facets(search_params, limit, offset, include_facets),
+            limit=limit,
+            offset=offset,
+            include_facets=include_facets
+        )
+    
+    @classmethod
+    async def _search_properties_with_facets(
+        cls,
+        search_params: PropertySearchParams,
+        limit: int,
+        offset: int,
+        include_facets: bool
+    ) -> Dict[str, Any]:
+        """Run a faceted search aggregation against MongoDB."""
+        logger.info(f"Faceted search with filters: {search_params}")
+        
+        if not include_facets and listing_index.ready and listing_index.can_answer(search_params):
+            ids, total = listing_index.search(search_params, skip=offset, limit=limit)
+            return {
+                "items": await cls._attach_cover_photos(await cls.get_properties_by_ids(ids)),
+                "total": total,
+                "total_exact": True,
+                "facets": None
+            }
+        
+        collection = await get_collection(cls.COLLECTION)
+        pipeline = build_facet_pipeline(search_params, skip=offset, limit=limit, include_facets=include_facets)
+        
+        # Text indexes do not support collations
+        options = {} if search_params.q else {"collation": SEARCH_COLLATION}
+        results = await collection.aggregate(pipeline, **options).to_list(length=1)
+        facet_result = results[0] if results else {}
+        
+        properties = [
+            PropertyDB(**format_document_for_response(doc))
+            for doc in facet_result.get("results", [])
+        ]
+        if include_facets:
+            total = ResultCount(count=(facet_result.get("total") or [{"count": 0}])[0]["count"])
+        else:
+            total = await cls.count_search_results(search_params)
+        return {
+            "items": await cls._attach_cover_photos(properties),
+            "total": total.count,
+            "total_exact": total.exact,
+            "facets": format_facets(facet_result) if include_facets else None
+        }
+    
+    @staticmethod
+    def _validate_search(search_params: PropertySearchParams, cursor: Optional[str] = None) -> None:
+        """Reject search combinations MongoDB cannot run."""
+        # Radius and keyword searches are ordered by distance or relevance,
+        # so they page by offset only
+        if cursor and (search_params.near is not None or search_params.q):
+            raise ValueError("Cursor pagination is not supported for radius or keyword searches")
         
-        return paginated_properties 
\ No newline at end of file
+        # $geoNear cannot be combined with $text
+        if search_params.near is not None and search_params.q:
+            raise ValueError("Keyword search cannot be combined with a radius search") 
\ No newline at end of file
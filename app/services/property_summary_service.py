@@ -0,0 +1,289 @@
+"""
+Property summary read model.
+
+property_summaries holds one flat document per property with just the
+fields listing pages render: title, price, location, bedrooms, cover photo
+URL and proposal count. It is kept current by the property, photo and
+proposal write paths, so list pages read one collection through a covering
+index instead of joining properties, property_photos and rental_info.
+
+The card endpoints, GET /api/properties/summaries and /my/summaries, read
+only this model, and each summary index serves one of their query shapes.
+The search and /my endpoints keep returning full properties from the
+properties collection: their responses include fields the cards do not
+hold (description, address, bathrooms, area, features, cover photo
+details), so they cannot be served from these indexes.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReplaceOne, UpdateOne
+
+from app.core.mongo_db import get_collection, list_documents
+from app.db.indexes import PROPERTY_SUMMARY_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Projection limited to index keys, so list queries are covered
+SUMMARY_PROJECTION = {field: 1 for field in PROPERTY_SUMMARY_FIELDS}
+
+# Orderings served by the summary indexes; _id is appended as tie-breaker
+SUMMARY_PRICE_SORT = [("price", ASCENDING)]
+SUMMARY_NEWEST_SORT = [("created_at", DESCENDING)]
+
+
+def _value(value: Any) -> Any:
+    """Unwrap enum members so summaries store plain values."""
+    return getattr(value, "value", value)
+
+
+def build_summary(
+    property_doc: Dict[str, Any],
+    cover_photo_url: Optional[str] = None,
+    proposal_count: int = 0
+) -> Dict[str, Any]:
+    """
+    Build a summary document from a stored property document.
+
+    Args:
+        property_doc: Property document as stored, with _id
+        cover_photo_url: URL of the cover photo, if any
+        proposal_count: Number of proposals for the property
+
+    Returns:
+        Summary document keyed by the property _id
+    """
+    address = property_doc.get("address") or {}
+    city = address.get("city")
+    return {
+        "_id": property_doc["_id"],
+        "title": property_doc.get("title"),
+        "price": property_doc.get("price"),
+        "currency": property_doc.get("currency", "USD"),
+        "city": city,
+        "city_key": (city or "").lower(),
+        "state": address.get("state"),
+        "bedrooms": property_doc.get("bedrooms"),
+        "property_type": _value(property_doc.get("property_type")),
+        "status": _value(property_doc.get("status")),
+        "owner_id": property_doc.get("owner_id"),
+        "cover_photo_url": cover_photo_url,
+        "proposal_count": proposal_count,
+        "created_at": property_doc.get("created_at"),
+    }
+
+
+def build_summary_query(
+    status: Optional[str] = "available",
+    city: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_bedrooms: Optional[int] = None,
+    max_bedrooms: Optional[int] = None,
+    owner_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build a summary filter using only fields held by the summary indexes."""
+    query: Dict[str, Any] = {}
+    if owner_id is not None:
+        query["owner_id"] = owner_id
+    if status is not None:
+        query["status"] = status
+    if city:
+        query["city_key"] = city.lower()
+    for field, low, high in (("price", min_price, max_price), ("bedrooms", min_bedrooms, max_bedrooms)):
+        bounds = {}
+        if low is not None:
+            bounds["$gte"] = low
+        if high is not None:
+            bounds["$lte"] = high
+        if bounds:
+            query[field] = bounds
+    return query
+
+
+# Rebuilds every summary from the source collections in one server-side
+# aggregation. property_id in property_photos and rental_info holds the
+# property _id as a string.
+REBUILD_PIPELINE: List[Dict[str, Any]] = [
+    {"$addFields": {"_property_id": {"$toString": "$_id"}}},
+    {"$lookup": {
+        "from": "property_photos",
+        "let": {"property_id": "$_property_id"},
+        "pipeline": [
+            {"$match": {"$expr": {"$eq": ["$property_id", "$$property_id"]}}},
+            {"$sort": {"is_primary": -1, "created_at": 1}},
+            {"$limit": 1},
+            {"$project": {"_id": 0, "photo_url": 1}},
+        ],
+        "as": "_cover"
+    }},
+    {"$lookup": {
+        "from": "rental_info",
+        "let": {"property_id": "$_property_id"},
+        "pipeline": [
+            {"$match": {"$expr": {"$eq": ["$property_id", "$$property_id"]}}},
+            {"$project": {"_id": 0, "number_of_proposals": 1}},
+        ],
+        "as": "_rental_info"
+    }},
+    {"$project": {
+        "title": 1,
+        "price": 1,
+        "currency": {"$ifNull": ["$currency", "USD"]},
+        "city": "$address.city",
+        "city_key": {"$toLower": "$address.city"},
+        "state": "$address.state",
+        "bedrooms": 1,
+        "property_type": 1,
+        "status": 1,
+        "owner_id": 1,
+        "cover_photo_url": {"$arrayElemAt": ["$_cover.photo_url", 0]},
+        "proposal_count": {"$sum": "$_rental_info.number_of_proposals"},
+        "created_at": 1,
+    }},
+    {"$out": "property_summaries"},
+]
+
+
+class PropertySummaryService:
+    """Service maintaining and reading the property summary read model."""
+
+    COLLECTION = "property_summaries"
+
+    @classmethod
+    async def refresh(cls, property_id: str) -> None:
+        """
+        Recompute the summary of one property from the source collections.
+
+        Removes the summary if the property no longer exists.
+        """
+        if not ObjectId.is_valid(property_id):
+            return
+
+        properties = await get_collection("properties")
+        property_doc = await properties.find_one({"_id": ObjectId(property_id)})
+        if property_doc is None:
+            await cls.delete(property_id)
+            return
+
+        summary = build_summary(
+            property_doc,
+            await cls._cover_photo_url(property_id),
+            await cls._proposal_count(property_id)
+        )
+        collection = await get_collection(cls.COLLECTION)
+        await collection.replace_one({"_id": summary["_id"]}, summary, upsert=True)
+
+    @classmethod
+    async def add_many(cls, property_docs: List[Dict[str, Any]]) -> None:
+        """Add summaries for newly created properties, which have no photos or proposals yet."""
+        if not property_docs:
+            return
+        collection = await get_collection(cls.COLLECTION)
+        await collection.bulk_write(
+            [ReplaceOne({"_id": doc["_id"]}, build_summary(doc), upsert=True) for doc in property_docs],
+            ordered=False
+        )
+
+    @classmethod
+    async def delete(cls, property_id: str) -> None:
+        """Remove the summary of a deleted property."""
+        if not ObjectId.is_valid(property_id):
+            return
+        collection = await get_collection(cls.COLLECTION)
+        await collection.delete_one({"_id": ObjectId(property_id)})
+
+    @classmethod
+    async def refresh_cover_photo(cls, property_id: str) -> None:
+        """Update the cover photo URL after the photos of a property change."""
+        if not ObjectId.is_valid(property_id):
+            return
+        collection = await get_collection(cls.COLLECTION)
+        await collection.update_one(
+            {"_id": ObjectId(property_id)},
+            {"$set": {"cover_photo_url": await cls._cover_photo_url(property_id)}}
+        )
+
+    @classmethod
+    async def increment_proposal_counts(cls, changes: Dict[str, int]) -> None:
+        """
+        Adjust the proposal counts of several properties in one bulk write.
+
+        Counts clamp at zero, so a coalesced decrement larger than the
+        stored count still applies instead of being dropped.
+        """
+        requests = []
+        for property_id, amount in changes.items():
+            if not amount or not ObjectId.is_valid(property_id):
+                continue
+            count = {"$add": [{"$ifNull": ["$proposal_count", 0]}, amount]}
+            requests.append(
+                UpdateOne({"_id": ObjectId(property_id)}, [{"$set": {"proposal_count": {"$max": [0, count]}}}])
+            )
+        if requests:
+            collection = await get_collection(cls.COLLECTION)
+            await collection.bulk_write(requests, ordered=False)
+
+    @classmethod
+    async def rebuild(cls) -> int:
+        """
+        Rebuild every summary from the source collections.
+
+        $out replaces the collection atomically and keeps its indexes, so
+        readers see either the old or the new summaries, never a mix.
+
+        Returns:
+            Number of summaries written
+        """
+        properties = await get_collection("properties")
+        await properties.aggregate(REBUILD_PIPELINE).to_list(length=None)
+        collection = await get_collection(cls.COLLECTION)
+        count = await collection.count_documents({})
+        logger.info(f"Rebuilt {count} property summaries")
+        return count
+
+    @classmethod
+    async def list_summaries(
+        cls,
+        filter_query: Dict = None,
+        skip: int = 0,
+        limit: int = 20,
+        sort: List = None,
+        cursor: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        List summaries with offset or cursor pagination.
+
+        Filters and sorts should use fields of one of the summary indexes
+        (status, city_key, price, owner_id, created_at, or any listed field)
+        for the query to stay covered.
+        """
+        return await list_documents(
+            cls.COLLECTION,
+            filter_query=filter_query,
+            skip=skip,
+            limit=limit,
+            sort=sort,
+            cursor=cursor,
+            projection=SUMMARY_PROJECTION
+        )
+
+    @staticmethod
+    async def _cover_photo_url(property_id: str) -> Optional[str]:
+        """Return the URL of the primary (or oldest) photo of a property."""
+        photos = await get_collection("property_photos")
+        photo = await photos.find_one(
+            {"property_id": property_id},
+            {"photo_url": 1},
+            sort=[("is_primary", -1), ("created_at", 1)]
+        )
+        return photo.get("photo_url") if photo else None
+
+    @staticmethod
+    async def _proposal_count(property_id: str) -> int:
+        """Return the proposal count tracked in rental_info."""
+        rental_info = await get_collection("rental_info")
+        document = await rental_info.find_one({"property_id": property_id}, {"number_of_proposals": 1})
+        return document.get("number_of_proposals", 0) if document else 0
@@ -0,0 +1,220 @@
+"""
+Proposal counters in rental_info.
+
+Each change is a single upserted $inc on the property's rental_info
+document; the unique index on rental_info.property_id makes concurrent
+first proposals update one document instead of creating duplicates.
+
+With PROPOSAL_COUNTER_BUFFERED set, changes are instead coalesced per
+property in memory and written as one bulk write every flush interval, so
+a burst of proposals on a hot property costs one write per interval. The
+counts then lag by up to one interval, and unflushed changes are lost if
+the worker dies.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from app.core.config import settings
+from app.core.mongo_db import get_collection
+from app.services.property_summary_service import PropertySummaryService
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "rental_info"
+DUPLICATE_KEY = 11000
+
+
+def _count_update(property_id: str, amount: int, now: datetime) -> UpdateOne:
+    """
+    Build the write applying amount to one counter.
+
+    Increments upsert the document; decrements never create one and clamp
+    the count at zero, so a coalesced decrement larger than the stored
+    count still lands instead of being dropped.
+    """
+    if amount > 0:
+        return UpdateOne(
+            {"property_id": property_id},
+            {
+                "$inc": {"number_of_proposals": amount},
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"created_at": now}
+            },
+            upsert=True
+        )
+    count = {"$add": [{"$ifNull": ["$number_of_proposals", 0]}, amount]}
+    return UpdateOne(
+        {"property_id": property_id},
+        [{"$set": {"number_of_proposals": {"$max": [0, count]}, "updated_at": now}}]
+    )
+
+
+class ProposalCountError(PyMongoError):
+    """Counter changes that were not written; every other change was applied."""
+
+    def __init__(self, failed: Dict[str, int], error: PyMongoError):
+        super().__init__(f"Proposal counter writes failed for {len(failed)} properties: {str(error)}")
+        self.failed = failed
+
+
+async def _bulk_write_counts(collection, changes: Dict[str, int]) -> Dict[str, Optional[int]]:
+    """
+    Write counter changes in one unordered bulk write.
+
+    Returns:
+        Error code of each property whose write failed; all others are applied
+    """
+    property_ids = list(changes)
+    now = datetime.utcnow()
+    requests = [_count_update(property_id, changes[property_id], now) for property_id in property_ids]
+    try:
+        await collection.bulk_write(requests, ordered=False)
+    except BulkWriteError as e:
+        if e.details.get("writeConcernErrors"):
+            logger.warning(f"Proposal counter write concern not satisfied: {e.details['writeConcernErrors']}")
+        return {
+            property_ids[error["index"]]: error.get("code")
+            for error in e.details.get("writeErrors", [])
+        }
+    return {}
+
+
+async def apply_proposal_counts(changes: Dict[str, int]) -> None:
+    """
+    Apply counter changes for several properties in one bulk write.
+
+    A concurrent upsert of the same new property can fail on the unique
+    index; only those writes are retried, once, when they match the
+    document the other writer created. The other writes of an unordered
+    bulk write are already applied and must not run twice.
+
+    Raises:
+        ProposalCountError: With the changes that were not written
+    """
+    changes = {property_id: amount for property_id, amount in changes.items() if amount}
+    if not changes:
+        return
+
+    try:
+        collection = await get_collection(COLLECTION)
+        failed = await _bulk_write_counts(collection, changes)
+    except PyMongoError as e:
+        raise ProposalCountError(changes, e) from e
+
+    error: Optional[PyMongoError] = None
+    racing = {property_id: changes[property_id] for property_id, code in failed.items() if code == DUPLICATE_KEY}
+    if racing:
+        try:
+            retried = await _bulk_write_counts(collection, racing)
+        except PyMongoError as e:
+            retried, error = dict.fromkeys(racing), e
+        failed = {property_id: code for property_id, code in failed.items() if property_id not in racing}
+        failed.update(retried)
+
+    applied = {property_id: amount for property_id, amount in changes.items() if property_id not in failed}
+    await _update_summaries(applied)
+
+    if failed:
+        error = error or PyMongoError(f"write errors {sorted(set(failed.values()), key=str)}")
+        raise ProposalCountError({property_id: changes[property_id] for property_id in failed}, error)
+
+
+async def _update_summaries(applied: Dict[str, int]) -> None:
+    """Mirror applied counter changes in the property summaries."""
+    if not applied:
+        return
+    try:
+        await PropertySummaryService.increment_proposal_counts(applied)
+    except PyMongoError as e:
+        # The counters are written, so replaying them would count twice;
+        # the summaries catch up on their next refresh or rebuild
+        logger.error(f"Proposal count summary update failed: {str(e)}")
+
+
+class ProposalCounterBuffer:
+    """Coalesce proposal counter changes in memory and flush them periodically."""
+
+    def __init__(self, flush_interval: float = 1.0):
+        self.flush_interval = flush_interval
+        self.pending: Dict[str, int] = defaultdict(int)
+        self.changes = 0
+        self.writes = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, property_id: str, amount: int) -> None:
+        """Queue a change to the proposal count of a property."""
+        self.pending[property_id] += amount
+        self.changes += 1
+
+    async def flush(self) -> int:
+        """
+        Write all queued changes in one bulk write.
+
+        Changes whose write failed are queued again for the next flush;
+        changes that were written never are, so they cannot apply twice.
+
+        Returns:
+            Number of properties written
+        """
+        pending, self.pending = self.pending, defaultdict(int)
+        if not pending:
+            return 0
+        try:
+            await apply_proposal_counts(pending)
+        except ProposalCountError as e:
+            for property_id, amount in e.failed.items():
+                self.pending[property_id] += amount
+            raise
+        self.writes += 1
+        return len(pending)
+
+    async def run(self) -> None:
+        """Flush every flush_interval seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except PyMongoError as e:
+                logger.error(f"Proposal counter flush failed: {str(e)}")
+
+    def start(self) -> asyncio.Task:
+        """Run the periodic flush in a background task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the background flush and write what is still queued."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        try:
+            await self.flush()
+        except PyMongoError as e:
+            logger.error(f"Final proposal counter flush failed: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many changes were coalesced into how many writes."""
+        return {"pending": len(self.pending), "changes": self.changes, "writes": self.writes}
+
+
+proposal_counter_buffer = ProposalCounterBuffer(flush_interval=settings.PROPOSAL_COUNTER_FLUSH_INTERVAL)
+
+
+async def change_proposal_count(property_id: str, amount: int) -> None:
+    """Change the proposal count of a property, buffered if configured."""
+    if settings.PROPOSAL_COUNTER_BUFFERED:
+        proposal_counter_buffer.add(property_id, amount)
+    else:
+        await apply_proposal_counts({property_id: amount})
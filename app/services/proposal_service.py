@@ -15,6 +15,7 @@ from app.core.mongo_db import (
     list_documents,
     format_document_for_response
 )
+from app.services.proposal_counter import change_proposal_count
 
 
 class ProposalService:
@@ -71,15 +72,19 @@ class ProposalService:
         filter_query: Dict = None,
         skip: int = 0,
         limit: int = 20,
-        sort: List = None
+        sort: List = None,
+        cursor: Optional[str] = None,
+        projection: Optional[Dict] = None
     ) -> List[Dict]:
-        """List proposals with pagination and filtering."""
+        """List proposals with offset or cursor pagination and filtering."""
         return await list_documents(
             cls.COLLECTION,
             filter_query=filter_query,
             skip=skip,
             limit=limit,
-            sort=sort
+            sort=sort,
+            cursor=cursor,
+            projection=projection
         )
     
     @classmethod
@@ -167,33 +172,9 @@ class ProposalService:
     @classmethod
     async def _increment_property_proposal_count(cls, property_id: str) -> None:
         """Increment the proposal count for a property."""
-        collection = await get_collection("rental_info")
-        
-        # Check if rental info exists
-        rental_info = await collection.find_one({"property_id": property_id})
-        
-        if rental_info:
-            # Update existing rental info
-            await collection.update_one(
-                {"property_id": property_id},
-                {"$inc": {"number_of_proposals": 1}}
-            )
-        else:
-            # Create new rental info document
-            await collection.insert_one({
-                "property_id": property_id,
-                "number_of_proposals": 1,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            })
+        await change_proposal_count(property_id, 1)
     
     @classmethod
     async def _decrement_property_proposal_count(cls, property_id: str) -> None:
-        """Decrement the proposal count for a property."""
-        collection = await get_collection("rental_info")
-        
-        # Update only if rental info exists and count > 0
-        await collection.update_one(
-            {"property_id": property_id, "number_of_proposals": {"$gt": 0}},
-            {"$inc": {"number_of_proposals": -1}}
-        ) 
\ No newline at end of file
+        """Decrement the proposal count for a property, never below zero."""
+        await change_proposal_count(property_id, -1) 
\ No newline at end of file
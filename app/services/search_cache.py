@@ -0,0 +1,95 @@
+"""
+Result-page cache for property searches.
+
+Popular searches repeat many times per minute with identical parameters.
+Pages are cached per worker under a canonical hash of the search
+parameters, the pagination and a property generation counter. Any property
+write bumps the generation, so cached pages are never served across a
+write; superseded entries simply age out of the LRU. The short TTL bounds
+staleness for writes this worker does not hear about. Every lookup returns
+a copy of the page, so callers can edit results without changing the cache.
+"""
+
+import hashlib
+import json
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict
+
+from pydantic import BaseModel
+
+from app.core.cache import ReadThroughCache
+from app.models.property import PropertySearchParams
+
+# Matching on these is case-insensitive, so "New York" and "new york" share a page
+CASE_INSENSITIVE_PARAMS = {"q", "city", "state", "country"}
+
+
+def _canonical_value(name: str, value: Any) -> Any:
+    """Normalize a parameter value so equivalent searches hash the same."""
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, str):
+        value = " ".join(value.split())
+        if name in CASE_INSENSITIVE_PARAMS:
+            value = value.lower()
+    return value
+
+
+def canonical_search_key(kind: str, search_params: PropertySearchParams, **pagination: Any) -> str:
+    """
+    Return a stable hash of a search and its page.
+
+    Unset parameters are dropped and the rest serialized with sorted keys,
+    so parameter order and defaults never produce different keys.
+    """
+    params = {
+        name: _canonical_value(name, value)
+        for name, value in search_params.dict(exclude_none=True).items()
+    }
+    payload = json.dumps(
+        {"kind": kind, "params": params, "page": pagination},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def copy_page(value: Any) -> Any:
+    """Copy a result page down to its models, which are copied shallowly."""
+    if isinstance(value, BaseModel):
+        return value.copy()
+    if isinstance(value, list):
+        return [copy_page(item) for item in value]
+    if isinstance(value, dict):
+        return {key: copy_page(item) for key, item in value.items()}
+    return value
+
+
+class SearchResultCache:
+    """Per-worker cache of search result pages with generation-based invalidation."""
+
+    def __init__(self, maxsize: int = 5000, ttl: float = 15.0):
+        self.pages = ReadThroughCache("search", maxsize=maxsize, ttl=ttl)
+        self.generation = 0
+
+    def bump(self, *_: Any) -> None:
+        """Invalidate every cached page after a property write."""
+        self.generation += 1
+
+    async def get_or_search(
+        self,
+        kind: str,
+        search_params: PropertySearchParams,
+        search: Callable[[], Awaitable[Any]],
+        **pagination: Any
+    ) -> Any:
+        """Return the cached page for a search, running search() on a miss."""
+        key = f"{self.generation}:{canonical_search_key(kind, search_params, **pagination)}"
+        return copy_page(await self.pages.get_or_load(key, search))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit rate and size counters, plus the current generation."""
+        stats = self.pages.local.stats()
+        stats["generation"] = self.generation
+        return stats
@@ -0,0 +1,394 @@
+"""
+Similar-listing recommendations from precomputed feature vectors.
+
+Every property is encoded once as a vector of standardized features: log
+price and area, bedrooms, bathrooms, property type, amenity flags and
+location. The vectors of all properties are stored in one float32 matrix
+per worker; the listings most similar to a property are the available ones
+nearest to its vector.
+
+Nearest neighbours are ranked by squared Euclidean distance, computed from
+dot products as ||q - x||^2 = ||q||^2 - (2 q.x - ||x||^2). The matrix is
+scored in blocks of rows, so several queries can share one pass and memory
+stays bounded for any number of listings.
+
+Feature means and spreads are fitted when the index is loaded; writes
+afterwards update single rows with the same scaling.
+"""
+
+import asyncio
+import logging
+import math
+import time
+import warnings
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+
+from app.core.mongo_db import get_collection, stream_documents
+from app.models.property import PropertyStatus, PropertyType
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_FEATURES = ("price", "area", "bedrooms", "bathrooms")
+LOG_FEATURES = {"price", "area"}  # compared by ratio rather than difference
+PROPERTY_TYPES = [property_type.value for property_type in PropertyType]
+AMENITY_FEATURES = ("is_furnished", "pets_allowed", "utilities_included", "smoking_allowed")
+
+# Relative weight of each feature group; one standard deviation of a
+# numeric feature counts as much as LOCATION_SCALE_KM of distance
+NUMERIC_WEIGHT = 1.0
+TYPE_WEIGHT = 1.5
+AMENITY_WEIGHT = 0.5
+LOCATION_SCALE_KM = 25.0
+EARTH_RADIUS_KM = 6371.0
+
+LOCATION_COLUMNS = slice(
+    len(NUMERIC_FEATURES) + len(PROPERTY_TYPES) + len(AMENITY_FEATURES),
+    len(NUMERIC_FEATURES) + len(PROPERTY_TYPES) + len(AMENITY_FEATURES) + 3
+)
+FEATURE_COUNT = LOCATION_COLUMNS.stop
+
+LOAD_PROJECTION = {
+    field: 1 for field in (*NUMERIC_FEATURES, *AMENITY_FEATURES, "property_type", "location", "status")
+}
+
+BLOCK_ROWS = 65536
+INITIAL_CAPACITY = 1024
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _coordinates(document: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """Return (longitude, latitude) from the GeoJSON location, if set."""
+    location = document.get("location") or {}
+    coordinates = location.get("coordinates") if isinstance(location, dict) else None
+    if not coordinates or len(coordinates) != 2:
+        return None
+    return _number(coordinates[0]), _number(coordinates[1])
+
+
+def raw_features(document: Dict[str, Any]) -> np.ndarray:
+    """
+    Encode one property document before scaling.
+
+    Missing numbers and locations are NaN; the scaler replaces them with
+    the mean, so they neither help nor hurt similarity.
+    """
+    features = np.zeros(FEATURE_COUNT)
+    for i, field in enumerate(NUMERIC_FEATURES):
+        value = _number(document.get(field))
+        if field in LOG_FEATURES:
+            value = math.log1p(value) if value >= 0 else math.nan
+        features[i] = value
+
+    offset = len(NUMERIC_FEATURES)
+    property_type = getattr(document.get("property_type"), "value", document.get("property_type"))
+    if property_type in PROPERTY_TYPES:
+        features[offset + PROPERTY_TYPES.index(property_type)] = 1.0
+
+    offset += len(PROPERTY_TYPES)
+    for i, field in enumerate(AMENITY_FEATURES):
+        features[offset + i] = 1.0 if document.get(field) else 0.0
+
+    # Points on the unit sphere, so distances do not depend on the meridian
+    coordinates = _coordinates(document)
+    if coordinates is None:
+        features[LOCATION_COLUMNS] = math.nan
+    else:
+        longitude, latitude = np.radians(coordinates)
+        features[LOCATION_COLUMNS] = [
+            math.cos(latitude) * math.cos(longitude),
+            math.cos(latitude) * math.sin(longitude),
+            math.sin(latitude),
+        ]
+    return features
+
+
+class FeatureScaler:
+    """Standardize, weight and fill raw feature rows."""
+
+    def __init__(self):
+        self.offset = np.zeros(FEATURE_COUNT)
+        self.scale = np.ones(FEATURE_COUNT)
+        numeric = len(NUMERIC_FEATURES)
+        self.scale[numeric:numeric + len(PROPERTY_TYPES)] = TYPE_WEIGHT
+        self.scale[numeric + len(PROPERTY_TYPES):LOCATION_COLUMNS.start] = AMENITY_WEIGHT
+        self.scale[LOCATION_COLUMNS] = EARTH_RADIUS_KM / LOCATION_SCALE_KM
+
+    def fit(self, raw: np.ndarray) -> "FeatureScaler":
+        """Fit numeric means and spreads and the location centroid."""
+        numeric = len(NUMERIC_FEATURES)
+        if len(raw):
+            with warnings.catch_warnings():
+                # All-NaN columns warn; nan_to_num below handles them
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                means = np.nanmean(raw, axis=0)
+                spreads = np.nanstd(raw[:, :numeric], axis=0)
+            self.offset[:numeric] = np.nan_to_num(means[:numeric])
+            spreads = np.nan_to_num(spreads)
+            self.scale[:numeric] = NUMERIC_WEIGHT / np.where(spreads > 0, spreads, 1.0)
+            # Centered on the listings, which keeps float32 values small
+            self.offset[LOCATION_COLUMNS] = np.nan_to_num(means[LOCATION_COLUMNS])
+        return self
+
+    def transform(self, raw: np.ndarray) -> np.ndarray:
+        """Scale raw rows into float32 vectors; missing values become the mean."""
+        vectors = (raw - self.offset) * self.scale
+        return np.nan_to_num(vectors, nan=0.0).astype(np.float32)
+
+
+class SimilarPropertyIndex:
+    """Per-worker matrix of property feature vectors for nearest-neighbour queries."""
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY, block_rows: int = BLOCK_ROWS):
+        self.ready = False
+        self.block_rows = block_rows
+        self.scaler = FeatureScaler()
+        self._allocate(capacity)
+        self._loading = False
+        self._touched_while_loading: Set[str] = set()
+        self._load_lock = asyncio.Lock()
+        self.loaded_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.queries = 0
+
+    def _allocate(self, capacity: int) -> None:
+        self.vectors = np.zeros((capacity, FEATURE_COUNT), dtype=np.float32)
+        # Squared lengths, or infinity for listings that may not be
+        # recommended, which then can never score as nearest
+        self.norms = np.full(capacity, np.inf, dtype=np.float32)
+        self.eligible = np.zeros(capacity, dtype=bool)  # available listings
+        self.ids = np.zeros(capacity, dtype="U24")
+        self.rows: Dict[str, int] = {}
+        self.free: List[int] = []
+        self.size = 0
+
+    def _grow(self) -> None:
+        """Double the capacity of every array."""
+        capacity = len(self.eligible) * 2
+        for name in ("vectors", "norms", "eligible", "ids"):
+            array = getattr(self, name)
+            grown = np.zeros((capacity, *array.shape[1:]), dtype=array.dtype)
+            if name == "norms":
+                grown[:] = np.inf
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    @property
+    def active(self) -> bool:
+        """Whether writes must be applied, i.e. the index is loaded or loading."""
+        return self.ready or self._loading
+
+    def encode(self, document: Dict[str, Any]) -> np.ndarray:
+        """Return the feature vector of one property document."""
+        return self.scaler.transform(raw_features(document)[np.newaxis])[0]
+
+    def upsert(self, document: Dict[str, Any]) -> None:
+        """Add or overwrite the vector of one property document (with _id or id)."""
+        if not self.active:
+            return
+        property_id = str(document.get("_id") or document.get("id"))
+        if self._loading:
+            self._touched_while_loading.add(property_id)
+        self._set_row(property_id, self.encode(document), _is_available(document))
+
+    def _set_row(self, property_id: str, vector: np.ndarray, eligible: bool) -> None:
+        row = self.rows.get(property_id)
+        if row is None:
+            if self.free:
+                row = self.free.pop()
+            else:
+                if self.size == len(self.eligible):
+                    self._grow()
+                row = self.size
+                self.size += 1
+            self.rows[property_id] = row
+            self.ids[row] = property_id
+        self.vectors[row] = vector
+        self.norms[row] = vector @ vector if eligible else np.inf
+        self.eligible[row] = eligible
+
+    def remove(self, property_id: str) -> None:
+        """Drop the vector of a deleted property."""
+        if not self.active:
+            return
+        if self._loading:
+            self._touched_while_loading.add(property_id)
+        row = self.rows.pop(property_id, None)
+        if row is not None:
+            self.eligible[row] = False
+            self.norms[row] = np.inf
+            self.free.append(row)
+
+    async def refresh(self, property_id: str) -> None:
+        """Re-read one property after a write, e.g. from another worker."""
+        if not self.active or not ObjectId.is_valid(property_id):
+            return
+        collection = await get_collection("properties")
+        document = await collection.find_one({"_id": ObjectId(property_id)}, LOAD_PROJECTION)
+        if document is None:
+            self.remove(property_id)
+        else:
+            self.upsert(document)
+
+    async def load(self) -> Optional[int]:
+        """
+        Encode every property and refit the feature scaling.
+
+        Returns:
+            Number of properties indexed, or None if the load failed and
+            the previous contents were kept
+        """
+        started = time.perf_counter()
+        ids: List[str] = []
+        raw: List[np.ndarray] = []
+        eligible: List[bool] = []
+        self._loading = True
+        self._touched_while_loading = set()
+        try:
+            async for document in stream_documents("properties", projection=LOAD_PROJECTION, batch_size=5000):
+                ids.append(document["id"])
+                raw.append(raw_features(document))
+                eligible.append(_is_available(document))
+        except PyMongoError as e:
+            logger.error(f"Similar property index load failed: {str(e)}")
+            return None
+        finally:
+            self._loading = False
+
+        # Swap in the new matrix without yielding, then catch up on writes
+        self.build(ids, np.array(raw).reshape(len(raw), FEATURE_COUNT), eligible)
+        touched, self._touched_while_loading = self._touched_while_loading, set()
+        for property_id in touched:
+            await self.refresh(property_id)
+
+        self.load_seconds = time.perf_counter() - started
+        self.loaded_at = time.time()
+        logger.info(f"Loaded similar property index with {len(self.rows)} properties in {self.load_seconds:.2f}s")
+        return len(self.rows)
+
+    def build(self, ids: List[str], raw: np.ndarray, eligible: Sequence[bool]) -> None:
+        """
+        Replace the contents with the given properties and refit the scaling.
+
+        Args:
+            ids: Property ids
+            raw: Matching rows of raw_features()
+            eligible: Whether each property may be recommended
+        """
+        self.scaler = FeatureScaler().fit(raw)
+        self._allocate(max(INITIAL_CAPACITY, 1 << max(len(ids) - 1, 0).bit_length()))
+        self.size = len(ids)
+        self.vectors[:self.size] = self.scaler.transform(raw)
+        self.eligible[:self.size] = eligible
+        self.norms[:self.size] = np.where(
+            self.eligible[:self.size],
+            np.einsum("ij,ij->i", self.vectors[:self.size], self.vectors[:self.size]),
+            np.inf
+        )
+        self.ids[:self.size] = ids
+        self.rows = {property_id: row for row, property_id in enumerate(ids)}
+        self.ready = True
+
+    async def ensure_loaded(self) -> None:
+        """Load the index on first use; concurrent callers wait for one load."""
+        if self.ready:
+            return
+        async with self._load_lock:
+            if not self.ready:
+                await self.load()
+
+    async def reload(self) -> None:
+        """Reload a loaded index after changes may have been missed."""
+        if self.ready:
+            await self.load()
+
+    def nearest(
+        self,
+        queries: np.ndarray,
+        k: int,
+        exclude: Sequence[Optional[str]] = ()
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Return the k nearest available properties for each query vector.
+
+        Args:
+            queries: One vector, or a (queries x features) matrix
+            k: Neighbours per query
+            exclude: Per query, a property id to leave out (usually itself)
+
+        Returns:
+            Per query, (property id, squared distance) pairs, nearest first
+        """
+        self.queries += 1
+        queries = np.atleast_2d(queries).astype(np.float32)
+        excluded_rows = [self.rows.get(property_id) for property_id in exclude]
+        excluded_rows += [None] * (len(queries) - len(excluded_rows))
+
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        doubled = 2 * queries.T
+
+        for start in range(0, self.size, self.block_rows):
+            end = min(start + self.block_rows, self.size)
+            # Larger is nearer: 2 q.x - ||x||^2 = ||q||^2 - ||q - x||^2;
+            # listings that may not be recommended score -inf
+            scores = (self.vectors[start:end] @ doubled).T - self.norms[start:end]
+            for query, row in enumerate(excluded_rows):
+                if row is not None and start <= row < end:
+                    scores[query, row - start] = -np.inf
+
+            rows = np.broadcast_to(np.arange(start, end), scores.shape)
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, top, axis=1)
+                rows = np.take_along_axis(rows, top, axis=1)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_rows = np.concatenate([best_rows, rows], axis=1)
+
+            if best_scores.shape[1] > k:
+                top = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, top, axis=1)
+                best_rows = np.take_along_axis(best_rows, top, axis=1)
+
+        query_norms = np.einsum("ij,ij->i", queries, queries)
+        results = []
+        for query in range(len(queries)):
+            order = np.argsort(-best_scores[query], kind="stable")
+            results.append([
+                (str(self.ids[best_rows[query, i]]), float(query_norms[query] - best_scores[query, i]))
+                for i in order
+                if np.isfinite(best_scores[query, i])
+            ])
+        return results
+
+    def similar(self, document: Dict[str, Any], k: int = 6) -> List[str]:
+        """Return the ids of the k available properties most similar to a property document."""
+        property_id = str(document.get("_id") or document.get("id"))
+        return [neighbour for neighbour, _ in self.nearest(self.encode(document), k, exclude=[property_id])[0]]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and memory counters for monitoring."""
+        return {
+            "ready": self.ready,
+            "rows": len(self.rows),
+            "capacity": len(self.eligible),
+            "features": FEATURE_COUNT,
+            "array_bytes": self.vectors.nbytes + self.norms.nbytes + self.eligible.nbytes + self.ids.nbytes,
+            "queries": self.queries,
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds,
+        }
+
+
+def _is_available(document: Dict[str, Any]) -> bool:
+    status = document.get("status")
+    return getattr(status, "value", status) == PropertyStatus.AVAILABLE.value
@@ -0,0 +1,22 @@
+"""
+Shared test configuration for the app test suite.
+"""
+
+import os
+
+# Settings in app.core.config without defaults. Real deployments load these
+# from .env; tests only need them to be present so the config module imports.
+TEST_ENVIRONMENT = {
+    "JWT_SECRET": "test-jwt-secret",
+    "DATABASE_URL": "sqlite:///:memory:",
+    "WEB3_PROVIDER_URL": "http://localhost:8545",
+    "CONTRACT_ADDRESS": "0x0000000000000000000000000000000000000000",
+    "CONTRACT_ABI": "[]",
+    "PLATFORM_PRIVATE_KEY": "0x" + "1" * 64,
+    "ADMIN_EMAIL": "admin@example.com",
+    "ADMIN_PASSWORD": "test-admin-password",
+    "ADMIN_FULL_NAME": "Test Admin",
+}
+
+for key, value in TEST_ENVIRONMENT.items():
+    os.environ.setdefault(key, value)
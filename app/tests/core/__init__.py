@@ -0,0 +1 @@
+# Init file for core tests
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+Tests for the LRU/TTL and read-through caches.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.cache import LRUCache, MISSING, ReadThroughCache, RedisCacheTier
+
+
+class FakeTimer:
+    """Manually advanced clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """The least recently used entry is evicted once the cache is full."""
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_expires_entries():
+    """Entries older than the TTL are treated as misses and dropped."""
+    timer = FakeTimer()
+    cache = LRUCache(maxsize=10, ttl=5, timer=timer)
+    cache.set("a", 1)
+
+    timer.now = 4.9
+    assert cache.get("a") == 1
+
+    timer.now = 5.0
+    assert cache.get("a") is MISSING
+    assert len(cache) == 0
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["expirations"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_read_through_cache_loads_once_until_invalidated():
+    """Hits skip the loader; invalidation forces the next read to reload."""
+    cache = ReadThroughCache("test", maxsize=10, ttl=60)
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        return {"id": "1", "version": len(loads)}
+
+    assert (await cache.get_or_load("1", loader))["version"] == 1
+    assert (await cache.get_or_load("1", loader))["version"] == 1
+
+    await cache.invalidate("1")
+
+    assert (await cache.get_or_load("1", loader))["version"] == 2
+    assert len(loads) == 2
+    assert cache.stats()["local"]["invalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_read_through_cache_does_not_cache_missing_records():
+    """A lookup for a record that does not exist yet is not remembered."""
+    cache = ReadThroughCache("test", maxsize=10, ttl=60)
+
+    async def loader():
+        return None
+
+    assert await cache.get_or_load("1", loader) is None
+    assert len(cache.local) == 0
+
+
+@pytest.mark.asyncio
+async def test_load_racing_an_invalidation_is_not_cached():
+    """A load that read the record before it was invalidated does not cache it."""
+    cache = ReadThroughCache("test", maxsize=10, ttl=60)
+    read, invalidated = asyncio.Event(), asyncio.Event()
+
+    async def stale_loader():
+        read.set()
+        await invalidated.wait()
+        return {"version": 1}
+
+    load = asyncio.create_task(cache.get_or_load("1", stale_loader))
+    await read.wait()
+    await cache.invalidate("1")
+    invalidated.set()
+
+    assert (await load)["version"] == 1
+    assert len(cache.local) == 0
+
+    async def loader():
+        return {"version": 2}
+
+    assert (await cache.get_or_load("1", loader))["version"] == 2
+    assert (await cache.get_or_load("1", stale_loader))["version"] == 2
+
+
+class FakeRedis:
+    def __init__(self, values):
+        self.values = values
+
+    async def get(self, key):
+        return self.values.get(key)
+
+
+@pytest.mark.asyncio
+async def test_undecodable_redis_entry_is_a_miss():
+    """An entry the tier cannot deserialize is logged and counted as an error."""
+    tier = RedisCacheTier("redis://localhost:6379/0", "test", 60, str, int)
+    tier.client = FakeRedis({"cache:test:1": b"not-a-number"})
+
+    assert await tier.get("1") is MISSING
+    assert tier.stats() == {"hits": 0, "misses": 0, "errors": 1}
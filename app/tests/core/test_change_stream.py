@@ -0,0 +1,130 @@
+"""
+Tests for change-stream cache invalidation.
+"""
+
+import asyncio
+from collections import defaultdict
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+from app.core import change_stream
+from app.core.cache import ReadThroughCache
+from app.core.change_stream import ChangeStreamWatcher
+
+
+@pytest.fixture(autouse=True)
+def isolated_handlers(monkeypatch):
+    """Give each test its own handler registry."""
+    monkeypatch.setattr(change_stream, "_change_handlers", defaultdict(list))
+    monkeypatch.setattr(change_stream, "_reset_handlers", [])
+
+
+class FakeStream:
+    """Change stream yielding canned events, then raising an error if given."""
+
+    def __init__(self, events, error=None):
+        self.events = list(events)
+        self.error = error
+        self.resume_token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    def alive(self):
+        return True
+
+    async def try_next(self):
+        if self.events:
+            event = self.events.pop(0)
+            self.resume_token = event["_id"]
+            return event
+        if self.error is not None:
+            raise self.error
+        await asyncio.sleep(3600)
+
+
+class FakeDatabase:
+    """Hands out one FakeStream per watch() call and records resume tokens."""
+
+    def __init__(self, streams):
+        self.streams = list(streams)
+        self.start_after = []
+
+    def watch(self, pipeline, start_after=None, max_await_time_ms=None):
+        self.start_after.append(start_after)
+        return self.streams.pop(0)
+
+
+def _event(collection, document_id, token):
+    return {"_id": {"_data": token}, "operationType": "update", "ns": {"db": "smartrent", "coll": collection},
+            "documentKey": {"_id": document_id}}
+
+
+@pytest.mark.asyncio
+async def test_dispatch_invalidates_local_cache_entries():
+    """Writes seen on the stream drop the matching entry from the local tier."""
+    cache = ReadThroughCache("test")
+    property_id = ObjectId()
+    cache.local.set(str(property_id), "cached")
+    cache.local.set("other", "cached")
+    change_stream.register_change_handler("properties", cache.invalidate_local)
+
+    watcher = ChangeStreamWatcher(name="test")
+    await watcher.dispatch(_event("properties", property_id, "1"))
+    await watcher.dispatch(_event("contracts", "other", "2"))
+
+    assert str(property_id) not in cache.local._entries
+    assert "other" in cache.local._entries
+    assert watcher.events == 2
+
+
+def test_only_collections_with_handlers_are_watched():
+    """Writes to collections no cache depends on are filtered out on the server."""
+    change_stream.register_change_handler("properties", lambda document_id: None)
+
+    (match, _) = ChangeStreamWatcher(name="test").pipeline()
+
+    assert match["$match"]["ns.coll"] == {"$in": ["properties"]}
+
+
+@pytest.mark.asyncio
+async def test_watcher_resets_caches_when_history_is_lost(monkeypatch):
+    """An unresumable token clears caches and restarts the stream from now."""
+    cleared = []
+    seen = []
+    change_stream.register_reset_handler(lambda: cleared.append(True))
+    change_stream.register_change_handler("proposals", seen.append)
+    database = FakeDatabase([
+        FakeStream([_event("proposals", "p1", "a")], error=OperationFailure("history lost", code=286)),
+        FakeStream([_event("proposals", "p2", "b")]),
+    ])
+    monkeypatch.setattr(change_stream, "get_database", lambda: database)
+
+    watcher = ChangeStreamWatcher(name="test")
+    checkpoints = []
+
+    async def record_checkpoint(force=False):
+        checkpoints.append(watcher.resume_token)
+
+    async def no_checkpoint():
+        watcher.resume_token = {"_data": "saved"}
+
+    monkeypatch.setattr(watcher, "_save_checkpoint", record_checkpoint)
+    monkeypatch.setattr(watcher, "_load_checkpoint", no_checkpoint)
+
+    task = watcher.start()
+    for _ in range(20):
+        await asyncio.sleep(0)
+    await watcher.stop()
+
+    assert task.cancelled()
+    assert database.start_after == [{"_data": "saved"}, None]
+    assert seen == ["p1", "p2"]
+    assert cleared == [True]
+    assert watcher.resume_token == {"_data": "b"}
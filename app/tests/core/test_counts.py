@@ -0,0 +1,95 @@
+"""
+Tests for the result count strategies.
+"""
+
+import pytest
+
+from app.core.counts import CountStrategy, ResultCount
+from app.db.indexes import SEARCH_COLLATION
+
+
+class FakeAggregateCursor:
+    """Minimal Motor aggregate cursor returning canned documents."""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length=None):
+        return self.documents
+
+
+class FakeCountCollection:
+    """Records count calls and answers them from fixed numbers."""
+
+    name = "properties"
+
+    def __init__(self, total=100000, matches=50, sampled_matches=250):
+        self.total = total
+        self.matches = matches
+        self.sampled_matches = sampled_matches
+        self.calls = []
+
+    async def estimated_document_count(self):
+        self.calls.append("estimated")
+        return self.total
+
+    async def count_documents(self, filter_query, limit=0, **options):
+        self.calls.append(("count", limit, options.get("collation")))
+        return min(self.matches, limit) if limit else self.matches
+
+    def aggregate(self, pipeline, **options):
+        self.calls.append(("sample", pipeline[0]))
+        return FakeAggregateCursor([{"matched": self.sampled_matches}])
+
+
+@pytest.mark.asyncio
+async def test_unfiltered_count_reads_collection_metadata():
+    """An empty filter uses estimated_document_count and is reported as approximate."""
+    collection = FakeCountCollection(total=1234)
+
+    result = await CountStrategy().count(collection, {})
+
+    assert result == ResultCount(count=1234, exact=False)
+    assert collection.calls == ["estimated"]
+
+
+@pytest.mark.asyncio
+async def test_filtered_count_is_bounded_and_cached():
+    """Small totals are exact and served from the cache for equivalent filters."""
+    collection = FakeCountCollection(matches=42)
+    strategy = CountStrategy(exact_limit=1000)
+
+    first = await strategy.count(collection, {"status": "available", "price": {"$lte": 3000}}, SEARCH_COLLATION)
+    second = await strategy.count(collection, {"price": {"$lte": 3000}, "status": "available"}, SEARCH_COLLATION)
+
+    assert first == second == ResultCount(count=42)
+    assert collection.calls == [("count", 1000, SEARCH_COLLATION)]
+    assert strategy.stats()["hits"] == 1
+
+    # A different collation evaluates the filter differently
+    await strategy.count(collection, {"status": "available", "price": {"$lte": 3000}})
+    assert len(collection.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_large_count_is_estimated_from_a_sample():
+    """Totals reaching the limit are extrapolated from the sampled match rate."""
+    collection = FakeCountCollection(total=100000, matches=10**6, sampled_matches=250)
+    strategy = CountStrategy(exact_limit=1000, sample_size=1000)
+
+    result = await strategy.count(collection, {"status": "available"})
+
+    # 250 of 1000 sampled documents match, out of 100000
+    assert result == ResultCount(count=25000, exact=False)
+    assert ("sample", {"$sample": {"size": 1000}}) in collection.calls
+
+
+@pytest.mark.asyncio
+async def test_large_text_count_falls_back_to_lower_bound():
+    """$text cannot filter a sample, so the limit is returned as an approximate floor."""
+    collection = FakeCountCollection(matches=10**6)
+
+    result = await CountStrategy(exact_limit=500).count(collection, {"$text": {"$search": "loft"}})
+
+    assert result == ResultCount(count=500, exact=False)
+    assert all(call[0] != "sample" for call in collection.calls if isinstance(call, tuple))
@@ -0,0 +1,138 @@
+"""
+Tests for the MongoDB helper functions.
+"""
+
+import time
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.core import mongo_db
+from app.core.mongo_db import (
+    _projection_with_sort_fields,
+    decode_cursor,
+    encode_cursor,
+    format_document_for_response,
+    get_next_cursor,
+    keyset_query,
+)
+
+
+def test_cursor_round_trip_preserves_types():
+    """Cursors decode back to the original BSON-typed sort values."""
+    document_id = ObjectId()
+    created_at = datetime(2025, 1, 2, 3, 4, 5)
+    document = {"id": str(document_id), "created_at": created_at}
+
+    cursor = encode_cursor(document, [("created_at", -1)])
+
+    assert decode_cursor(cursor) == [created_at, document_id]
+
+
+def test_keyset_query_seeks_past_cursor():
+    """The keyset filter compares sort keys in order with _id as tie-breaker."""
+    document_id = ObjectId()
+    cursor = encode_cursor({"id": str(document_id), "price": 1500.0}, [("price", 1)])
+
+    query = keyset_query({"status": "available"}, [("price", 1)], cursor)
+
+    assert query == {
+        "$and": [
+            {"status": "available"},
+            {"$or": [
+                {"price": {"$gt": 1500.0}},
+                {"price": 1500.0, "_id": {"$gt": document_id}},
+            ]},
+        ]
+    }
+
+
+def test_keyset_query_descending_and_nested_fields():
+    """Descending keys seek with $lt, then null keys; dotted fields are read from subdocuments."""
+    document_id = ObjectId()
+    document = {"id": str(document_id), "address": {"city": "Chicago"}}
+    cursor = encode_cursor(document, [("address.city", -1)])
+
+    query = keyset_query(None, [("address.city", -1)], cursor)
+
+    assert query == {"$or": [
+        {"$or": [{"address.city": {"$lt": "Chicago"}}, {"address.city": None}]},
+        {"address.city": "Chicago", "_id": {"$lt": document_id}},
+    ]}
+
+
+def test_keyset_query_after_null_key():
+    """A page ending on a null key continues with non-null keys ascending, none descending."""
+    document_id = ObjectId()
+    cursor = encode_cursor({"id": str(document_id)}, [("price", 1)])
+
+    assert keyset_query(None, [("price", 1)], cursor) == {"$or": [
+        {"price": {"$ne": None}},
+        {"price": None, "_id": {"$gt": document_id}},
+    ]}
+
+    cursor = encode_cursor({"id": str(document_id)}, [("price", -1)])
+
+    assert keyset_query(None, [("price", -1)], cursor) == {"$or": [
+        {"price": None, "_id": {"$lt": document_id}},
+    ]}
+
+
+def test_invalid_cursor_is_rejected():
+    """Tampered or mismatched cursors raise ValueError."""
+    with pytest.raises(ValueError):
+        keyset_query({}, [("price", 1)], "not-a-cursor")
+
+    cursor = encode_cursor({"id": str(ObjectId())}, None)
+    with pytest.raises(ValueError):
+        keyset_query({}, [("price", 1)], cursor)
+
+
+def test_next_cursor_only_for_full_pages():
+    """A short page is the last page and has no next cursor."""
+    documents = [{"id": str(ObjectId())} for _ in range(3)]
+
+    assert get_next_cursor(documents, None, limit=5) is None
+    assert get_next_cursor(documents, None, limit=3) == encode_cursor(documents[-1], None)
+
+
+def test_import_does_not_create_clients():
+    """Importing the module must not open database connections."""
+    assert mongo_db._sync_client is None
+
+
+@pytest.mark.asyncio
+async def test_readiness_check_is_bounded(monkeypatch):
+    """An unreachable database fails the readiness check within its timeout."""
+    monkeypatch.setattr(mongo_db, "MONGO_CONNECTION_STRING", "mongodb://127.0.0.1:1/")
+    monkeypatch.setattr(mongo_db, "_async_client", None)
+
+    started = time.monotonic()
+    try:
+        assert await mongo_db.check_mongodb_ready(timeout=0.2) is False
+    finally:
+        mongo_db.close_mongodb()
+
+    assert time.monotonic() - started < 2
+
+
+def test_format_document_rewrites_only_top_level_ids():
+    """_id and top-level ObjectIds become strings; nested values are left alone."""
+    document_id, owner_id = ObjectId(), ObjectId()
+    nested = {"_id": "feature", "items": [{"_id": 1}]}
+    document = {"_id": document_id, "owner_id": owner_id, "metadata": nested}
+
+    formatted = format_document_for_response(document)
+
+    assert formatted == {"id": str(document_id), "owner_id": str(owner_id), "metadata": nested}
+    assert formatted["metadata"] is nested
+
+
+def test_inclusion_projection_keeps_sort_fields():
+    """Inclusion projections get the sort keys so a next cursor can be built."""
+    sort = [("created_at", -1), ("_id", -1)]
+
+    assert _projection_with_sort_fields({"title": 1}, sort) == {"title": 1, "created_at": 1, "_id": 1}
+    assert _projection_with_sort_fields({"document_data": 0}, sort) == {"document_data": 0}
+    assert _projection_with_sort_fields(None, sort) is None
@@ -0,0 +1 @@
+# Init file for middleware tests
\ No newline at end of file
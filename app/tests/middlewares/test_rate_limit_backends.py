@@ -0,0 +1,138 @@
+"""
+Tests for the rate limit storage backends.
+"""
+
+import pytest
+import pytest_asyncio
+
+from app.middlewares.rate_limit_backends import (
+    create_backend,
+    gcra,
+    GCRA_SCRIPT,
+    LeasedRateLimiter,
+    MemoryBackend,
+    RedisBackend,
+    ShardedMemoryBackend,
+)
+from app.tests.performance.redis_stand_in import RedisStandIn
+
+# The stand-in runs the Redis backend's Lua script on lupa
+pytest.importorskip("lupa")
+
+
+@pytest_asyncio.fixture
+async def redis_server():
+    async with RedisStandIn() as server:
+        yield server
+
+
+@pytest_asyncio.fixture
+async def redis_backend(redis_server):
+    backend = RedisBackend(redis_server.url)
+    yield backend
+    await backend.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend_name", ["redis", "memory", "sharded-memory"])
+async def test_limit_then_deny(backend_name, redis_server):
+    """Every backend admits the limit, then denies with the time to retry."""
+    backend = create_backend(backend_name, redis_server.url)
+
+    results = [await backend.check("client", limit=3, window=3) for _ in range(4)]
+
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert [result.remaining for result in results] == [2, 1, 0, 0]
+    assert 2.9 < results[2].reset_after <= 3.0
+    assert 0.9 < results[3].retry_after <= 1.0
+    await backend.close()
+
+
+def test_python_gcra_matches_lua_script():
+    """The in-process algorithm makes the same decisions as the Lua script."""
+    server = RedisStandIn()
+    clock_ms = [1_700_000_000_000]
+    server.handlers[b"TIME"] = lambda args: [str(clock_ms[0] // 1000), str(clock_ms[0] % 1000 * 1000)]
+    tat = None
+
+    for cost, min_cost in [(1, 1), (4, 1), (10, 1), (1, 1), (3, 3), (2, 1), (1, 1)]:
+        clock_ms[0] += 250
+        reply = server.execute([
+            b"EVAL", GCRA_SCRIPT.encode(), b"1", b"client",
+            b"7", b"3000", str(cost).encode(), str(min_cost).encode(),
+        ])
+        new_tat, result = gcra(tat, float(clock_ms[0]), 7, 3000, cost, min_cost)
+        tat = tat if new_tat is None else new_tat
+
+        assert reply == [
+            result.granted,
+            result.remaining,
+            round(result.reset_after * 1000),
+            round(result.retry_after * 1000),
+        ]
+
+
+@pytest.mark.asyncio
+async def test_script_uses_one_evalsha_and_constant_memory(redis_server, redis_backend):
+    """Decisions run the cached script by SHA and keep one small key per client."""
+    await redis_backend.check("client", limit=10, window=60)
+    redis_server.calls.clear()
+
+    await redis_backend.check("client", limit=10, window=60)
+    assert redis_server.calls == {"EVALSHA": 1}
+    assert list(redis_server.data) == [b"client"]
+    assert isinstance(redis_server.data[b"client"], bytes)
+
+    redis_server.execute([b"SCRIPT", b"FLUSH"])
+    result = await redis_backend.check("client", limit=10, window=60)
+    assert result.remaining == 7
+    assert redis_server.calls == {"EVALSHA": 2, "EVAL": 1}
+
+
+@pytest.mark.asyncio
+async def test_memory_backends_evict_idle_keys():
+    """Memory backends hold a bounded number of keys, split across shards."""
+    memory = MemoryBackend(maxsize=2)
+    for key in ("a", "b", "c"):
+        await memory.check(key, limit=5, window=60)
+    assert memory.stats() == {"backend": "memory", "keys": 2, "evictions": 1}
+    # The evicted client starts over
+    assert (await memory.check("a", limit=5, window=60)).remaining == 4
+
+    sharded = ShardedMemoryBackend(shards=4, maxsize=400)
+    for key in range(100):
+        await sharded.check(str(key), limit=5, window=60)
+    stats = sharded.stats()
+    assert stats["keys"] == 100
+    assert all(len(shard.tats) < 100 for shard in sharded.shards)
+
+
+@pytest.mark.asyncio
+async def test_leases_admit_locally(redis_backend):
+    """A worker goes to Redis once per lease, and once per denial until its retry time."""
+    limiter = LeasedRateLimiter(redis_backend)
+
+    results = [await limiter.check("client", limit=100, window=60, lease=10) for _ in range(100)]
+    assert all(result.allowed for result in results)
+    assert results[0].remaining == 99
+    assert results[-1].remaining == 0
+    assert limiter.backend_calls == 10
+
+    assert not (await limiter.check("client", limit=100, window=60, lease=10)).allowed
+    assert not (await limiter.check("client", limit=100, window=60, lease=10)).allowed
+    assert limiter.stats() == {"keys": 1, "backend_calls": 11, "local_decisions": 91}
+
+
+@pytest.mark.asyncio
+async def test_workers_share_the_quota(redis_backend):
+    """Leases are taken from the shared quota, so workers together stay within the limit."""
+    workers = [LeasedRateLimiter(redis_backend) for _ in range(3)]
+
+    allowed = [
+        (await workers[i % 3].check("client", limit=20, window=60, lease=8)).allowed
+        for i in range(40)
+    ]
+
+    assert sum(allowed) == 20
+    # The last lease is partial: only what is left of the quota
+    assert sum(worker.backend_calls for worker in workers) < 40
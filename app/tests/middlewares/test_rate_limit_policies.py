@@ -0,0 +1,101 @@
+"""
+Tests for compiled route-to-limit policies.
+"""
+
+import itertools
+import random
+
+import pytest
+
+from app.middlewares.rate_limit_policies import compile_policies, RateLimitPolicy
+from app.middlewares.rate_limiter import DEFAULT_RATE_LIMITS, RATE_LIMIT_POLICIES
+
+
+def test_default_policies_keep_the_tiers():
+    """API routes get the general tier, auth and admin routes their stricter tiers."""
+    policies = compile_policies(RATE_LIMIT_POLICIES, DEFAULT_RATE_LIMITS)
+
+    assert policies.match("/api/properties/search", "GET") == RateLimitPolicy("general", 100, 60, 10)
+    assert policies.match("/api/auth/login", "POST").name == "auth"
+    assert policies.match("/api/payments/1", "POST").name == "sensitive"
+    # Prefixes match whole segments only
+    assert policies.match("/api/authors", "GET").name == "general"
+    assert policies.match("/docs", "GET") is None
+
+
+def test_deepest_matching_rule_wins():
+    """Method, role and wildcard overrides apply below a prefix; other requests fall back."""
+    rules = [{"prefix": "/api/admin", "roles": ["ADMIN"], "limit": 1000, "window": 60}] + RATE_LIMIT_POLICIES + [
+        {"prefix": "/api/properties/import", "methods": ["post"], "limit": 5, "window": 3600},
+        {"prefix": "/api/properties/*/similar", "tier": "general", "lease": None, "name": "similar"},
+    ]
+    policies = compile_policies(rules, DEFAULT_RATE_LIMITS)
+
+    assert policies.match("/api/properties/import", "POST") == RateLimitPolicy("/api/properties/import:POST", 5, 3600)
+    assert policies.match("/api/properties/import", "GET").name == "general"
+    assert policies.match("/api/properties/abc123/similar", "GET") == RateLimitPolicy("similar", 100, 60)
+    assert policies.match("/api/properties/abc123", "GET").name == "general"
+    # Rules on one prefix are tried in table order
+    assert policies.match("/api/admin/users", "GET", role="ADMIN").limit == 1000
+    assert policies.match("/api/admin/users", "GET", role="TENANT").name == "sensitive"
+
+
+def test_wildcard_rule_is_not_hidden_by_exact_prefix():
+    """A deeper wildcard rule applies even where a shallower exact prefix also matches."""
+    rules = RATE_LIMIT_POLICIES + [
+        {"prefix": "/api/users", "limit": 500, "window": 60},
+        {"prefix": "/api/*/admin", "tier": "sensitive", "name": "admin"},
+    ]
+    policies = compile_policies(rules, DEFAULT_RATE_LIMITS)
+
+    assert policies.match("/api/users/admin", "GET").name == "admin"
+    assert policies.match("/api/users/admin/logs", "GET").name == "admin"
+    assert policies.match("/api/users/42", "GET").limit == 500
+    assert policies.match("/api/groups/admin", "GET").name == "admin"
+
+    # At equal depth the exact segment wins
+    policies = compile_policies(rules + [{"prefix": "/api/users/*", "limit": 50, "window": 60}], DEFAULT_RATE_LIMITS)
+    assert policies.match("/api/users/admin", "GET").limit == 50
+    assert policies.match("/api/groups/admin", "GET").name == "admin"
+
+
+def test_lookup_agrees_with_scanning_the_rules():
+    """The single walk picks the rule a scan of all rules by depth and precedence would."""
+    segments = ["api", "users", "admin", "*"]
+    rng = random.Random(7)
+    rules = []
+    for _ in range(40):
+        prefix = "/" + "/".join(rng.choice(segments) for _ in range(rng.randint(1, 4)))
+        rule = {"prefix": prefix, "limit": len(rules) + 1, "window": 60}
+        if rng.random() < 0.3:
+            rule["methods"] = ["POST"]
+        rules.append(rule)
+    policies = compile_policies(rules, DEFAULT_RATE_LIMITS)
+
+    def scan(path, method):
+        parts = path.strip("/").split("/")
+        candidates = []
+        for index, rule in enumerate(rules):
+            prefix = rule["prefix"].strip("/").split("/")
+            if len(prefix) > len(parts) or method not in rule.get("methods", [method]):
+                continue
+            if all(expected in (part, "*") for expected, part in zip(prefix, parts)):
+                # Deepest first, then an exact segment before a wildcard, then table order
+                candidates.append((-len(prefix), [expected == "*" for expected in prefix], index))
+        return rules[min(candidates)[2]]["limit"] if candidates else None
+
+    for length in range(1, 6):
+        for parts in itertools.product(["api", "users", "admin", "42"], repeat=length):
+            path = "/" + "/".join(parts)
+            for method in ("GET", "POST"):
+                found = policies.match(path, method)
+                assert (found.limit if found else None) == scan(path, method), path
+
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        compile_policies([{"prefix": "/api", "tier": "missing"}], DEFAULT_RATE_LIMITS)
+    with pytest.raises(ValueError):
+        compile_policies([{"prefix": "api", "tier": "general"}], DEFAULT_RATE_LIMITS)
+    with pytest.raises(ValueError):
+        compile_policies([{"prefix": "/api", "limit": 5}], DEFAULT_RATE_LIMITS)
@@ -0,0 +1,88 @@
+"""
+Tests for the rate limit middleware and dependency.
+"""
+
+import pytest
+from fastapi import Request
+
+from app.middlewares import rate_limiter
+from app.middlewares.rate_limit_backends import MemoryBackend, RedisBackend
+from app.middlewares.rate_limiter import (
+    configure_rate_limiter,
+    rate_limit,
+    RateLimitExceeded,
+    RateLimitMiddleware,
+)
+from app.tests.performance.redis_stand_in import RedisStandIn
+
+
+@pytest.fixture(autouse=True)
+def restore_configuration(monkeypatch):
+    names = (
+        "rate_limit_backend", "rate_limit_leases", "rate_limit_policies", "backend_errors",
+        "RATE_LIMIT_ENABLED", "RATE_LIMIT_REDIS_URL", "RATE_LIMIT_ERROR_POLICY",
+    )
+    for name in names:
+        monkeypatch.setattr(rate_limiter, name, getattr(rate_limiter, name))
+    monkeypatch.setattr(rate_limiter, "_fallback_backend", MemoryBackend())
+
+
+def _request(path="/api/properties"):
+    return Request({"type": "http", "method": "GET", "path": path, "headers": [], "client": ("10.0.0.1", 1234)})
+
+
+@pytest.mark.asyncio
+async def test_middleware_and_dependency_share_the_backend():
+    """Both entry points are limited by the configured backend and report when to retry."""
+    backend = MemoryBackend()
+    configure_rate_limiter(backend=backend)
+    middleware = RateLimitMiddleware.__new__(RateLimitMiddleware)
+    policy = rate_limiter.rate_limit_policies.match("/api/auth/login", "POST")
+    for _ in range(5):
+        assert (await middleware._check_rate_limit("client", policy)).allowed
+
+    result = await middleware._check_rate_limit("client", policy)
+    assert not result.allowed
+    assert result.remaining == 0
+    assert backend.tats.get("ratelimit:gcra:auth:client", None) is not None
+
+    dependency = rate_limit(limit=1, window=60, key_func=lambda request: "client")
+    assert await dependency(_request()) is True
+    with pytest.raises(RateLimitExceeded) as exc_info:
+        await dependency(_request())
+    assert exc_info.value.headers == {"Retry-After": "60"}
+    assert backend.tats.get("ratelimit:gcra:custom:/api/properties:client", None) is not None
+
+
+def test_configure_selects_backends_by_name():
+    """Backends are chosen by name; only remote backends get leases."""
+    configure_rate_limiter(backend="sharded-memory")
+    assert rate_limiter.rate_limit_backend.stats()["backend"] == "sharded-memory"
+    assert rate_limiter.rate_limit_leases is None
+
+    configure_rate_limiter(redis_url="redis://cache:6379/1")
+    assert isinstance(rate_limiter.rate_limit_backend, RedisBackend)
+    assert rate_limiter.rate_limit_backend.redis_url == "redis://cache:6379/1"
+    assert rate_limiter.rate_limit_leases is not None
+
+    with pytest.raises(ValueError):
+        configure_rate_limiter(on_error="ignore")
+
+    configure_rate_limiter(policies=[{"prefix": "/api/exports", "limit": 2, "window": 10}])
+    assert rate_limiter.rate_limit_policies.match("/api/properties", "GET") is None
+    assert rate_limiter.rate_limit_policies.match("/api/exports/1", "GET").limit == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy, allowed", [("memory", [True, True, False]), ("allow", [True] * 3), ("deny", [False] * 3)])
+async def test_backend_errors_apply_the_error_policy(policy, allowed):
+    """With Redis unreachable, requests are limited in memory, allowed or denied."""
+    async with RedisStandIn() as server:
+        url = server.url
+    configure_rate_limiter(backend=RedisBackend(url), on_error=policy)
+
+    results = [await rate_limiter.check_rate_limit("client", limit=2, window=60) for _ in range(3)]
+
+    assert [result.allowed for result in results] == allowed
+    assert rate_limiter.backend_errors == 3
+    await rate_limiter.close_rate_limiter()
@@ -0,0 +1 @@
+# Init file for performance benchmarks
\ No newline at end of file
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Benchmark geospatial property search against a MongoDB deployment.
+
+Seeds a benchmark collection with synthetic listings clustered around a few
+US metro areas, creates the production search indexes and times radius
+($geoNear) and bounding-box ($geoWithin) searches.
+
+Usage:
+    python -m app.tests.performance.bench_geo_search --listings 1000000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from pymongo import MongoClient
+
+from app.core.config import settings
+from app.db.indexes import PROPERTY_SEARCH_INDEXES, SEARCH_COLLATION
+from app.models.property import BoundingBox, GeoNearFilter, PropertySearchParams
+from app.services.property_search import build_geo_near_pipeline, build_search_query
+
+# (city, state, longitude, latitude)
+METROS = [
+    ("New York", "NY", -73.98, 40.75),
+    ("Chicago", "IL", -87.63, 41.88),
+    ("Los Angeles", "CA", -118.24, 34.05),
+    ("Houston", "TX", -95.37, 29.76),
+    ("Boston", "MA", -71.06, 42.36),
+]
+
+
+def generate_listing(rng: random.Random) -> Dict[str, Any]:
+    """Create one synthetic listing within ~30km of a metro center."""
+    city, state, longitude, latitude = rng.choice(METROS)
+    longitude += rng.gauss(0, 0.15)
+    latitude += rng.gauss(0, 0.1)
+    bedrooms = rng.randint(0, 5)
+    return {
+        "title": f"{bedrooms} bedroom listing in {city}",
+        "status": "available" if rng.random() < 0.7 else "rented",
+        "property_type": rng.choice(["apartment", "house", "condo", "townhouse"]),
+        "bedrooms": bedrooms,
+        "bathrooms": max(1.0, bedrooms - rng.choice([0, 0.5, 1])),
+        "area": rng.uniform(300, 3000),
+        "price": round(rng.uniform(800, 6000), 2),
+        "address": {"city": city, "state": state, "country": "USA", "latitude": latitude, "longitude": longitude},
+        "location": {"type": "Point", "coordinates": [longitude, latitude]},
+    }
+
+
+def seed(collection, listings: int, batch_size: int = 10000) -> None:
+    """Replace the benchmark collection with synthetic listings."""
+    rng = random.Random(42)
+    collection.drop()
+    for keys, options in PROPERTY_SEARCH_INDEXES:
+        collection.create_index(keys, **options)
+
+    start = time.perf_counter()
+    for offset in range(0, listings, batch_size):
+        batch = [generate_listing(rng) for _ in range(min(batch_size, listings - offset))]
+        collection.insert_many(batch, ordered=False)
+    print(f"Seeded {listings} listings in {time.perf_counter() - start:.1f}s")
+
+
+def time_query(name: str, run: Callable[[], List[Dict]], iterations: int) -> None:
+    """Run a query repeatedly and print latency percentiles."""
+    run()  # warm up
+    timings = []
+    results = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        results = len(run())
+        timings.append((time.perf_counter() - start) * 1000)
+
+    quantiles = statistics.quantiles(timings, n=100)
+    print(
+        f"{name:<36} results={results:<4} "
+        f"p50={statistics.median(timings):7.2f}ms p95={quantiles[94]:7.2f}ms p99={quantiles[98]:7.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark geospatial property search")
+    parser.add_argument("--listings", type=int, default=1_000_000, help="Number of listings to seed")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed runs per query")
+    parser.add_argument("--collection", default="properties_geo_benchmark", help="Benchmark collection name")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the existing benchmark collection")
+    args = parser.parse_args()
+
+    client = MongoClient(settings.MONGO_CONNECTION_STRING)
+    collection = client[settings.MONGO_TEST_DB_NAME][args.collection]
+    if not args.skip_seed:
+        seed(collection, args.listings)
+
+    def radius(max_distance: float, **filters) -> Callable[[], List[Dict]]:
+        params = PropertySearchParams(
+            near=GeoNearFilter(longitude=-73.98, latitude=40.75, max_distance=max_distance), **filters
+        )
+        pipeline = build_geo_near_pipeline(params, limit=20)
+        return lambda: list(collection.aggregate(pipeline, collation=SEARCH_COLLATION))
+
+    def box(**filters) -> Callable[[], List[Dict]]:
+        params = PropertySearchParams(
+            within_box=BoundingBox(min_longitude=-74.02, min_latitude=40.70, max_longitude=-73.93, max_latitude=40.80),
+            **filters
+        )
+        query = build_search_query(params)
+        return lambda: list(collection.find(query, collation=SEARCH_COLLATION).limit(20))
+
+    time_query("radius 1km", radius(1000), args.iterations)
+    time_query("radius 5km", radius(5000), args.iterations)
+    time_query("radius 5km, max_price 2500", radius(5000, max_price=2500), args.iterations)
+    time_query("radius 25km, 2+ bedrooms", radius(25000, min_bedrooms=2), args.iterations)
+    time_query("bounding box (Manhattan)", box(), args.iterations)
+    time_query("bounding box, max_price 2500", box(max_price=2500), args.iterations)
+
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Benchmark bulk property import throughput against a MongoDB deployment.
+
+Generates synthetic NDJSON listings and imports them into a benchmark
+collection, once with one insert_one per row (the single-create path) and
+once through the chunked importer at several chunk sizes, and reports rows
+per second for each.
+
+Usage:
+    python -m app.tests.performance.bench_property_import --rows 50000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import List
+
+from app.core.config import settings
+from app.core.mongo_db import close_mongodb, get_collection
+from app.models.property import PropertyCreate
+from app.services.property_import import PropertyImporter, iter_ndjson_rows
+from app.tests.performance.bench_geo_search import generate_listing
+
+
+def generate_lines(rows: int, invalid_ratio: float) -> List[str]:
+    """Create NDJSON lines for valid listings, with some invalid rows mixed in."""
+    rng = random.Random(7)
+    lines = []
+    for i in range(rows):
+        listing = generate_listing(rng)
+        listing.pop("location")
+        listing["description"] = f"Synthetic listing {i}"
+        listing["address"].update({"street": f"{i} Main St", "zip_code": "00000"})
+        if rng.random() < invalid_ratio:
+            listing["price"] = -1
+        lines.append(json.dumps(listing))
+    return lines
+
+
+async def bench_insert_one(collection_name: str, lines: List[str]) -> float:
+    """Validate and insert each row with its own insert_one; returns rows/s."""
+    collection = await get_collection(collection_name)
+    await collection.drop()
+
+    start = time.perf_counter()
+    for _, record in iter_ndjson_rows(lines):
+        try:
+            property_data = PropertyCreate(**record)
+        except ValueError:
+            continue
+        await collection.insert_one(property_data.dict())
+    return len(lines) / (time.perf_counter() - start)
+
+
+async def bench_importer(collection_name: str, lines: List[str], chunk_size: int) -> float:
+    """Run the chunked importer; returns rows/s."""
+    collection = await get_collection(collection_name)
+    await collection.drop()
+
+    class BenchmarkImporter(PropertyImporter):
+        COLLECTION = collection_name
+
+    start = time.perf_counter()
+    result = await BenchmarkImporter("benchmark-owner", chunk_size).run(iter_ndjson_rows(lines))
+    elapsed = time.perf_counter() - start
+    assert result.total_rows == len(lines)
+    return len(lines) / elapsed
+
+
+async def run(args) -> None:
+    lines = generate_lines(args.rows, args.invalid_ratio)
+    print(f"Generated {len(lines)} rows ({args.invalid_ratio:.0%} invalid)")
+
+    rate = await bench_insert_one(args.collection, lines[:args.single_rows])
+    print(f"{'insert_one per row':<28} {rate:10.0f} rows/s")
+
+    for chunk_size in args.chunk_sizes:
+        rate = await bench_importer(args.collection, lines, chunk_size)
+        print(f"{f'importer chunk={chunk_size}':<28} {rate:10.0f} rows/s")
+
+    await (await get_collection(args.collection)).drop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bulk property import")
+    parser.add_argument("--rows", type=int, default=50_000, help="Number of rows to import")
+    parser.add_argument("--single-rows", type=int, default=5_000, help="Rows for the insert_one baseline")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[100, 1000, 5000], help="Chunk sizes to time")
+    parser.add_argument("--invalid-ratio", type=float, default=0.01, help="Share of rows failing validation")
+    parser.add_argument("--collection", default="properties_import_benchmark", help="Benchmark collection name")
+    args = parser.parse_args()
+
+    # Keep benchmark writes out of the application database
+    settings.MONGO_DB_NAME = settings.MONGO_TEST_DB_NAME
+    try:
+        asyncio.run(run(args))
+    finally:
+        close_mongodb()
+
+
+if __name__ == "__main__":
+    main()
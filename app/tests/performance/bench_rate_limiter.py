@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+Benchmark rate-limit decision overhead.
+
+Runs decisions from many concurrent clients and reports p50/p99 latency
+per decision, Redis round trips per 1000 decisions and the worst event
+loop stall seen by a ticker task. Each client key sends REQUESTS_PER_KEY
+requests, well within the general tier, which is the case leases serve.
+
+Modes:
+    async     RedisBackend, one EVALSHA per decision
+    leased    per-worker leases of the general tier (LeasedRateLimiter)
+    memory    MemoryBackend, no network hop
+    blocking  the original implementation (synchronous client, sorted-set
+              pipeline plus a second ZRANGE round trip); it stalls the
+              loop for every decision
+
+By default a RedisStandIn serves from a child process on localhost, so
+round trips are real TCP but server time is not representative (the Lua
+script runs on lupa); pass --redis-url to measure against a real server.
+
+Usage:
+    python -m app.tests.performance.bench_rate_limiter --concurrency 1 32 128
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from contextlib import nullcontext
+
+import redis
+
+from app.middlewares.rate_limit_backends import LeasedRateLimiter, MemoryBackend, RedisBackend
+from app.middlewares.rate_limiter import DEFAULT_RATE_LIMITS
+from app.tests.performance.redis_stand_in import RedisStandIn
+
+REQUESTS_PER_KEY = 50
+
+
+def blocking_check(client: redis.Redis, redis_key: str, limit: int, window: int):
+    """The previous synchronous implementation: two round trips, loop blocked."""
+    now = int(time.time())
+    pipe = client.pipeline()
+    pipe.zremrangebyscore(redis_key, 0, now - window)
+    pipe.zcard(redis_key)
+    pipe.zadd(redis_key, {str(now): now})
+    pipe.expire(redis_key, window * 2)
+    _, current_count, _, _ = pipe.execute()
+    client.zrange(redis_key, 0, 0, withscores=True)
+    return current_count >= limit
+
+
+def percentile(samples, fraction: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+async def measure(decide, concurrency: int, decisions: int):
+    """Run decisions from concurrent clients while a ticker measures loop stalls."""
+    latencies = []
+    stalls = [0.0]
+    running = True
+
+    async def ticker():
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stalls.append(time.perf_counter() - start - 0.001)
+
+    async def client(worker: int):
+        for i in range(decisions // concurrency):
+            start = time.perf_counter()
+            await decide(f"bench-{concurrency}-{worker}-{i // REQUESTS_PER_KEY}")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    await asyncio.gather(*(client(worker) for worker in range(concurrency)))
+    running = False
+    await tick
+    return latencies, max(stalls) * 1000
+
+
+async def bench(redis_url: str, concurrencies, decisions: int) -> None:
+    backend = RedisBackend(redis_url)
+    memory = MemoryBackend()
+    sync_client = redis.from_url(redis_url)
+    tier = DEFAULT_RATE_LIMITS["general"]
+    round_trips = {"async": 0, "leased": 0, "memory": 0, "blocking": 0}
+    leases = LeasedRateLimiter(backend)
+
+    async def async_decide(client_id: str):
+        round_trips["async"] += 1
+        await backend.check(f"async:{client_id}", tier["limit"], tier["window"])
+
+    async def leased_decide(client_id: str):
+        await leases.check(f"leased:{client_id}", tier["limit"], tier["window"], tier["lease"])
+        round_trips["leased"] = leases.backend_calls
+
+    async def memory_decide(client_id: str):
+        await memory.check(client_id, tier["limit"], tier["window"])
+
+    async def blocking_decide(client_id: str):
+        round_trips["blocking"] += 2
+        blocking_check(sync_client, f"blocking:{client_id}", tier["limit"], tier["window"])
+
+    # Warm up connections and the script cache
+    await async_decide("warm-up")
+    blocking_check(sync_client, "warm-up", 100, 60)
+
+    print(f"{'mode':>9} {'clients':>8} {'p50 ms':>8} {'p99 ms':>8} {'redis/1k':>9} {'max stall ms':>13}")
+    modes = (
+        ("async", async_decide),
+        ("leased", leased_decide),
+        ("memory", memory_decide),
+        ("blocking", blocking_decide),
+    )
+    for concurrency in concurrencies:
+        for mode, decide in modes:
+            before = round_trips[mode]
+            latencies, stall = await measure(decide, concurrency, decisions)
+            per_thousand = (round_trips[mode] - before) * 1000 / len(latencies)
+            print(
+                f"{mode:>9} {concurrency:>8} {statistics.median(latencies):>8.3f} "
+                f"{percentile(latencies, 0.99):>8.3f} {per_thousand:>9.0f} {stall:>13.3f}"
+            )
+
+    await backend.close()
+    sync_client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark rate-limit decisions")
+    parser.add_argument("--redis-url", help="Redis server to use instead of the local stand-in")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 32, 128], help="Concurrent clients")
+    parser.add_argument("--decisions", type=int, default=4096, help="Decisions per run")
+    args = parser.parse_args()
+
+    server = nullcontext(args.redis_url) if args.redis_url else RedisStandIn.in_subprocess()
+    with server as redis_url:
+        asyncio.run(bench(redis_url, args.concurrency, args.decisions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Benchmark similar-listing queries at 100k and 1M listings.
+
+Builds a SimilarPropertyIndex in memory from synthetic listings around a
+few metro centers (no database needed) and reports build time, memory, and
+query latency for single lookups and for batches of queries sharing one
+pass over the matrix.
+
+Usage:
+    python -m app.tests.performance.bench_similar_properties --sizes 100000 1000000
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from app.services.similar_properties import (
+    AMENITY_FEATURES,
+    FEATURE_COUNT,
+    LOCATION_COLUMNS,
+    NUMERIC_FEATURES,
+    PROPERTY_TYPES,
+    SimilarPropertyIndex,
+)
+from app.tests.performance.bench_geo_search import METROS
+
+
+def synthetic_raw_features(listings: int, rng: np.random.Generator) -> np.ndarray:
+    """Generate raw_features() rows directly, which is much faster than encoding documents."""
+    raw = np.zeros((listings, FEATURE_COUNT))
+    bedrooms = rng.integers(0, 6, listings)
+    raw[:, 0] = np.log1p(rng.uniform(800, 6000, listings))
+    raw[:, 1] = np.log1p(rng.uniform(300, 3000, listings))
+    raw[:, 2] = bedrooms
+    raw[:, 3] = np.maximum(1.0, bedrooms - rng.choice([0, 0.5, 1], listings))
+
+    offset = len(NUMERIC_FEATURES)
+    raw[np.arange(listings), offset + rng.integers(0, 4, listings)] = 1.0
+    offset += len(PROPERTY_TYPES)
+    raw[:, offset:offset + len(AMENITY_FEATURES)] = rng.random((listings, len(AMENITY_FEATURES))) < 0.3
+
+    metros = np.array([(longitude, latitude) for _, _, longitude, latitude in METROS])
+    centers = metros[rng.integers(0, len(metros), listings)]
+    longitude = np.radians(centers[:, 0] + rng.normal(0, 0.15, listings))
+    latitude = np.radians(centers[:, 1] + rng.normal(0, 0.1, listings))
+    raw[:, LOCATION_COLUMNS] = np.column_stack([
+        np.cos(latitude) * np.cos(longitude),
+        np.cos(latitude) * np.sin(longitude),
+        np.sin(latitude),
+    ])
+    return raw
+
+
+def percentile(samples, fraction: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def bench(listings: int, queries: int, batch_size: int, k: int) -> None:
+    rng = np.random.default_rng(11)
+    raw = synthetic_raw_features(listings, rng)
+    ids = [f"{i:024x}" for i in range(listings)]
+    eligible = rng.random(listings) < 0.7
+
+    index = SimilarPropertyIndex()
+    start = time.perf_counter()
+    index.build(ids, raw, eligible)
+    build_seconds = time.perf_counter() - start
+    stats = index.stats()
+    print(f"{listings:>9} listings: built in {build_seconds:.2f}s, {stats['array_bytes'] / 2**20:.0f} MiB")
+
+    sample = rng.choice(listings, queries, replace=False)
+    single = []
+    for row in sample:
+        start = time.perf_counter()
+        index.nearest(index.vectors[row], k, exclude=[ids[row]])
+        single.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{'':>11}single query: p50 {statistics.median(single):.2f} ms, "
+        f"p99 {percentile(single, 0.99):.2f} ms"
+    )
+
+    batches = []
+    for offset in range(0, queries, batch_size):
+        rows = sample[offset:offset + batch_size]
+        start = time.perf_counter()
+        index.nearest(index.vectors[rows], k, exclude=[ids[row] for row in rows])
+        batches.append((time.perf_counter() - start) * 1000 / len(rows))
+    print(f"{'':>11}batches of {batch_size}: {statistics.mean(batches):.2f} ms per query")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark similar-listing queries")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000], help="Listing counts to test")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per size")
+    parser.add_argument("--batch-size", type=int, default=32, help="Queries per batched pass")
+    parser.add_argument("--k", type=int, default=6, help="Recommendations per query")
+    args = parser.parse_args()
+
+    for listings in args.sizes:
+        bench(listings, args.queries, args.batch_size, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""
+Minimal in-process Redis stand-in for benchmarks and tests.
+
+Speaks RESP2 and RESP3 over TCP on localhost, so redis-py talks to it exactly as it
+would to a real server, network round trips included. It implements only
+the commands the rate limiter uses: strings with TTLs, sorted sets,
+MULTI/EXEC, expiry and Lua scripts. Scripts run on the Lua 5.1 runtime of
+the optional lupa package, the Lua version Redis embeds. Run benchmarks
+against a real server with --redis-url for production numbers.
+
+Usage:
+    async with RedisStandIn() as server:
+        client = redis.asyncio.from_url(server.url)
+
+    # Or from a child process, like a separate server
+    with RedisStandIn.in_subprocess() as url:
+        client = redis.from_url(url)
+"""
+
+import asyncio
+import hashlib
+import multiprocessing
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+
+class CommandError(Exception):
+    """Error reply sent back to the client."""
+
+    def __init__(self, message: str, code: str = "ERR"):
+        super().__init__(message)
+        self.code = code
+
+
+class Pairs(list):
+    """Member/score pairs: nested under RESP3, flattened under RESP2."""
+
+
+def _encode(value: Any, resp3: bool = False) -> bytes:
+    if isinstance(value, CommandError):
+        return f"-{value.code} {value}\r\n".encode()
+    if value is None:
+        return b"_\r\n" if resp3 else b"$-1\r\n"
+    if value is True:
+        return b"+OK\r\n"
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, float):
+        if resp3:
+            return f",{value!r}\r\n".encode()
+        value = repr(value)
+    if isinstance(value, str):
+        value = value.encode()
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, dict):
+        items = [item for pair in value.items() for item in pair]
+        return b"%%%d\r\n" % len(value) + b"".join(_encode(item, resp3) for item in items)
+    if isinstance(value, Pairs) and not resp3:
+        value = [item for pair in value for item in pair]
+    return b"*%d\r\n" % len(value) + b"".join(_encode(item, resp3) for item in value)
+
+
+def _score(raw: bytes) -> float:
+    text = raw.decode()
+    if text in ("-inf", "+inf", "inf"):
+        return float(text)
+    if text.startswith("("):
+        raise CommandError("exclusive ranges are not supported")
+    return float(text)
+
+
+class RedisStandIn:
+    """asyncio TCP server holding data in dicts, with lazy key expiry."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.data: Dict[bytes, Any] = {}
+        self.expires: Dict[bytes, float] = {}
+        self.commands = 0
+        # Commands received from clients, by name; scripts count once
+        self.calls: Counter = Counter()
+        self.handlers: Dict[bytes, Callable[[List[bytes]], Any]] = {
+            b"PING": lambda args: "PONG",
+            b"CLIENT": lambda args: True,
+            b"SELECT": lambda args: True,
+            b"FLUSHALL": self._flushall,
+            b"GET": self._get,
+            b"SET": self._set,
+            b"INCRBY": self._incrby,
+            b"DEL": self._delete,
+            b"EXPIRE": self._expire,
+            b"PEXPIRE": self._pexpire,
+            b"PTTL": self._pttl,
+            b"ZADD": self._zadd,
+            b"ZCARD": self._zcard,
+            b"ZRANGE": self._zrange,
+            b"ZREMRANGEBYSCORE": self._zremrangebyscore,
+            b"TIME": self._time,
+            b"EVAL": self._eval,
+            b"EVALSHA": self._evalsha,
+            b"SCRIPT": self._script,
+        }
+        self.scripts: Dict[str, bytes] = {}
+        self._lua = None
+        self._compiled: Dict[str, Any] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    async def start(self) -> "RedisStandIn":
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "RedisStandIn":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    @staticmethod
+    def in_subprocess(host: str = "127.0.0.1") -> "_ServerProcess":
+        """Serve from a child process, like a separate server; yields its URL."""
+        return _ServerProcess(host)
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+        header = await reader.readline()
+        if not header:
+            return None
+        if not header.startswith(b"*"):
+            return header.split()
+        args = []
+        for _ in range(int(header[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        queued: Optional[List[List[bytes]]] = None
+        resp3 = False
+        try:
+            while True:
+                args = await self._read_command(reader)
+                if args is None:
+                    break
+                name = args[0].upper()
+                self.calls[name.decode()] += 1
+                if name == b"HELLO":
+                    resp3 = len(args) > 1 and args[1] == b"3"
+                    reply = {"server": "redis", "version": "7.2.0", "proto": 3 if resp3 else 2, "mode": "standalone"}
+                    if not resp3:
+                        reply = [item for pair in reply.items() for item in pair]
+                elif name == b"MULTI":
+                    queued, reply = [], True
+                elif name == b"EXEC":
+                    reply = [self.execute(command) for command in queued or []]
+                    queued = None
+                elif name == b"DISCARD":
+                    queued, reply = None, True
+                elif queued is not None:
+                    queued.append(args)
+                    reply = "QUEUED"
+                    writer.write(b"+QUEUED\r\n")
+                    continue
+                else:
+                    reply = self.execute(args)
+                writer.write(_encode(reply, resp3))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def execute(self, args: List[bytes]) -> Any:
+        """Run one command and return its reply, or the CommandError to send."""
+        self.commands += 1
+        handler = self.handlers.get(args[0].upper())
+        if handler is None:
+            return CommandError(f"unknown command '{args[0].decode()}'")
+        try:
+            return handler(args[1:])
+        except CommandError as e:
+            return e
+
+    def _live(self, key: bytes) -> Any:
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    def _time(self, args):
+        now = time.time()
+        return [str(int(now)), str(int(now % 1 * 1_000_000))]
+
+    def _script(self, args):
+        subcommand = args[0].upper()
+        if subcommand == b"LOAD":
+            sha = hashlib.sha1(args[1]).hexdigest()
+            self.scripts[sha] = args[1]
+            return sha
+        if subcommand == b"FLUSH":
+            self.scripts.clear()
+            self._compiled.clear()
+            return True
+        if subcommand == b"EXISTS":
+            return [int(sha.decode().lower() in self.scripts) for sha in args[1:]]
+        raise CommandError(f"unknown SCRIPT subcommand '{subcommand.decode()}'")
+
+    def _eval(self, args):
+        sha = self._script([b"LOAD", args[0]])
+        return self._evalsha([sha.encode(), *args[1:]])
+
+    def _evalsha(self, args):
+        sha = args[0].decode().lower()
+        if sha not in self.scripts:
+            raise CommandError("No matching script. Please use EVAL.", code="NOSCRIPT")
+        if sha not in self._compiled:
+            self._compiled[sha] = self._runtime().compile(self.scripts[sha])
+        numkeys = int(args[1])
+        lua = self._runtime()
+        lua.globals()[b"KEYS"] = lua.table_from(args[2:2 + numkeys])
+        lua.globals()[b"ARGV"] = lua.table_from(args[2 + numkeys:])
+        return self._from_lua(self._compiled[sha]())
+
+    def _runtime(self):
+        if self._lua is None:
+            # Imported here so only scripted commands need lupa
+            from lupa import lua51
+
+            self._lua = lua51.LuaRuntime(encoding=None)
+            self._lua.globals()[b"redis"] = self._lua.table_from({b"call": self._lua_call})
+        return self._lua
+
+    def _lua_call(self, *args):
+        """redis.call(): run a command, raising replies that are errors."""
+        # Numbers are formatted like Redis does, with %.17g
+        command = [arg if isinstance(arg, bytes) else b"%.17g" % arg for arg in args]
+        reply = self.execute(command)
+        if isinstance(reply, CommandError):
+            raise reply
+        return self._to_lua(reply)
+
+    def _to_lua(self, reply: Any) -> Any:
+        # Conversions follow Redis: nil bulk becomes false, status a table
+        if reply is None:
+            return False
+        if reply is True:
+            return self._lua.table_from({b"ok": b"OK"})
+        if isinstance(reply, str):
+            return reply.encode()
+        if isinstance(reply, float):
+            return repr(reply).encode()
+        if isinstance(reply, list):
+            items = [item for pair in reply for item in pair] if isinstance(reply, Pairs) else reply
+            return self._lua.table_from([self._to_lua(item) for item in items])
+        return reply
+
+    def _from_lua(self, value: Any) -> Any:
+        # Conversions follow Redis: numbers truncate, tables stop at the first nil
+        from lupa.lua51 import lua_type
+
+        if value is None or value is False:
+            return None
+        if value is True:
+            return 1
+        if isinstance(value, float):
+            return int(value)
+        if lua_type(value) == "table":
+            if value[b"ok"] is not None:
+                return value[b"ok"]
+            if value[b"err"] is not None:
+                return CommandError(value[b"err"].decode())
+            items = []
+            while value[len(items) + 1] is not None:
+                items.append(self._from_lua(value[len(items) + 1]))
+            return items
+        return value
+
+    def _flushall(self, args):
+        self.data.clear()
+        self.expires.clear()
+        return True
+
+    def _get(self, args):
+        return self._live(args[0])
+
+    def _set(self, args):
+        self.data[args[0]] = args[1]
+        self.expires.pop(args[0], None)
+        options = [arg.upper() for arg in args[2:]]
+        if b"PX" in options:
+            self.expires[args[0]] = time.time() + int(args[2 + options.index(b"PX") + 1]) / 1000
+        elif b"EX" in options:
+            self.expires[args[0]] = time.time() + int(args[2 + options.index(b"EX") + 1])
+        return True
+
+    def _incrby(self, args):
+        value = int(self._live(args[0]) or 0) + int(args[1])
+        self.data[args[0]] = str(value).encode()
+        return value
+
+    def _delete(self, args):
+        removed = 0
+        for key in args:
+            if self._live(key) is not None:
+                removed += 1
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return removed
+
+    def _expire(self, args):
+        if self._live(args[0]) is None:
+            return 0
+        self.expires[args[0]] = time.time() + int(args[1])
+        return 1
+
+    def _pexpire(self, args):
+        if self._live(args[0]) is None:
+            return 0
+        self.expires[args[0]] = time.time() + int(args[1]) / 1000
+        return 1
+
+    def _pttl(self, args):
+        if self._live(args[0]) is None:
+            return -2
+        if args[0] not in self.expires:
+            return -1
+        return int((self.expires[args[0]] - time.time()) * 1000)
+
+    def _zset(self, key: bytes, create: bool = False) -> Optional[Dict[bytes, float]]:
+        zset = self._live(key)
+        if zset is None and create:
+            zset = self.data[key] = {}
+        if zset is not None and not isinstance(zset, dict):
+            raise CommandError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return zset
+
+    def _zadd(self, args):
+        zset = self._zset(args[0], create=True)
+        added = 0
+        for score, member in zip(args[1::2], args[2::2]):
+            added += member not in zset
+            zset[member] = _score(score)
+        return added
+
+    def _zcard(self, args):
+        return len(self._zset(args[0]) or {})
+
+    def _zrange(self, args):
+        members = sorted((self._zset(args[0]) or {}).items(), key=lambda item: (item[1], item[0]))
+        start, stop = int(args[1]), int(args[2])
+        stop = len(members) + stop if stop < 0 else stop
+        selected = members[start:stop + 1]
+        if len(args) > 3 and args[3].upper() == b"WITHSCORES":
+            return Pairs(selected)
+        return [member for member, _ in selected]
+
+    def _zremrangebyscore(self, args):
+        zset = self._zset(args[0]) or {}
+        low, high = _score(args[1]), _score(args[2])
+        removed = [member for member, score in zset.items() if low <= score <= high]
+        for member in removed:
+            del zset[member]
+        return len(removed)
+
+
+
+def _serve_forever(host: str, port_queue) -> None:
+    async def serve():
+        server = await RedisStandIn(host).start()
+        port_queue.put(server.port)
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+class _ServerProcess:
+    """Context manager running a RedisStandIn in a child process."""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.port_queue = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=_serve_forever, args=(host, self.port_queue), daemon=True)
+
+    def __enter__(self) -> str:
+        self.process.start()
+        return f"redis://{self.host}:{self.port_queue.get(timeout=10)}/0"
+
+    def __exit__(self, *exc_info) -> None:
+        self.process.terminate()
+        self.process.join()
@@ -0,0 +1,112 @@
+"""
+Tests for streaming collection exports.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.core import mongo_db
+from app.services.export_service import ExportService
+
+
+class FakeCursor:
+    """Async cursor recording sort, batch size and close."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.sort_keys = None
+        self.batch = None
+        self.closed = False
+
+    def sort(self, keys):
+        self.sort_keys = keys
+        return self
+
+    def batch_size(self, size):
+        self.batch = size
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield dict(document)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.cursor = FakeCursor(documents)
+        self.find_args = None
+
+    def find(self, filter_query, projection=None):
+        self.find_args = (filter_query, projection)
+        return self.cursor
+
+
+@pytest.fixture
+def properties(monkeypatch):
+    collection = FakeCollection([
+        {
+            "_id": ObjectId(),
+            "title": f"Flat {i}",
+            "price": 1000 + i,
+            "address": {"city": "Boston, MA"},
+            "owner_id": ObjectId(),
+            "created_at": datetime(2025, 1, 1),
+        }
+        for i in range(450)
+    ])
+
+    async def fake_get_collection(name):
+        assert name == "properties"
+        return collection
+
+    monkeypatch.setattr(mongo_db, "get_collection", fake_get_collection)
+    return collection
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_streams_every_document(properties):
+    """NDJSON exports emit one JSON object per line in several chunks."""
+    chunks = await _collect(ExportService.stream("properties", "ndjson", batch_size=100))
+
+    lines = "".join(chunks).splitlines()
+    assert len(chunks) > 1
+    assert len(lines) == 450
+    first = json.loads(lines[0])
+    assert first["title"] == "Flat 0"
+    assert first["created_at"] == "2025-01-01T00:00:00"
+    assert properties.cursor.batch == 100
+    assert properties.cursor.sort_keys == [("_id", 1)]
+    assert properties.cursor.closed
+
+
+@pytest.mark.asyncio
+async def test_csv_export_flattens_nested_columns(properties):
+    """CSV exports write a header and read dotted columns from nested fields."""
+    chunks = await _collect(ExportService.stream("properties", "csv"))
+
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert len(rows) == 450
+    assert rows[0]["address.city"] == "Boston, MA"
+    assert rows[0]["price"] == "1000"
+    assert rows[0]["bedrooms"] == ""
+
+
+def test_unknown_export_is_rejected():
+    """Only the configured collections can be exported."""
+    with pytest.raises(ValueError):
+        ExportService.stream("users")
@@ -0,0 +1,86 @@
+"""
+Tests for the in-memory columnar listing index.
+"""
+
+import pytest
+from bson import ObjectId
+
+from app.models.property import GeoNearFilter, PropertySearchParams
+from app.services import listing_index as listing_index_module
+from app.services.listing_index import ListingIndex
+
+
+def _property(price, bedrooms=2, status="available", area=None):
+    return {"_id": ObjectId(), "price": price, "bedrooms": bedrooms, "bathrooms": 1, "area": area, "status": status}
+
+
+def _loaded_index(documents, monkeypatch):
+    """Return an index loaded from the given documents instead of MongoDB."""
+    async def fake_stream(collection_name, projection=None, batch_size=1000):
+        for document in documents:
+            yield {"id": str(document["_id"]), **{k: v for k, v in document.items() if k != "_id"}}
+
+    monkeypatch.setattr(listing_index_module, "stream_documents", fake_stream)
+    return ListingIndex(capacity=2)
+
+
+@pytest.mark.asyncio
+async def test_search_filters_ranges_and_orders_by_price_then_id(monkeypatch):
+    """Pages match MongoDB: range and status filters, ordered by price then _id."""
+    documents = [
+        _property(3000), _property(1500), _property(1500), _property(900, bedrooms=1),
+        _property(1200, status="rented"), _property(None),
+    ]
+    index = _loaded_index(documents, monkeypatch)
+
+    assert await index.load() == 6
+    assert index.stats()["capacity"] >= 6
+
+    params = PropertySearchParams(min_bedrooms=2, max_price=2000)
+    ids, total = index.search(params, skip=0, limit=10)
+
+    # The unpriced property has no price to match a price range
+    tied = sorted(str(doc["_id"]) for doc in documents[1:3])
+    assert ids == tied
+    assert total == 2
+    assert index.count(params) == 2
+
+    # Unpriced properties sort first, like missing values in MongoDB
+    ids, total = index.search(PropertySearchParams(), skip=0, limit=2)
+    assert total == 5
+    assert ids == [str(documents[5]["_id"]), str(documents[3]["_id"])]
+
+
+@pytest.mark.asyncio
+async def test_writes_update_rows_in_place(monkeypatch):
+    """Upserts overwrite rows, removals free them for reuse."""
+    index = _loaded_index([], monkeypatch)
+
+    index.upsert(_property(1000))
+    assert index.stats()["rows"] == 0  # inactive until loaded
+
+    await index.load()
+    first, second = _property(1000), _property(2000)
+    index.upsert(first)
+    index.upsert(second)
+    index.upsert({**first, "price": 2500})
+
+    ids, _ = index.search(PropertySearchParams(), limit=10)
+    assert ids == [str(second["_id"]), str(first["_id"])]
+
+    index.remove(str(second["_id"]))
+    index.upsert(_property(500))
+    stats = index.stats()
+    assert stats["rows"] == 2
+    assert stats["free_rows"] == 0
+    assert index.count(PropertySearchParams(max_price=600)) == 1
+
+
+def test_can_answer_only_status_and_ranges():
+    """Any filter besides status and numeric ranges goes to MongoDB."""
+    assert ListingIndex.can_answer(PropertySearchParams(min_price=1000, max_area=80))
+    assert not ListingIndex.can_answer(PropertySearchParams(city="Boston"))
+    assert not ListingIndex.can_answer(PropertySearchParams(q="loft"))
+    assert not ListingIndex.can_answer(
+        PropertySearchParams(near=GeoNearFilter(longitude=0, latitude=0, max_distance=100))
+    )
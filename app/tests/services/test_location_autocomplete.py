@@ -0,0 +1,137 @@
+"""
+Tests for the city and state autocomplete index.
+"""
+
+import asyncio
+
+import pytest
+from pymongo.errors import ServerSelectionTimeoutError
+
+from app.services import location_autocomplete as autocomplete_module
+from app.services.location_autocomplete import (
+    build_suggestions,
+    LocationAutocomplete,
+    normalize_location,
+)
+
+
+def _group(city, state, count, country="USA"):
+    return {"_id": {"city": city, "state": state, "country": country}, "count": count}
+
+
+GROUPS = [
+    _group("New York", "NY", 40),
+    _group("new york", "ny", 2),
+    _group("Newark", "NJ", 7),
+    _group("Boston", "MA", 12),
+    _group("São Paulo", "SP", 5, country="Brazil"),
+    _group(None, "NY", 3),
+]
+
+
+def test_normalize_location_strips_case_accents_and_punctuation():
+    """Names compare without case, accents or punctuation."""
+    assert normalize_location("  São   Paulo ") == "sao paulo"
+    assert normalize_location("Winston-Salem") == "winston salem"
+    assert normalize_location(None) == ""
+
+
+def test_build_suggestions_merges_spellings_and_sums_states():
+    """Spellings of one city merge under the most common one; states total their cities."""
+    suggestions = {(s.type, s.name): s for s in build_suggestions(GROUPS)}
+
+    assert suggestions[("city", "New York")].count == 42
+    assert suggestions[("city", "New York")].state == "NY"
+    assert suggestions[("state", "NY")].count == 42
+    assert ("city", "new york") not in suggestions
+
+
+def test_lookup_matches_name_and_word_prefixes_by_count():
+    """Prefixes of any word match, most listings first."""
+    index = LocationAutocomplete(max_prefix_length=4)
+    index.build(build_suggestions(GROUPS))
+
+    assert [s.name for s in index.lookup("NEW")] == ["New York", "Newark"]
+    assert [s.name for s in index.lookup("york")] == ["New York"]
+    assert [s.name for s in index.lookup("sao p")] == ["São Paulo"]
+    # Longer than the indexed prefixes, so filtered within those of "new "
+    assert [s.name for s in index.lookup("new yo")] == ["New York"]
+    assert [s.name for s in index.lookup("n", limit=2)] == ["New York", "NY"]
+    assert index.lookup("  ") == []
+
+
+@pytest.mark.asyncio
+async def test_suggest_loads_index_on_first_use(monkeypatch):
+    """The first lookup builds the index from the location counts."""
+    class FakeCursor:
+        async def to_list(self, length=None):
+            return GROUPS
+
+    class FakeCollection:
+        pipelines = []
+
+        def aggregate(self, pipeline):
+            self.pipelines.append(pipeline)
+            return FakeCursor()
+
+    collection = FakeCollection()
+
+    async def fake_get_collection(name):
+        assert name == "properties"
+        return collection
+
+    monkeypatch.setattr(autocomplete_module, "get_collection", fake_get_collection)
+    index = LocationAutocomplete()
+
+    assert [s.name for s in await index.suggest("bos")] == ["Boston"]
+    await index.suggest("new")
+    assert len(collection.pipelines) == 1
+    assert index.stats()["locations"] == 8
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_lookups_share_one_load(monkeypatch):
+    """Lookups racing the first load wait for it instead of loading again."""
+    loads = []
+
+    class FakeCursor:
+        async def to_list(self, length=None):
+            await asyncio.sleep(0)
+            return GROUPS
+
+    class FakeCollection:
+        def aggregate(self, pipeline):
+            loads.append(pipeline)
+            return FakeCursor()
+
+    async def fake_get_collection(name):
+        return FakeCollection()
+
+    monkeypatch.setattr(autocomplete_module, "get_collection", fake_get_collection)
+    index = LocationAutocomplete()
+
+    results = await asyncio.gather(*(index.suggest("bos") for _ in range(5)))
+
+    assert len(loads) == 1
+    assert all([s.name for s in result] == ["Boston"] for result in results)
+
+
+@pytest.mark.asyncio
+async def test_failed_first_load_answers_empty(monkeypatch):
+    """A database error on the first load is logged, not raised, and retried later."""
+    attempts = []
+
+    async def failing_get_collection(name):
+        attempts.append(name)
+        raise ServerSelectionTimeoutError("no servers")
+
+    monkeypatch.setattr(autocomplete_module, "get_collection", failing_get_collection)
+    index = LocationAutocomplete()
+
+    assert await index.suggest("bos") == []
+    assert await index.suggest("bos") == []
+    assert len(attempts) == 1
+
+    monkeypatch.setattr(autocomplete_module, "FIRST_LOAD_RETRY_INTERVAL", 0)
+    await index.suggest("bos")
+    assert len(attempts) == 2
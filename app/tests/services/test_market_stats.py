@@ -0,0 +1,184 @@
+"""
+Tests for materialized market statistics.
+"""
+
+from datetime import datetime
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.services import market_stats_service
+from app.services.market_stats_service import (
+    ALL_TYPES,
+    build_stats,
+    group_properties,
+    MarketStatsJob,
+    MarketStatsService,
+)
+
+
+def _property(city, price, property_type="apartment", area=50.0, state="MA"):
+    return {
+        "address": {"city": city, "state": state},
+        "property_type": property_type,
+        "price": price,
+        "area": area,
+    }
+
+
+def test_group_properties_by_city_type_and_city():
+    """Every priced property counts for its city/type and its city-wide group."""
+    groups = group_properties([
+        _property("Boston", 1000),
+        _property("BOSTON", 2000, property_type="house"),
+        _property("Boston", None),
+        _property(None, 1500),
+    ])
+
+    assert set(groups) == {("boston", "apartment"), ("boston", "house"), ("boston", ALL_TYPES)}
+    assert groups[("boston", ALL_TYPES)].prices == [1000, 2000]
+
+
+def test_build_stats_percentiles_and_trend():
+    """Stats hold quartiles, price per area and a monthly median trend."""
+    documents = [_property("Boston", price, area=price / 20) for price in (1000, 2000, 3000)]
+    documents.append(_property("Boston", 4000, area=None))  # left out of price per area
+    groups = group_properties(documents)
+    previous = {"history": [
+        {"period": "2026-09", "median_price": 2000.0, "count": 3},
+        {"period": "2026-10", "median_price": 1.0, "count": 1},
+    ]}
+
+    stats = build_stats(("boston", "apartment"), groups[("boston", "apartment")], previous, datetime(2026, 10, 17))
+
+    assert stats["_id"] == "boston|apartment"
+    assert stats["city"] == "Boston"
+    assert stats["count"] == 4
+    assert stats["price"]["median"] == 2500.0
+    assert stats["price"]["p25"] == 1750.0
+    assert stats["price_per_area"]["median"] == 20.0
+    assert stats["price_per_area"]["max"] == 20.0
+    # This month's point is replaced, and compared with the previous month
+    assert stats["history"] == [
+        {"period": "2026-09", "median_price": 2000.0, "count": 3},
+        {"period": "2026-10", "median_price": 2500.0, "count": 4},
+    ]
+    assert stats["median_change_pct"] == 25.0
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+    async def to_list(self, length=None):
+        return self.documents
+
+
+class FakeCollection:
+    def __init__(self, documents=()):
+        self.documents = list(documents)
+        self.queries = []
+        self.bulk_writes = []
+        self.deleted = []
+
+    def find(self, query, projection=None, collation=None):
+        self.queries.append(query)
+        return FakeCursor(self.documents)
+
+    async def bulk_write(self, requests, ordered=True):
+        self.bulk_writes.append(requests)
+
+    async def delete_many(self, query):
+        self.deleted.extend(query["_id"]["$in"])
+
+
+@pytest.fixture
+def market(monkeypatch):
+    properties = FakeCollection()
+    stats = FakeCollection()
+
+    async def fake_get_collection(name):
+        return properties if name == "properties" else stats
+
+    monkeypatch.setattr(market_stats_service, "get_collection", fake_get_collection)
+    monkeypatch.setattr(MarketStatsService, "_dirty", set())
+    monkeypatch.setattr(settings, "MARKET_STATS_JOB_ENABLED", True)
+    return properties, stats
+
+
+@pytest.mark.asyncio
+async def test_flush_dirty_recomputes_touched_groups_only(market):
+    """Writes mark groups dirty; a flush rewrites them and deletes emptied ones."""
+    properties, stats = market
+    properties.documents = [_property("Boston", 1200), _property("Boston", 1800)]
+
+    MarketStatsService.mark_dirty(_property("Boston", 1500))
+    MarketStatsService.mark_dirty(_property("Boston", 900, property_type="house"))
+
+    assert await MarketStatsService.flush_dirty() == 2
+    (pattern,) = properties.queries[0]["address.city"]["$in"]
+    assert pattern.match(" BOSTON ") and not pattern.match("Boston Heights")
+    written = {request._filter["_id"] for request in stats.bulk_writes[0]}
+    assert written == {"boston|apartment", "boston|all"}
+    # No house is left in Boston, so its stats are removed
+    assert stats.deleted == ["boston|house"]
+
+    assert await MarketStatsService.flush_dirty() == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_dirty_keeps_groups_of_padded_city_names(market):
+    """A city stored with surrounding whitespace still belongs to its group."""
+    properties, stats = market
+    properties.documents = [_property(" Boston ", 900, property_type="house")]
+
+    MarketStatsService.mark_dirty(_property("Boston", 900, property_type="house"))
+
+    assert await MarketStatsService.flush_dirty() == 2
+    assert stats.deleted == []
+
+
+def test_mark_dirty_is_skipped_while_job_disabled(market, monkeypatch):
+    """Nothing drains dirty groups without the job, so none are queued."""
+    monkeypatch.setattr(settings, "MARKET_STATS_JOB_ENABLED", False)
+
+    MarketStatsService.mark_dirty(_property("Boston", 1500))
+
+    assert MarketStatsService._dirty == set()
+
+
+class FakeLeases:
+    def __init__(self):
+        self.lease = None
+
+    async def find_one_and_update(self, query, update, upsert=False):
+        holders = [branch["holder"] for branch in query["$or"] if "holder" in branch]
+        expired = self.lease is not None and self.lease["expires_at"] <= query["$or"][0]["expires_at"]["$lte"]
+        if self.lease is not None and not expired and self.lease["holder"] not in holders:
+            raise DuplicateKeyError("E11000 duplicate key error")
+        self.lease = dict(update["$set"])
+
+
+@pytest.mark.asyncio
+async def test_one_worker_per_host_holds_the_lease(monkeypatch):
+    """Workers sharing a hostname still get distinct lease holders."""
+    leases = FakeLeases()
+
+    async def fake_get_collection(name):
+        return leases
+
+    monkeypatch.setattr(market_stats_service, "get_collection", fake_get_collection)
+    first, second = MarketStatsJob(), MarketStatsJob()
+
+    assert first.holder != second.holder
+    assert await MarketStatsService.acquire_lease(MarketStatsJob.LEASE, first.holder, 60)
+    assert not await MarketStatsService.acquire_lease(MarketStatsJob.LEASE, second.holder, 60)
+    assert await MarketStatsService.acquire_lease(MarketStatsJob.LEASE, first.holder, 60)
@@ -0,0 +1,158 @@
+"""
+Tests for bulk property import.
+"""
+
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from app.services import property_import
+from app.services.property_import import import_properties, iter_csv_rows
+
+ADDRESS = {"street": "1 Main St", "city": "Boston", "state": "MA", "zip_code": "02101", "country": "USA"}
+
+
+def _listing(**overrides):
+    listing = {
+        "title": "Flat", "description": "Nice", "property_type": "apartment",
+        "bedrooms": 2, "bathrooms": 1, "area": 60, "price": 1500, "address": ADDRESS,
+    }
+    listing.update(overrides)
+    return listing
+
+
+class FakeCollection:
+    """Records insert_many calls; optionally fails given positions of a batch."""
+
+    def __init__(self, fail_indexes=()):
+        self.batches = []
+        self.summarized = []
+        self.fail_indexes = set(fail_indexes)
+        self.fail_batches = set()
+
+    async def insert_many(self, documents, ordered=True):
+        assert ordered is False
+        self.batches.append(documents)
+        if len(self.batches) in self.fail_batches:
+            raise AutoReconnect("connection reset")
+        failed = [i for i in range(len(documents)) if i in self.fail_indexes]
+        if failed:
+            raise BulkWriteError({
+                "nInserted": len(documents) - len(failed),
+                "writeErrors": [{"index": i, "errmsg": "E11000 duplicate key"} for i in failed],
+            })
+        return SimpleNamespace(inserted_ids=list(range(len(documents))))
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = FakeCollection()
+
+    async def fake_get_collection(name):
+        return collection
+
+    async def record_summaries(documents):
+        collection.summarized.extend(documents)
+
+    monkeypatch.setattr(property_import, "get_collection", fake_get_collection)
+    monkeypatch.setattr(property_import.PropertySummaryService, "add_many", record_summaries)
+    return collection
+
+
+def test_csv_rows_build_nested_fields_and_drop_empty_cells():
+    """Dotted CSV headers become nested objects; empty cells are omitted."""
+    lines = ["title,price,security_deposit,address.city,address.state\n", "Flat,1500,,Boston,MA\n"]
+
+    assert list(iter_csv_rows(lines)) == [
+        (1, {"title": "Flat", "price": "1500", "address": {"city": "Boston", "state": "MA"}})
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_inserts_valid_rows_in_chunks_and_reports_errors(collection):
+    """Valid rows are inserted in chunks; invalid rows are reported by row number."""
+    lines = [
+        json.dumps(_listing()),
+        "{not json",
+        "",
+        json.dumps(_listing(price=-5)),
+        json.dumps(_listing(title="Loft")),
+        json.dumps(_listing(title="House", property_type="house")),
+    ]
+
+    result = await import_properties(lines, "owner-1", "ndjson", chunk_size=2)
+
+    assert (result.total_rows, result.inserted, result.failed) == (5, 3, 2)
+    assert [error.row for error in result.errors] == [2, 3]
+    assert result.errors[1].errors == ["price: Price must be greater than zero"]
+    assert [len(batch) for batch in collection.batches] == [2, 1]
+    document = collection.batches[0][0]
+    assert document["owner_id"] == "owner-1"
+    assert document["status"] == "available"
+    assert document["created_at"] == document["updated_at"]
+
+
+@pytest.mark.asyncio
+async def test_import_maps_write_errors_to_rows(collection):
+    """Rows rejected by insert_many are reported with their input row numbers."""
+    collection.fail_indexes = {1}
+    lines = [json.dumps(_listing(title=f"Flat {i}")) for i in range(3)]
+
+    result = await import_properties(lines, "owner-1", "ndjson", chunk_size=10)
+
+    assert (result.inserted, result.failed) == (2, 1)
+    assert result.errors[0].row == 2
+    # Only inserted rows get a summary
+    assert [document["title"] for document in collection.summarized] == ["Flat 0", "Flat 2"]
+    assert "duplicate key" in result.errors[0].errors[0]
+
+
+@pytest.mark.asyncio
+async def test_import_keeps_counts_when_a_chunk_fails(collection):
+    """A database error fails its chunk's rows; earlier and later chunks still count."""
+    collection.fail_batches = {2}
+    lines = [json.dumps(_listing(title=f"Flat {i}")) for i in range(5)]
+
+    result = await import_properties(lines, "owner-1", "ndjson", chunk_size=2)
+
+    assert (result.total_rows, result.inserted, result.failed) == (5, 3, 2)
+    assert [error.row for error in result.errors] == [3, 4]
+    assert "connection reset" in result.errors[0].errors[0]
+    assert [document["title"] for document in collection.summarized] == ["Flat 0", "Flat 1", "Flat 4"]
+
+
+@pytest.mark.asyncio
+async def test_import_csv(collection):
+    """CSV rows are coerced to property fields by PropertyCreate."""
+    lines = [
+        "title,description,property_type,bedrooms,bathrooms,area,price,pets_allowed,"
+        "address.street,address.city,address.state,address.zip_code,address.country\n",
+        "Flat,Nice,apartment,2,1.5,60,1500,true,1 Main St,Boston,MA,02101,USA\n",
+    ]
+
+    result = await import_properties(lines, "owner-1", "csv")
+
+    assert result.inserted == 1, result.errors
+    document = collection.batches[0][0]
+    assert document["price"] == 1500.0
+    assert document["pets_allowed"] is True
+    assert document["address"]["zip_code"] == "02101"
+
+
+@pytest.mark.asyncio
+async def test_import_reads_input_off_the_event_loop(collection):
+    """The input is read and parsed in a worker thread, never on the loop's thread."""
+    readers = set()
+
+    def lines():
+        for i in range(3):
+            readers.add(threading.current_thread())
+            yield json.dumps(_listing(title=f"Flat {i}"))
+
+    result = await import_properties(lines(), "owner-1", "ndjson", chunk_size=2)
+
+    assert result.inserted == 3
+    assert threading.main_thread() not in readers
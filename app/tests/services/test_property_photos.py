@@ -0,0 +1,94 @@
+"""
+Tests for batched property photo loading.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.models.property import PropertyDB
+from app.services import property_service
+from app.services.property_service import cover_photo_image, PropertyService
+
+
+class FakeAggregateCursor:
+    """Minimal Motor aggregate cursor returning canned documents."""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length=None):
+        return self.documents
+
+
+class FakePhotoCollection:
+    """Records aggregation pipelines and returns grouped photos."""
+
+    def __init__(self, groups):
+        self.groups = groups
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return FakeAggregateCursor(self.groups)
+
+
+def _photo(photo_id, property_id, url="https://cdn.example.com/p.jpg", is_primary="0"):
+    return {
+        "_id": photo_id,
+        "property_id": property_id,
+        "photo_url": url,
+        "is_primary": is_primary,
+        "created_at": datetime(2025, 1, 1),
+    }
+
+
+def test_cover_photo_image_maps_photo_document():
+    """Photo documents map to PropertyImage, with "1" read as primary."""
+    image = cover_photo_image({"id": "p1", "photo_url": "https://x/1.jpg", "description": "Kitchen", "is_primary": "1"})
+
+    assert image.id == "p1"
+    assert image.url == "https://x/1.jpg"
+    assert image.caption == "Kitchen"
+    assert image.is_primary is True
+    assert cover_photo_image({"id": "p2", "photo_url": None}) is None
+
+
+@pytest.mark.asyncio
+async def test_cover_photos_are_loaded_in_one_query(monkeypatch):
+    """Covers for a whole page come from a single aggregation."""
+    collection = FakePhotoCollection([
+        {"_id": "prop-1", "photos": [_photo("ph-1", "prop-1", is_primary="1")]},
+    ])
+
+    async def fake_get_collection(name):
+        assert name == "property_photos"
+        return collection
+
+    monkeypatch.setattr(property_service, "get_collection", fake_get_collection)
+    properties = [
+        PropertyDB(id=f"prop-{i}", owner_id="owner", title="Flat", description="Nice", property_type="apartment",
+                   price=1000, bedrooms=1, bathrooms=1, area=50, address={"street": "1 Main St", "city": "Boston",
+                   "state": "MA", "zip_code": "02101", "country": "US"})
+        for i in (1, 2)
+    ]
+
+    await PropertyService._attach_cover_photos(properties)
+
+    assert len(collection.pipelines) == 1
+    pipeline = collection.pipelines[0]
+    assert sorted(pipeline[0]["$match"]["property_id"]["$in"]) == ["prop-1", "prop-2"]
+    assert "photo_data" not in pipeline[1]["$project"]
+    assert properties[0].cover_photo.id == "ph-1"
+    assert properties[1].cover_photo is None
+
+
+@pytest.mark.asyncio
+async def test_no_photo_query_for_empty_page(monkeypatch):
+    """An empty result page does not query the photo collection."""
+    async def fail_get_collection(name):
+        raise AssertionError("photo collection should not be queried")
+
+    monkeypatch.setattr(property_service, "get_collection", fail_get_collection)
+
+    assert await PropertyService.get_photos_for_properties([]) == {}
@@ -0,0 +1,244 @@
+"""
+Tests for compiling property searches into index-backed MongoDB queries.
+"""
+
+from datetime import datetime
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from app.db.indexes import PROPERTY_SEARCH_INDEXES, SEARCH_COLLATION
+from app.models.property import BoundingBox, GeoNearFilter, PropertySearchParams
+from app.services.property_search import (
+    build_count_query,
+    build_facet_pipeline,
+    build_geo_near_pipeline,
+    build_search_query,
+    format_facets,
+    SEARCH_SORT,
+    TEXT_SCORE_PROJECTION,
+    TEXT_SCORE_SORT,
+)
+
+MANHATTAN = BoundingBox(min_longitude=-74.02, min_latitude=40.70, max_longitude=-73.93, max_latitude=40.80)
+
+# Search shapes the listing pages send most often
+COMMON_SEARCHES = [
+    PropertySearchParams(),
+    PropertySearchParams(city="new york"),
+    PropertySearchParams(city="New York", min_price=1000, max_price=3000),
+    PropertySearchParams(city="Chicago", min_bedrooms=2, max_price=4000),
+    PropertySearchParams(property_type="apartment", max_price=2000),
+    PropertySearchParams(min_bedrooms=1, max_bedrooms=3),
+    PropertySearchParams(min_price=500, max_price=1500, pets_allowed=True),
+    PropertySearchParams(within_box=MANHATTAN, max_price=3000),
+]
+
+
+def test_default_search_filters_available_properties():
+    """An empty search still restricts results to available listings."""
+    assert build_search_query(PropertySearchParams()) == {"status": "available"}
+
+
+def test_search_query_combines_all_filters():
+    """Equality, range and availability filters compile into one query."""
+    available_from = datetime(2025, 6, 1)
+    params = PropertySearchParams(
+        property_type="house",
+        min_price=1000,
+        max_price=2500,
+        min_bedrooms=2,
+        city="Chicago",
+        is_furnished=False,
+        available_from=available_from,
+    )
+
+    query = build_search_query(params)
+
+    assert query["status"] == "available"
+    assert query["property_type"] == "house"
+    assert query["address.city"] == "Chicago"
+    assert query["is_furnished"] is False
+    assert query["price"] == {"$gte": 1000, "$lte": 2500}
+    assert query["bedrooms"] == {"$gte": 2}
+    assert "bathrooms" not in query
+    assert query["$or"] == [
+        {"available_from": None},
+        {"available_from": {"$lte": available_from}},
+    ]
+
+
+def test_bounding_box_compiles_to_geo_within_polygon():
+    """A bounding box becomes a closed $geoWithin polygon on location."""
+    query = build_search_query(PropertySearchParams(within_box=MANHATTAN))
+
+    polygon = query["location"]["$geoWithin"]["$geometry"]
+    ring = polygon["coordinates"][0]
+    assert polygon["type"] == "Polygon"
+    assert ring[0] == ring[-1] == [-74.02, 40.70]
+    assert [-73.93, 40.80] in ring
+
+
+def test_radius_search_uses_geo_near_as_first_stage():
+    """Radius searches run $geoNear first and keep the other filters in its query."""
+    params = PropertySearchParams(
+        near=GeoNearFilter(longitude=-73.98, latitude=40.75, max_distance=2000),
+        max_price=2500,
+    )
+
+    pipeline = build_geo_near_pipeline(params, skip=20, limit=10)
+
+    geo_near = pipeline[0]["$geoNear"]
+    assert geo_near["near"] == {"type": "Point", "coordinates": [-73.98, 40.75]}
+    assert geo_near["maxDistance"] == 2000
+    assert geo_near["query"] == {"status": "available", "price": {"$lte": 2500}}
+    assert pipeline[1:] == [{"$skip": 20}, {"$limit": 10}]
+
+
+def test_keyword_search_combines_text_and_filters():
+    """Keywords add a $text clause next to the structured filters."""
+    query = build_search_query(PropertySearchParams(q="balcony view", city="New York", max_price=3000))
+
+    assert query["$text"] == {"$search": "balcony view"}
+    assert query["status"] == "available"
+    assert query["price"] == {"$lte": 3000}
+    # No collation with $text, so location matching is case-insensitive by regex
+    assert query["address.city"] == {"$regex": "^New\\ York$", "$options": "i"}
+
+
+def test_facet_pipeline_filters_once_then_fans_out():
+    """Results, total and facet counts come from one $match + $facet pipeline."""
+    params = PropertySearchParams(city="Boston", max_price=2000)
+
+    pipeline = build_facet_pipeline(params, skip=10, limit=5)
+
+    assert pipeline[0] == {"$match": build_search_query(params)}
+    facets = pipeline[1]["$facet"]
+    assert set(facets) == {"results", "total", "property_type", "city", "bedrooms", "price"}
+    assert facets["results"] == [{"$sort": {"price": 1, "_id": 1}}, {"$skip": 10}, {"$limit": 5}]
+    # Without facets the total comes from the count strategy instead
+    assert set(build_facet_pipeline(params, include_facets=False)[1]["$facet"]) == {"results"}
+
+
+def test_count_query_turns_radius_into_geo_within():
+    """count_documents cannot run $geoNear, so radius searches count with $centerSphere."""
+    near = GeoNearFilter(longitude=-73.98, latitude=40.75, max_distance=6378.1)
+
+    query = build_count_query(PropertySearchParams(near=near, max_price=3000))
+
+    assert query["price"] == {"$lte": 3000}
+    assert query["location"] == {"$geoWithin": {"$centerSphere": [[-73.98, 40.75], 0.001]}}
+
+    # A bounding box already filters on location, so both are combined
+    boxed = build_count_query(PropertySearchParams(near=near, within_box=MANHATTAN))
+    assert set(boxed) == {"$and"}
+
+
+def test_format_facets_labels_buckets():
+    """Raw bucket output is converted to labelled ranges with counts."""
+    facets = format_facets({
+        "property_type": [{"_id": "apartment", "count": 4}, {"_id": None, "count": 1}],
+        "bedrooms": [{"_id": 2, "count": 3}, {"_id": "4+", "count": 1}],
+        "price": [{"_id": 1000, "count": 4}],
+    })
+
+    assert facets["property_type"] == [{"value": "apartment", "count": 4}]
+    assert facets["bedrooms"] == [
+        {"value": "2", "min": 2, "max": 3, "count": 3},
+        {"value": "4+", "min": 4, "max": None, "count": 1},
+    ]
+    assert facets["price"] == [{"value": "1000-1500", "min": 1000, "max": 1500, "count": 4}]
+
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree."""
+    yield plan.get("stage")
+    if "inputStage" in plan:
+        yield from _plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+@pytest.fixture
+def search_collection():
+    """Property collection with search indexes on a live MongoDB, if available."""
+    from app.core.config import settings
+
+    client = MongoClient(settings.MONGO_CONNECTION_STRING, serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip("MongoDB is not available")
+
+    collection = client[settings.MONGO_TEST_DB_NAME]["properties_search_test"]
+    collection.drop()
+    for keys, options in PROPERTY_SEARCH_INDEXES:
+        collection.create_index(keys, **options)
+    collection.insert_many([
+        {
+            "title": f"Listing {i} with {'balcony' if i % 5 else 'garden'}",
+            "description": "Bright apartment close to the park" if i % 2 else "Quiet street",
+            "status": "available" if i % 4 else "rented",
+            "property_type": "apartment" if i % 3 else "house",
+            "bedrooms": i % 5,
+            "bathrooms": 1 + i % 3,
+            "area": 400 + i * 10,
+            "price": 800 + (i * 37) % 3000,
+            "pets_allowed": bool(i % 2),
+            "address": {"city": ["New York", "Chicago", "Boston"][i % 3], "state": "NY"},
+            "location": {"type": "Point", "coordinates": [-74.0 + (i % 50) * 0.002, 40.7 + (i % 40) * 0.003]},
+        }
+        for i in range(500)
+    ])
+
+    yield collection
+
+    collection.drop()
+    client.close()
+
+
+@pytest.mark.parametrize("params", COMMON_SEARCHES)
+def test_common_searches_do_not_scan_collection(search_collection, params):
+    """Common search shapes must be answered from an index, never a COLLSCAN."""
+    explain = (
+        search_collection.find(build_search_query(params), collation=SEARCH_COLLATION)
+        .sort(SEARCH_SORT)
+        .limit(10)
+        .explain()
+    )
+
+    stages = list(_plan_stages(explain["queryPlanner"]["winningPlan"]))
+    assert "COLLSCAN" not in stages, stages
+
+
+@pytest.mark.parametrize("params", [
+    PropertySearchParams(city="Chicago", min_bedrooms=2, max_price=4000),
+    PropertySearchParams(min_bedrooms=1, max_bedrooms=3),
+])
+def test_bedroom_searches_are_sorted_by_the_index(search_collection, params):
+    """Bedroom ranges come after the price sort key, so no in-memory SORT is needed."""
+    explain = (
+        search_collection.find(build_search_query(params), collation=SEARCH_COLLATION)
+        .sort(SEARCH_SORT)
+        .limit(10)
+        .explain()
+    )
+
+    stages = list(_plan_stages(explain["queryPlanner"]["winningPlan"]))
+    assert "COLLSCAN" not in stages and "SORT" not in stages, stages
+
+
+def test_keyword_search_uses_text_index(search_collection):
+    """Keyword searches with filters are answered through the text index."""
+    params = PropertySearchParams(q="garden", city="new york", max_price=3000)
+    explain = (
+        search_collection.find(build_search_query(params), TEXT_SCORE_PROJECTION)
+        .sort(TEXT_SCORE_SORT)
+        .limit(10)
+        .explain()
+    )
+
+    stages = list(_plan_stages(explain["queryPlanner"]["winningPlan"]))
+    assert "COLLSCAN" not in stages, stages
@@ -0,0 +1,163 @@
+"""
+Tests for the property summary read model.
+"""
+
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from app.db.indexes import PROPERTY_SUMMARY_INDEXES
+from app.models.property import PropertyStatus, PropertyType
+from app.services.property_summary_service import (
+    build_summary,
+    build_summary_query,
+    SUMMARY_NEWEST_SORT,
+    SUMMARY_PRICE_SORT,
+    SUMMARY_PROJECTION,
+)
+
+
+def test_build_summary_flattens_listing_card_fields():
+    """Summaries are flat documents keyed by the property _id."""
+    property_id = ObjectId()
+    summary = build_summary(
+        {
+            "_id": property_id,
+            "title": "Loft",
+            "description": "Long text that list pages never show",
+            "price": 2100.0,
+            "bedrooms": 2,
+            "property_type": PropertyType.APARTMENT,
+            "status": PropertyStatus.AVAILABLE,
+            "address": {"street": "1 Main St", "city": "Boston", "state": "MA"},
+            "owner_id": "owner-1",
+            "created_at": datetime(2025, 1, 1),
+        },
+        cover_photo_url="https://cdn.example.com/1.jpg",
+        proposal_count=3,
+    )
+
+    assert summary["_id"] == property_id
+    assert summary["city"] == "Boston"
+    assert summary["city_key"] == "boston"
+    assert summary["property_type"] == "apartment"
+    assert summary["status"] == "available"
+    assert summary["proposal_count"] == 3
+    assert "description" not in summary
+
+
+def test_summary_query_uses_indexed_fields():
+    """City filters use the lowercased key; ranges compile to bounds."""
+    assert build_summary_query(city="New York", max_price=3000, min_bedrooms=2) == {
+        "status": "available",
+        "city_key": "new york",
+        "price": {"$lte": 3000},
+        "bedrooms": {"$gte": 2},
+    }
+    assert build_summary_query(status=None, owner_id="owner-1") == {"owner_id": "owner-1"}
+
+
+def test_every_summary_index_covers_the_projection():
+    """Each summary index holds every projected field, _id and its own sort key."""
+    for keys, options in PROPERTY_SUMMARY_INDEXES:
+        fields = {field for field, _ in keys}
+        assert set(SUMMARY_PROJECTION) | {"_id"} <= fields, options["name"]
+
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree."""
+    yield plan.get("stage")
+    if "inputStage" in plan:
+        yield from _plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+@pytest.fixture
+def summary_collection():
+    """Summary collection with its indexes on a live MongoDB, if available."""
+    from app.core.config import settings
+
+    client = MongoClient(settings.MONGO_CONNECTION_STRING, serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip("MongoDB is not available")
+
+    collection = client[settings.MONGO_TEST_DB_NAME]["property_summaries_test"]
+    collection.drop()
+    for keys, options in PROPERTY_SUMMARY_INDEXES:
+        collection.create_index(keys, **options)
+    collection.insert_many([
+        build_summary({
+            "_id": ObjectId(),
+            "title": f"Listing {i}",
+            "price": 800 + (i * 37) % 3000,
+            "bedrooms": i % 5,
+            "property_type": "apartment",
+            "status": "available" if i % 4 else "rented",
+            "address": {"city": ["New York", "Chicago", "Boston"][i % 3], "state": "NY"},
+            "owner_id": f"owner-{i % 7}",
+            "created_at": datetime(2025, 1, 1 + i % 28),
+        })
+        for i in range(500)
+    ])
+
+    yield collection
+
+    collection.drop()
+    client.close()
+
+
+@pytest.mark.parametrize("query, sort", [
+    (build_summary_query(), SUMMARY_PRICE_SORT),
+    (build_summary_query(city="chicago", max_price=2000), SUMMARY_PRICE_SORT),
+    (build_summary_query(min_bedrooms=2, max_price=2500), SUMMARY_PRICE_SORT),
+    (build_summary_query(status=None, owner_id="owner-3"), SUMMARY_NEWEST_SORT),
+])
+def test_summary_lists_are_covered_queries(summary_collection, query, sort):
+    """List queries are answered from the index alone, without FETCH."""
+    explain = (
+        summary_collection.find(query, SUMMARY_PROJECTION)
+        .sort(sort + [("_id", sort[-1][1])])
+        .limit(20)
+        .explain()
+    )
+
+    stages = list(_plan_stages(explain["queryPlanner"]["winningPlan"]))
+    assert "IXSCAN" in stages, stages
+    assert "FETCH" not in stages and "COLLSCAN" not in stages, stages
+
+
+def _plan_indexes(plan):
+    """Yield the index names used by an explain() plan tree."""
+    if "indexName" in plan:
+        yield plan["indexName"]
+    if "inputStage" in plan:
+        yield from _plan_indexes(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        yield from _plan_indexes(child)
+
+
+def test_every_summary_index_serves_an_endpoint(summary_collection):
+    """Each covering index is the plan of a /summaries or /my/summaries query, so none is dead weight."""
+    endpoint_queries = [
+        (build_summary_query(), SUMMARY_PRICE_SORT),
+        (build_summary_query(city="boston"), SUMMARY_PRICE_SORT),
+        (build_summary_query(status=None, owner_id="owner-3"), SUMMARY_NEWEST_SORT),
+    ]
+    used = set()
+    for query, sort in endpoint_queries:
+        explain = (
+            summary_collection.find(query, SUMMARY_PROJECTION)
+            .sort(sort + [("_id", sort[-1][1])])
+            .limit(20)
+            .explain()
+        )
+        used.update(_plan_indexes(explain["queryPlanner"]["winningPlan"]))
+
+    assert used == {options["name"] for _, options in PROPERTY_SUMMARY_INDEXES}
@@ -0,0 +1,132 @@
+"""
+Tests for upserted and buffered proposal counters.
+"""
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from app.services import proposal_counter
+from app.services.proposal_counter import apply_proposal_counts, ProposalCountError, ProposalCounterBuffer
+
+
+class FakeCollection:
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.bulk_writes = []
+        self.summary_failure = None
+
+    async def bulk_write(self, requests, ordered=True):
+        self.bulk_writes.append(requests)
+        if self.failures:
+            raise self.failures.pop(0)
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    collection = FakeCollection()
+    summaries = []
+
+    async def fake_get_collection(name):
+        return collection
+
+    async def fake_increment(changes):
+        summaries.append(dict(changes))
+        if collection.summary_failure:
+            raise collection.summary_failure
+
+    monkeypatch.setattr(proposal_counter, "get_collection", fake_get_collection)
+    monkeypatch.setattr(proposal_counter.PropertySummaryService, "increment_proposal_counts", fake_increment)
+    return collection, summaries
+
+
+@pytest.mark.asyncio
+async def test_counts_are_one_upserted_write(counters):
+    """Increments upsert; decrements clamp at zero and never upsert."""
+    collection, summaries = counters
+
+    await apply_proposal_counts({"a": 2, "b": -1, "c": 0})
+
+    increment, decrement = collection.bulk_writes[0]
+    assert increment._filter == {"property_id": "a"}
+    assert increment._doc["$inc"] == {"number_of_proposals": 2}
+    assert increment._upsert is True
+    assert decrement._filter == {"property_id": "b"}
+    assert decrement._doc[0]["$set"]["number_of_proposals"] == {
+        "$max": [0, {"$add": [{"$ifNull": ["$number_of_proposals", 0]}, -1]}]
+    }
+    assert not decrement._upsert
+    assert summaries == [{"a": 2, "b": -1}]
+
+
+@pytest.mark.asyncio
+async def test_racing_upsert_is_retried(counters):
+    """A duplicate key from a concurrent first upsert retries the write once."""
+    collection, summaries = counters
+    collection.failures.append(BulkWriteError({"writeErrors": [{"index": 0, "code": 11000}]}))
+
+    await apply_proposal_counts({"a": 1})
+
+    assert len(collection.bulk_writes) == 2
+    assert summaries == [{"a": 1}]
+
+
+@pytest.mark.asyncio
+async def test_only_racing_upserts_are_retried(counters):
+    """Writes of an unordered bulk that did not collide are applied once."""
+    collection, summaries = counters
+    collection.failures.append(BulkWriteError({"writeErrors": [{"index": 1, "code": 11000}]}))
+
+    await apply_proposal_counts({"a": 1, "b": 2, "c": 3})
+
+    first, retry = collection.bulk_writes
+    assert len(first) == 3
+    assert [request._filter for request in retry] == [{"property_id": "b"}]
+    assert summaries == [{"a": 1, "b": 2, "c": 3}]
+
+
+@pytest.mark.asyncio
+async def test_buffer_coalesces_bursts(counters):
+    """A burst on one property becomes one change in one bulk write."""
+    collection, summaries = counters
+    buffer = ProposalCounterBuffer()
+    for _ in range(50):
+        buffer.add("hot", 1)
+    buffer.add("hot", -1)
+    buffer.add("cold", 1)
+
+    assert await buffer.flush() == 2
+    assert len(collection.bulk_writes) == 1
+    assert summaries == [{"hot": 49, "cold": 1}]
+    assert buffer.stats() == {"pending": 0, "changes": 52, "writes": 1}
+    assert await buffer.flush() == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_changes(counters):
+    """Changes of a failed flush are merged back for the next one."""
+    collection, summaries = counters
+    collection.failures.append(BulkWriteError({"writeErrors": [{"index": 0, "code": 121}]}))
+    buffer = ProposalCounterBuffer()
+    buffer.add("a", 1)
+    buffer.add("b", 1)
+
+    with pytest.raises(ProposalCountError):
+        await buffer.flush()
+    assert dict(buffer.pending) == {"a": 1}
+    buffer.add("a", 1)
+
+    assert await buffer.flush() == 1
+    assert summaries == [{"b": 1}, {"a": 2}]
+
+
+@pytest.mark.asyncio
+async def test_summary_failure_does_not_replay_counters(counters):
+    """Written counters are not queued again when only the summaries fail."""
+    collection, summaries = counters
+    collection.summary_failure = BulkWriteError({"writeErrors": [{"index": 0, "code": 121}]})
+    buffer = ProposalCounterBuffer()
+    buffer.add("a", 1)
+
+    assert await buffer.flush() == 1
+    assert not buffer.pending
+    assert len(collection.bulk_writes) == 1
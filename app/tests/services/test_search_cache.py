@@ -0,0 +1,81 @@
+"""
+Tests for the search result-page cache.
+"""
+
+import pytest
+
+from app.models.property import PropertySearchParams
+from app.services import property_service
+from app.services.property_service import PropertyService
+from app.services.search_cache import canonical_search_key, SearchResultCache
+
+
+def test_equivalent_searches_share_a_key():
+    """Case, spacing and explicit defaults do not change the key."""
+    a = PropertySearchParams(city="New York", min_bedrooms=2, max_price=3000)
+    b = PropertySearchParams(max_price=3000.0, city=" new  york", min_bedrooms=2, status="available")
+
+    assert canonical_search_key("search", a, limit=10, offset=0) == canonical_search_key("search", b, offset=0, limit=10)
+    assert canonical_search_key("search", a, limit=10, offset=0) != canonical_search_key("search", a, limit=10, offset=10)
+    assert canonical_search_key("search", a, limit=10) != canonical_search_key("facets", a, limit=10)
+
+
+@pytest.mark.asyncio
+async def test_generation_bump_invalidates_pages():
+    """A property write makes every cached page unreachable."""
+    cache = SearchResultCache()
+    params = PropertySearchParams(city="Boston")
+    calls = []
+
+    async def search():
+        calls.append(1)
+        return [len(calls)]
+
+    assert await cache.get_or_search("search", params, search, limit=10) == [1]
+    assert await cache.get_or_search("search", params, search, limit=10) == [1]
+    cache.bump()
+    assert await cache.get_or_search("search", params, search, limit=10) == [2]
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["generation"]) == (1, 2, 1)
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+
+@pytest.mark.asyncio
+async def test_cached_search_does_not_touch_mongo(monkeypatch):
+    """Repeated searches are answered from the cache alone."""
+    monkeypatch.setattr(property_service, "search_cache", SearchResultCache())
+    queries = []
+
+    async def fake_search(cls, search_params, limit, offset, cursor):
+        queries.append(search_params)
+        return []
+
+    async def no_collection(name):
+        raise AssertionError("cache hit must not query MongoDB")
+
+    monkeypatch.setattr(PropertyService, "_search_properties", classmethod(fake_search))
+    monkeypatch.setattr(property_service, "get_collection", no_collection)
+    params = PropertySearchParams(city="New York", min_bedrooms=2, max_price=3000)
+
+    for _ in range(3):
+        assert await PropertyService.search_properties(params, limit=10) == []
+
+    assert len(queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_callers_get_copies_of_cached_pages():
+    """Editing a returned page never changes what the next caller gets."""
+    cache = SearchResultCache()
+    params = PropertySearchParams(city="Boston")
+
+    async def search():
+        return {"items": [PropertySearchParams(city="Boston")], "total": 1}
+
+    page = await cache.get_or_search("facets", params, search, limit=10)
+    page["items"][0].city = "Chicago"
+    page["items"].clear()
+
+    page = await cache.get_or_search("facets", params, search, limit=10)
+    assert page["items"][0].city == "Boston"
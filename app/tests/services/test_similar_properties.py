@@ -0,0 +1,97 @@
+"""
+Tests for similar-listing recommendations.
+"""
+
+import numpy as np
+import pytest
+from bson import ObjectId
+
+from app.services import similar_properties
+from app.services.similar_properties import FEATURE_COUNT, raw_features, SimilarPropertyIndex
+
+
+def _property(price, longitude=-71.06, latitude=42.36, status="available", **fields):
+    return {
+        "_id": ObjectId(),
+        "price": price,
+        "area": 80,
+        "bedrooms": 2,
+        "bathrooms": 1,
+        "property_type": "apartment",
+        "status": status,
+        "location": {"type": "Point", "coordinates": [longitude, latitude]},
+        **fields,
+    }
+
+
+def _built_index(documents, block_rows=65536):
+    index = SimilarPropertyIndex(block_rows=block_rows)
+    index.build(
+        [str(doc["_id"]) for doc in documents],
+        np.array([raw_features(doc) for doc in documents]),
+        [doc["status"] == "available" for doc in documents]
+    )
+    return index
+
+
+def test_raw_features_leave_missing_values_to_the_scaler():
+    """Missing numbers and locations are NaN; unknown types set no flag."""
+    features = raw_features({"price": None, "property_type": "castle", "pets_allowed": True})
+
+    assert features.shape == (FEATURE_COUNT,)
+    assert np.isnan(features[0])
+    assert np.isnan(features[-3:]).all()
+    assert np.nansum(features) == 1.0  # only the pets flag
+
+
+def test_similar_ranks_nearest_available_listings():
+    """Nearby listings with close prices rank first; rented ones and the listing itself never appear."""
+    target = _property(2000)
+    near_same = _property(2050, longitude=-71.05)
+    near_pricier = _property(4000, longitude=-71.05)
+    far_same = _property(2000, longitude=-87.63, latitude=41.88)
+    rented = _property(2000, status="rented")
+    index = _built_index([target, near_same, near_pricier, far_same, rented])
+
+    ids = index.similar(target, k=3)
+
+    assert ids == [str(near_same["_id"]), str(near_pricier["_id"]), str(far_same["_id"])]
+
+
+def test_blocked_scoring_matches_single_pass():
+    """Scoring in small row blocks finds the same neighbours as one pass, for batched queries."""
+    rng = np.random.default_rng(3)
+    documents = [
+        _property(float(rng.uniform(800, 5000)), longitude=float(rng.normal(-71, 0.2)), latitude=float(rng.normal(42, 0.1)))
+        for _ in range(300)
+    ]
+    whole = _built_index(documents)
+    blocked = _built_index(documents, block_rows=7)
+    queries = np.stack([whole.encode(doc) for doc in documents[:5]])
+
+    assert whole.nearest(queries, 4) == blocked.nearest(queries, 4)
+
+
+@pytest.mark.asyncio
+async def test_writes_update_vectors_after_load(monkeypatch):
+    """Loads read every property; upserts and removals then change single rows."""
+    documents = [_property(1000), _property(1100)]
+
+    async def fake_stream(collection_name, projection=None, batch_size=1000):
+        for document in documents:
+            yield {"id": str(document["_id"]), **{k: v for k, v in document.items() if k != "_id"}}
+
+    monkeypatch.setattr(similar_properties, "stream_documents", fake_stream)
+    index = SimilarPropertyIndex()
+
+    index.upsert(_property(900))
+    assert index.stats()["rows"] == 0  # inactive until loaded
+
+    await index.ensure_loaded()
+    added = _property(1010)
+    index.upsert(added)
+    assert index.similar(documents[0], k=1) == [str(added["_id"])]
+
+    index.remove(str(added["_id"]))
+    assert index.similar(documents[0], k=5) == [str(documents[1]["_id"])]
+    assert index.stats()["rows"] == 2